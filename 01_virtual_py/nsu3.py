@@ -1,14 +1,19 @@
 import time
 import os
+import sys
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
 import pandas as pd
-import re
+
+# Shared parser lives with the API in secondIteration/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'secondIteration'))
+from attendance_parser import parse_attendance
+from attendance_parser.columns import extract_attendance_table_enhanced
+from history_store import history_store_from_env
 
 load_dotenv()
 
@@ -132,174 +137,6 @@ def find_and_click_link(driver, keywords, frame_names=['data', 'top', 'contents'
     return False
 
 
-def extract_attendance_table_enhanced(html, debug=True):
-    """
-    Enhanced attendance table parser with better debugging
-    Handles various IMS table formats
-    """
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    if debug:
-        print("\n" + "="*80)
-        print("🔍 DEBUG: Analyzing HTML structure")
-        print("="*80)
-    
-    # Find all tables
-    tables = soup.find_all('table')
-    if debug:
-        print(f"\n📊 Found {len(tables)} table(s) in HTML")
-    
-    attendance_data = []
-    subject_names = {}
-    
-    for table_idx, table in enumerate(tables):
-        if debug:
-            print(f"\n--- Analyzing Table {table_idx + 1} ---")
-        
-        rows = table.find_all('tr')
-        if debug:
-            print(f"   Rows: {len(rows)}")
-        
-        # Try to find header row with subject codes
-        header_row = None
-        header_row_idx = -1
-        
-        for row_idx, row in enumerate(rows):
-            cells = row.find_all(['td', 'th'])
-            cell_texts = [cell.get_text(strip=True) for cell in cells]
-            
-            if debug and row_idx < 5:  # Show first 5 rows
-                print(f"   Row {row_idx}: {cell_texts[:10]}")  # First 10 cells
-            
-            # Look for subject codes (usually alphanumeric like ITITC601, CSE301, etc.)
-            # Or look for "Days" column which often precedes subject codes
-            has_subject_codes = any(
-                bool(re.match(r'^[A-Z]{2,4}[A-Z]?\d{3,4}$', text)) 
-                for text in cell_texts
-            )
-            
-            if has_subject_codes or 'Days' in cell_texts:
-                header_row = cell_texts
-                header_row_idx = row_idx
-                if debug:
-                    print(f"\n   ✅ Found header row at index {row_idx}")
-                    print(f"   Header: {header_row}")
-                break
-        
-        if not header_row:
-            if debug:
-                print("   ⚠️  No header row found in this table")
-            continue
-        
-        # Extract subject codes (skip first column which is usually "Days" or similar)
-        subject_codes = []
-        for i, cell in enumerate(header_row):
-            if i == 0:  # Skip first column
-                continue
-            # Match subject code pattern
-            if re.match(r'^[A-Z]{2,4}[A-Z]?\d{3,4}$', cell):
-                subject_codes.append(cell)
-            elif cell and cell != 'Days':  # Sometimes codes might be in different format
-                subject_codes.append(cell)
-        
-        if debug:
-            print(f"\n   📋 Extracted subject codes: {subject_codes}")
-        
-        # Now extract data rows
-        data_rows = {}  # Store different metrics
-        
-        for row_idx, row in enumerate(rows[header_row_idx + 1:], start=header_row_idx + 1):
-            cells = row.find_all(['td', 'th'])
-            if len(cells) <= 1:
-                continue
-            
-            first_cell = cells[0].get_text(strip=True)
-            values = [cell.get_text(strip=True) for cell in cells[1:]]
-            
-            # Identify what this row contains
-            row_type = None
-            
-            if any(keyword in first_cell for keyword in ['Overall (%)', 'Overall%', 'Attendance %', 'Percentage']):
-                row_type = 'percentage'
-            elif any(keyword in first_cell for keyword in ['Overall Class', 'Total Classes', 'Total Class']):
-                row_type = 'total'
-            elif 'Present' in first_cell and 'Overall' in first_cell:
-                row_type = 'present'
-            elif 'Absent' in first_cell and 'Overall' in first_cell:
-                row_type = 'absent'
-            
-            if row_type:
-                data_rows[row_type] = values
-                if debug:
-                    print(f"   {row_type.upper()}: {values[:5]}...")  # Show first 5
-        
-        if debug:
-            print(f"\n   📊 Found data types: {list(data_rows.keys())}")
-        
-        # Build attendance records
-        for i, subject_code in enumerate(subject_codes):
-            record = {'Subject Code': subject_code}
-            
-            if 'percentage' in data_rows and i < len(data_rows['percentage']):
-                record['Attendance %'] = data_rows['percentage'][i]
-            
-            if 'total' in data_rows and i < len(data_rows['total']):
-                record['Total Classes'] = data_rows['total'][i]
-            
-            if 'present' in data_rows and i < len(data_rows['present']):
-                record['Classes Present'] = data_rows['present'][i]
-            
-            if 'absent' in data_rows and i < len(data_rows['absent']):
-                record['Classes Absent'] = data_rows['absent'][i]
-            
-            attendance_data.append(record)
-        
-        if debug and attendance_data:
-            print(f"\n   ✅ Extracted {len(attendance_data)} subject records from this table")
-    
-    # Extract subject names from HTML
-    # Look for patterns like "ITITC601-Web Technology" or "CSE301 - Data Structures"
-    full_html = str(soup)
-    
-    for code in set(item['Subject Code'] for item in attendance_data):
-        # Pattern 1: CODE-Name
-        pattern1 = rf'{code}\s*-\s*([^<\n]+?)(?:<br>|<|$)'
-        match = re.search(pattern1, full_html, re.IGNORECASE)
-        
-        if match:
-            name = match.group(1).strip()
-            # Clean up
-            name = re.sub(r'---?>.*$', '', name).strip()
-            name = re.sub(r'\s+', ' ', name).strip()
-            subject_names[code] = name
-        else:
-            # Pattern 2: Look in nearby text
-            # This is more aggressive - find the code and look at surrounding text
-            pattern2 = rf'{code}[^A-Z0-9]{{0,3}}([A-Z][a-zA-Z\s&]+?)(?:<|$|[0-9])'
-            match = re.search(pattern2, full_html)
-            if match:
-                name = match.group(1).strip()[:50]  # Limit to 50 chars
-                subject_names[code] = name
-    
-    if debug:
-        print(f"\n📚 Subject names found: {subject_names}")
-    
-    # Add subject names to records
-    for item in attendance_data:
-        code = item['Subject Code']
-        if code in subject_names:
-            item['Subject Name'] = subject_names[code]
-        else:
-            item['Subject Name'] = 'N/A'
-    
-    if debug:
-        print("\n" + "="*80)
-        print(f"✅ FINAL: Extracted {len(attendance_data)} total records")
-        print("="*80)
-    
-    return attendance_data
-
-
 try:
     # Step 1: Login
     print("🌐 Opening IMSNSIT...")
@@ -444,6 +281,7 @@ try:
     print("\n📊 Extracting attendance data...")
     
     all_attendance = []
+    history_records = []
     
     for frame_name in ['data', 'contents', 'bottom', 'top']:
         try:
@@ -475,6 +313,7 @@ try:
                 if attendance_rows:
                     print(f"\n✅ Successfully extracted {len(attendance_rows)} subject records!")
                     all_attendance.extend(attendance_rows)
+                    history_records.extend(parse_attendance(html).records())
                     
                     # Preview first 3
                     print(f"\n📋 Preview (first 3 subjects):")
@@ -495,6 +334,21 @@ try:
         cols = ['Subject Code', 'Subject Name', 'Classes Present', 'Classes Absent', 'Total Classes', 'Attendance %']
         df = df[[col for col in cols if col in df.columns]]
         
+        # Append to the history store; the CSV/Excel below are overwritten each run
+        try:
+            store = history_store_from_env()
+            store.append(
+                ROLL_NO,
+                int(year_choice) if year_selected else None,
+                int(sem_choice) if semester_selected else None,
+                history_records,
+                password=PASSWORD,
+                source='nsu3',
+            )
+            print(f"\n🗄️  Appended to history store {store.path}")
+        except Exception as e:
+            print(f"\n⚠️  Could not record history: {e}")
+        
         # Save to CSV
         csv_filename = "attendance_data.csv"
         df.to_csv(csv_filename, index=False)
@@ -538,6 +392,7 @@ try:
     if all_attendance:
         print("  - attendance_data.csv (structured data)")
         print("  - attendance_data.xlsx (Excel format)")
+        print("  - attendance_history.db (all runs, see history_store.py)")
     
     print("\n🔍 Browser staying open for manual inspection")
     print("Press Enter to close...")
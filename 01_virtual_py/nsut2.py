@@ -1,14 +1,18 @@
 import time
 import os
+import sys
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
 import pandas as pd
 
+# Shared parser lives with the API in secondIteration/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'secondIteration'))
+from attendance_parser import parse_attendance
+
 load_dotenv()
 
 ROLL_NO = os.getenv("IMS_ROLL_NO")
@@ -81,97 +85,14 @@ def find_and_click_link(driver, keywords, frame_names=['data', 'top', 'contents'
 
 def extract_attendance_table(html):
     """Parse IMS attendance HTML and extract structured data"""
-    import re
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    # Find the main attendance table
-    tables = soup.find_all('table')
-    
-    attendance_data = []
-    subject_names = {}
-    
-    for table in tables:
-        # Look for the header row with subject codes
-        header_row = None
-        for row in table.find_all('tr'):
-            cells = row.find_all(['td', 'th'])
-            cell_texts = [cell.get_text(strip=True) for cell in cells]
-            
-            # This is the header row with subject codes
-            if 'Days' in cell_texts or any('0603' in text or '0601' in text or '0602' in text for text in cell_texts):
-                header_row = cell_texts
-                break
-        
-        if not header_row:
-            continue
-        
-        # Extract subject codes (skip the "Days" column)
-        subject_codes = [code for code in header_row[1:] if code and code != 'Days']
-        
-        # Now find the summary rows
-        for row in table.find_all('tr'):
-            cells = row.find_all(['td', 'th'])
-            
-            if len(cells) == 0:
-                continue
-            
-            first_cell = cells[0].get_text(strip=True)
-            
-            # Overall (%) row - this is what we want!
-            if 'Overall (%)' in first_cell or 'Overall%' in first_cell:
-                percentages = [cell.get_text(strip=True) for cell in cells[1:]]
-                
-                for i, subject_code in enumerate(subject_codes):
-                    if i < len(percentages):
-                        attendance_data.append({
-                            'Subject Code': subject_code,
-                            'Attendance %': percentages[i]
-                        })
-            
-            # Get total classes
-            elif 'Overall Class' in first_cell or 'Total Classes' in first_cell:
-                totals = [cell.get_text(strip=True) for cell in cells[1:]]
-                for i, subject_code in enumerate(subject_codes):
-                    if i < len(totals) and i < len(attendance_data):
-                        attendance_data[i]['Total Classes'] = totals[i]
-            
-            # Get present count
-            elif 'Overall' in first_cell and 'Present' in first_cell:
-                presents = [cell.get_text(strip=True) for cell in cells[1:]]
-                for i, subject_code in enumerate(subject_codes):
-                    if i < len(presents) and i < len(attendance_data):
-                        attendance_data[i]['Classes Present'] = presents[i]
-            
-            # Get absent count  
-            elif 'Overall' in first_cell and 'Absent' in first_cell:
-                absents = [cell.get_text(strip=True) for cell in cells[1:]]
-                for i, subject_code in enumerate(subject_codes):
-                    if i < len(absents) and i < len(attendance_data):
-                        attendance_data[i]['Classes Absent'] = absents[i]
-    
-    # Extract subject names using regex - look for pattern "CODE-Name"
-    full_html = str(soup)
-    
-    # Pattern: Subject code followed by dash and name
-    for code in subject_codes:
-        # Look for patterns like "ITITC601-Web Technology"
-        pattern = rf'{code}-([^<\n]+?)(?:<br>|<|$)'
-        match = re.search(pattern, full_html, re.IGNORECASE)
-        
-        if match:
-            name = match.group(1).strip()
-            # Clean up any extra text
-            name = re.sub(r'---?>.*$', '', name).strip()
-            subject_names[code] = name
-    
-    # Add full names to attendance data
-    for item in attendance_data:
-        code = item['Subject Code']
-        if code in subject_names:
-            item['Subject Name'] = subject_names[code]
-    
-    return attendance_data
-
+    return [{
+        'Subject Code': subject.code,
+        'Subject Name': subject.name,
+        'Classes Present': subject.present,
+        'Classes Absent': subject.absent,
+        'Total Classes': subject.classes,
+        'Attendance %': subject.percentage,
+    } for subject in parse_attendance(html).subjects]
 
 try:
     # Step 1: Login
@@ -381,7 +302,7 @@ try:
         for _, row in df.iterrows():
             print(f"\n🎓 {row.get('Subject Code', 'N/A')} - {row.get('Subject Name', 'N/A')}")
             print(f"   Present: {row.get('Classes Present', 'N/A')}/{row.get('Total Classes', 'N/A')} classes")
-            print(f"   Attendance: {row.get('Attendance %', 'N/A')}")
+            print(f"   Attendance: {row.get('Attendance %', 'N/A')}%")
         print("\n" + "="*80)
     else:
         print("\n⚠️  No structured data extracted - check HTML files manually")
@@ -8,6 +8,7 @@ from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 from attendance_scraper_api import scrape_attendance
+from result_cache import cache_key, result_cache_from_env
 import json
 
 load_dotenv()
@@ -15,9 +16,8 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
-# Simple in-memory cache (optional - for development)
-# In production, use Redis
-attendance_cache = {}
+# Result cache: local LRU by default, Redis when RESULT_CACHE_REDIS_URL is set
+result_cache = result_cache_from_env()
 
 
 @app.route('/', methods=['GET'])
@@ -133,9 +133,8 @@ def get_attendance():
         if result['success']:
             print(f"✅ Successfully fetched {len(result['data'])} subjects")
             
-            # Cache the result (optional)
-            cache_key = f"{roll_no}_{year}_{semester}"
-            attendance_cache[cache_key] = result['data']
+            # Cache the result
+            result_cache.set(cache_key(roll_no, year, semester), result['data'])
             
             return jsonify({
                 "success": True,
@@ -170,13 +169,15 @@ def get_cached_attendance():
     year = request.args.get('year', '0')
     semester = request.args.get('semester', '0')
     
-    cache_key = f"{roll_no}_{year}_{semester}"
+    cached = result_cache.get(cache_key(roll_no, year, semester))
     
-    if cache_key in attendance_cache:
+    if cached is not None:
         return jsonify({
             "success": True,
-            "data": attendance_cache[cache_key],
-            "cached": True
+            "data": cached.value,
+            "cached": True,
+            "stale": cached.stale,
+            "age": cached.age
         }), 200
     else:
         return jsonify({
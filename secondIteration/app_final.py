@@ -1,13 +1,145 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
-from attendance_scraper_api import scrape_attendance
+from attendance_scraper_api import scrape_attendance, open_login_page, IMS_BASE_URL
+from driver_pool import DriverPool, DriverPoolExhausted
+from http_engine import HttpPortal
+from session_store import SessionStore, SessionLimitReached
+from auth_cache import AuthSessionCache
+from result_cache import cache_key, result_cache_from_env
+from snapshots import snapshot_store_from_env
+from history_store import history_store_from_env
+from exporters import FORMATS, exporter
+from job_queue import JobQueue, QueueFull
+from captcha_solver import OcrCaptchaSolver
+from login_prefetch import LoginPrefetcher
+from metrics import MetricsRegistry, StepTimer
+from scheduler import AdmissionRefused, browser_scheduler
 import requests
 from io import BytesIO
 import base64
+import hmac
+import json
+import math
+import os
+import time
+from collections import deque
+from queue import Queue
 
 app = Flask(__name__)
 CORS(app)
 
+# Warm Chrome drivers shared by /api/captcha and /api/attendance;
+# DRIVER_PROFILE=performance: headless, eager loads, no images / CSS / fonts
+driver_pool = DriverPool(
+    size=int(os.getenv("DRIVER_POOL_SIZE", "2")),
+    max_uses=int(os.getenv("DRIVER_POOL_MAX_USES", "50")),
+    headless=os.getenv("DRIVER_POOL_HEADLESS", "1") != "0",
+    profile=os.getenv("DRIVER_PROFILE", "default"),
+)
+
+# Each pooled driver holds one of the scheduler's MAX_BROWSERS slots for
+# its lifetime; a bigger pool would block warm-up waiting for slots
+if driver_pool.size > browser_scheduler.max_browsers:
+    raise ValueError(
+        f"DRIVER_POOL_SIZE={driver_pool.size} is more than MAX_BROWSERS={browser_scheduler.max_browsers}; "
+        f"raise MAX_BROWSERS or shrink the pool"
+    )
+
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "10"))
+
+# Selenium login pages kept open ahead of /api/captcha (login_prefetchers
+# below). Each holds a pool driver until it is handed out, so it has to
+# leave drivers for the logins it can't serve
+CAPTCHA_PREFETCH_SIZE = int(os.getenv("CAPTCHA_PREFETCH_SIZE", "0"))
+if CAPTCHA_PREFETCH_SIZE and CAPTCHA_PREFETCH_SIZE >= min(driver_pool.size, MAX_SESSIONS):
+    raise ValueError(
+        f"CAPTCHA_PREFETCH_SIZE={CAPTCHA_PREFETCH_SIZE} would hold every driver "
+        f"(DRIVER_POOL_SIZE={driver_pool.size}, MAX_SESSIONS={MAX_SESSIONS}); keep it below both"
+    )
+
+# Login pages parked between /api/captcha and /api/attendance; each
+# selenium one holds a pool driver, so there are never more of those
+# than the pool has drivers
+session_store = SessionStore(
+    ttl=int(os.getenv("SESSION_TTL", "300")),
+    max_sessions=MAX_SESSIONS,
+    on_evict=lambda s: _release_handle(s.engine, s.handle),
+    engine_limits={'selenium': min(MAX_SESSIONS, driver_pool.size)},
+)
+
+# How long /api/captcha waits for a free driver before answering 503
+CAPTCHA_CHECKOUT_TIMEOUT = float(os.getenv("CAPTCHA_CHECKOUT_TIMEOUT", "5"))
+
+# Logged-in portal cookies, so repeat fetches skip CAPTCHA and menus
+auth_cache = AuthSessionCache(
+    max_entries=int(os.getenv("AUTH_CACHE_SIZE", "50")),
+    idle_timeout=int(os.getenv("AUTH_CACHE_IDLE_TIMEOUT", "900")),
+)
+
+# Scraped results per (roll_no, year, semester), served stale while refreshing
+result_cache = result_cache_from_env()
+
+# Last page per (roll_no, year, semester), for change deltas
+snapshot_store = snapshot_store_from_env()
+
+# Every successful scrape, for /api/history
+history_store = history_store_from_env()
+
+# Bearer token for /api/export (all students); unset disables the endpoint
+EXPORT_TOKEN = os.getenv("EXPORT_TOKEN")
+
+# Local OCR for logins nobody is typing a CAPTCHA for (CAPTCHA_OCR=1);
+# needs the tesseract binary
+ocr_solver = OcrCaptchaSolver(
+    max_attempts=int(os.getenv("CAPTCHA_OCR_ATTEMPTS", "3")),
+) if os.getenv("CAPTCHA_OCR") == "1" else None
+OCR_ENGINE = os.getenv("CAPTCHA_OCR_ENGINE", "http")
+
+# Login pages opened ahead of /api/captcha, per engine (selenium ones are
+# off unless CAPTCHA_PREFETCH_SIZE is set, see above)
+login_prefetchers = {
+    'selenium': LoginPrefetcher(
+        lambda: _open_selenium_login(),
+        lambda driver: _release_handle('selenium', driver),
+        size=CAPTCHA_PREFETCH_SIZE,
+        ttl=int(os.getenv("CAPTCHA_PREFETCH_TTL", "240")),
+    ),
+    'http': LoginPrefetcher(
+        lambda: _open_http_login(),
+        lambda portal: _release_handle('http', portal),
+        size=int(os.getenv("CAPTCHA_PREFETCH_HTTP_SIZE", "0")),
+        ttl=int(os.getenv("CAPTCHA_PREFETCH_TTL", "240")),
+    ),
+}
+
+# Scrapes run here instead of in the request thread
+job_queue = JobQueue(
+    workers=int(os.getenv("SCRAPE_WORKERS", "2")),
+    max_queued=int(os.getenv("SCRAPE_QUEUE_SIZE", "20")),
+)
+
+# Students of one /api/attendance/batch request queued or running at once;
+# they go through job_queue as a single owner lane, so a batch takes its
+# turn with other users' scrapes instead of ahead of them
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+BATCH_MAX_STUDENTS = int(os.getenv("BATCH_MAX_STUDENTS", "200"))
+
+# Step / scrape latency histograms and component gauges / counters for /api/metrics
+metrics = MetricsRegistry()
+metrics.register_stats('driver_pool', driver_pool.stats, counters=('created', 'recycled'))
+metrics.register_stats('browsers', browser_scheduler.stats, counters=('admitted', 'refused', 'memory_waits'))
+metrics.register_stats('sessions', session_store.stats, counters=('evicted',))
+metrics.register_stats('auth_cache', auth_cache.stats, counters=('hits', 'misses', 'evictions'))
+metrics.register_stats('result_cache', result_cache.stats,
+                       counters=('hits', 'stale_hits', 'misses', 'refreshes', 'refresh_failures', 'evictions'))
+metrics.register_stats('snapshots', snapshot_store.stats, counters=('unchanged', 'changed', 'evictions'))
+metrics.register_stats('jobs', job_queue.stats, counters=('submitted', 'rejected', 'completed', 'failed'))
+for _engine, _prefetcher in login_prefetchers.items():
+    metrics.register_stats(f'captcha_prefetch_{_engine}', _prefetcher.stats,
+                           counters=('hits', 'misses', 'expired', 'opened', 'open_failures'))
+if ocr_solver is not None:
+    metrics.register_stats('captcha_ocr', ocr_solver.stats, counters=('attempts', 'solved', 'rejected', 'cache_hits'))
+
 @app.route('/', methods=['GET'])
 def home():
     return jsonify({
@@ -16,42 +148,65 @@ def home():
         "endpoints": {
             "GET /api/health": "Health check",
             "POST /api/captcha": "Get CAPTCHA image",
-            "POST /api/attendance": "Get attendance with CAPTCHA"
+            "POST /api/attendance": "Queue an attendance scrape (or return a cached result)",
+            "POST /api/attendance/batch": "Attendance for many students, streamed as NDJSON",
+            "POST /api/history": "Stored attendance history (no portal access)",
+            "GET /api/export?format=csv|xlsx|parquet": "Stream the whole history store (needs EXPORT_TOKEN)",
+            "GET /api/jobs/<job_id>": "Scrape job status and result",
+            "GET /api/metrics": "Step latency histograms and pool / cache gauges and counters (Prometheus text format)"
         }
     })
 
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({"status": "ok"}), 200
+    health = {"status": "ok", "browsers": browser_scheduler.stats()}
+    if ocr_solver is not None:
+        health["captcha_ocr"] = ocr_solver.stats()
+    health["captcha_prefetch"] = {engine: prefetcher.stats() for engine, prefetcher in login_prefetchers.items()}
+    return jsonify(health), 200
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Prometheus text exposition: ims_scrape_step_seconds{engine, step} and
+    ims_scrape_seconds{engine, outcome} histograms, plus a gauge per
+    numeric stats() value of the driver pool, caches, job queue and
+    CAPTCHA helpers (a *_total counter for the ever-growing ones: hits,
+    misses, drivers created, ...)
+    """
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/api/captcha', methods=['POST'])
 def get_captcha():
     """
-    Fetch CAPTCHA image from IMS portal
+    Open a login session on the IMS portal and return its CAPTCHA
+    
+    The browser (or HTTP session) stays open server-side until the
+    CAPTCHA is submitted to /api/attendance with the returned token.
+    When a page opened in advance is ready (see login_prefetch.py) it is
+    handed out instead, and "expires_in" is what is left of its lifetime.
     
     Request:
     {
-        "roll_no": "202300123"
+        "roll_no": "202300123",
+        "engine": "selenium"    (optional, or "http")
     }
     
     Response:
     {
         "success": true,
+        "session_token": "opaque-token",
+        "expires_in": 300,
         "captcha_url": "https://www.imsnsit.org/imsnsit/images/captcha/captcha_1770243588.jpg",
         "captcha_base64": "base64_encoded_image_data"
     }
     """
     try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
-        import time
-        
         data = request.get_json()
         roll_no = data.get('roll_no')
+        engine = data.get('engine', 'selenium')
         
         if not roll_no:
             return jsonify({
@@ -59,69 +214,51 @@ def get_captcha():
                 "error": "roll_no is required"
             }), 400
         
-        # Start browser
-        options = Options()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        # For now, keep it visible so we can see what's happening
-        # options.add_argument("--headless")
+        if engine not in login_prefetchers:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown engine: {engine}"
+            }), 400
+        
+        # Don't tie up a driver for a session the store would turn away
+        if not session_store.has_room(engine):
+            return _retry_later("Too many pending logins, try again shortly")
+        
+        # A page opened in advance if one is ready, else open one now
+        ttl = None
+        prefetched = login_prefetchers[engine].take()
+        if prefetched is not None:
+            handle, captcha_url, image = prefetched.handle, prefetched.captcha_url, prefetched.image
+            ttl = prefetched.remaining()
+        elif engine == 'http':
+            handle, captcha_url, image = _open_http_login()
+        else:
+            handle, captcha_url, image = _open_selenium_login(roll_no, timeout=CAPTCHA_CHECKOUT_TIMEOUT)
         
-        driver = webdriver.Chrome(options=options)
-        driver.maximize_window()
+        print(f"📸 CAPTCHA URL: {captcha_url}{' (prefetched)' if prefetched else ''}")
         
         try:
-            # Navigate to login page
-            driver.get("https://www.imsnsit.org/imsnsit/")
-            
-            wait = WebDriverWait(driver, 10)
-            login_link = wait.until(EC.element_to_be_clickable((By.PARTIAL_LINK_TEXT, "Student Login")))
-            login_link.click()
-            time.sleep(5)
-            
-            # Switch to login frame
-            driver.switch_to.frame(0)
-            
-            # Fill roll number
-            uid_input = wait.until(EC.presence_of_element_located((By.ID, "uid")))
-            uid_input.send_keys(roll_no)
-            
-            # Get CAPTCHA image URL
-            captcha_img = driver.find_element(By.ID, "captchaimg")
-            captcha_src = captcha_img.get_attribute("src")
-            
-            # Make it absolute URL if needed
-            if captcha_src.startswith("images/"):
-                captcha_url = f"https://www.imsnsit.org/imsnsit/{captcha_src}"
-            else:
-                captcha_url = captcha_src
-            
-            print(f"📸 CAPTCHA URL: {captcha_url}")
-            
-            # Fetch the image and convert to base64
-            # We need to use the driver's cookies to access the image
-            cookies = driver.get_cookies()
-            session = requests.Session()
-            for cookie in cookies:
-                session.cookies.set(cookie['name'], cookie['value'])
-            
-            img_response = session.get(captcha_url)
-            img_base64 = base64.b64encode(img_response.content).decode('utf-8')
-            
-            # Keep the session alive - store driver somehow
-            # For now, just return the data
-            
-            driver.quit()
-            
-            return jsonify({
-                "success": True,
-                "captcha_url": captcha_url,
-                "captcha_base64": f"data:image/jpeg;base64,{img_base64}",
-                "roll_no": roll_no
-            }), 200
-            
-        except Exception as e:
-            driver.quit()
-            raise e
+            token = session_store.create(engine, handle, roll_no, ttl=ttl)
+        except SessionLimitReached as e:
+            _release_handle(engine, handle)
+            return _retry_later(str(e))
+        
+        img_base64 = base64.b64encode(image).decode('utf-8')
+        
+        return jsonify({
+            "success": True,
+            "session_token": token,
+            "expires_in": int(session_store.ttl if ttl is None else min(ttl, session_store.ttl)),
+            "captcha_url": captcha_url,
+            "captcha_base64": f"data:image/jpeg;base64,{img_base64}",
+            "roll_no": roll_no
+        }), 200
+    
+    except (AdmissionRefused, DriverPoolExhausted) as e:
+        # Too many browsers, too little memory or every driver busy: ask
+        # the client to come back
+        print(f"⏳ CAPTCHA refused: {e}")
+        return _retry_later(str(e))
             
     except Exception as e:
         print(f"❌ Error fetching CAPTCHA: {e}")
@@ -131,6 +268,82 @@ def get_captcha():
         }), 500
 
 
+def _retry_later(error):
+    """503 with Retry-After, for when every driver or session slot is taken"""
+    response = jsonify({
+        "success": False,
+        "error": error
+    })
+    response.headers['Retry-After'] = '30'
+    return response, 503
+
+
+def _open_http_login():
+    """HttpPortal on the login page, with its CAPTCHA"""
+    portal = HttpPortal().open_login()
+    try:
+        return portal, portal.captcha_url, portal.fetch_captcha()
+    except Exception:
+        portal.session.close()
+        raise
+
+
+def _open_selenium_login(roll_no=None, timeout=None):
+    """
+    Borrow a driver, park it on the login form and fetch its CAPTCHA
+    
+    roll_no is optional: scrape_attendance fills the field again anyway.
+    timeout caps the wait for a free driver (the pool's checkout_timeout
+    by default) before DriverPoolExhausted.
+    """
+    from selenium.webdriver.common.by import By
+    from waits import Waiter
+    
+    driver = driver_pool.checkout(timeout)
+    
+    try:
+        waiter = Waiter(driver)
+        open_login_page(driver, waiter)
+        
+        # Switch to login frame
+        waiter.frame(0, 'login_frame')
+        
+        # Fill roll number
+        uid_input = waiter.element((By.ID, "uid"), 'login_form')
+        if roll_no:
+            uid_input.send_keys(roll_no)
+        
+        # Get CAPTCHA image URL
+        captcha_img = driver.find_element(By.ID, "captchaimg")
+        captcha_src = captcha_img.get_attribute("src")
+        
+        # Make it absolute URL if needed
+        if captcha_src.startswith("images/"):
+            captcha_url = f"{IMS_BASE_URL}{captcha_src}"
+        else:
+            captcha_url = captcha_src
+        
+        # Fetch the image with the driver's cookies so it belongs to this session
+        session = requests.Session()
+        for cookie in driver.get_cookies():
+            session.cookies.set(cookie['name'], cookie['value'])
+        
+        img_response = session.get(captcha_url)
+        return driver, captcha_url, img_response.content
+        
+    except Exception:
+        driver_pool.checkin(driver, broken=True)
+        raise
+
+
+def _release_handle(engine, handle):
+    """Give back whatever a stored session was holding"""
+    if engine == 'http':
+        handle.session.close()
+    else:
+        driver_pool.checkin(handle)
+
+
 @app.route('/api/attendance', methods=['POST'])
 def get_attendance():
     """
@@ -140,10 +353,37 @@ def get_attendance():
     {
         "roll_no": "202300123",
         "password": "password",
-        "captcha": "abc123",
+        "captcha": "abc123",                       (optional if logged in recently or CAPTCHA_OCR=1)
+        "session_token": "token from /api/captcha",
         "year": 0,
-        "semester": 0
+        "semester": 0,
+        "engine": "selenium",   (optional, or "http"; ignored with session_token)
+        "refresh": false,       (optional, true skips the result cache)
+        "since": "hash",        (optional, "hash" of the data the client already has)
+        "terms": [[0, 0], [0, 1]]   (optional, several year/semester pairs in one login)
     }
+    
+    Cached results come back right away (200) with "cached": true, "stale",
+    "age" (seconds) and the data "hash"; a stale result triggers a
+    background refresh through the cached login. If "since" is already the
+    current hash, "data" is left out and "unchanged" is true.
+    
+    A finished scrape carries a "delta" (new/changed day rows and subject
+    totals against the previous snapshot, see snapshots.py); when "since"
+    matches the delta's base, "data" is left out of the job result.
+    
+    With "terms" (instead of year / semester, and without "since") results
+    come back under "results", keyed "<year>_<semester>", all from one
+    portal login; cached results are used only if every term is cached.
+    
+    Otherwise the scrape is queued (202):
+    {
+        "success": true,
+        "job_id": "abc",
+        "status": "queued",
+        "status_url": "/api/jobs/abc"
+    }
+    and a full queue answers 429 with Retry-After.
     """
     try:
         data = request.get_json()
@@ -151,33 +391,101 @@ def get_attendance():
         roll_no = data.get('roll_no')
         password = data.get('password')
         captcha = data.get('captcha')
+        token = data.get('session_token')
         year_idx = data.get('year', 0)
         sem_idx = data.get('semester', 0)
+        engine = data.get('engine', 'selenium')
+        refresh = data.get('refresh', False)
+        since = data.get('since')
+        terms = data.get('terms')
         
         # Validate
-        if not all([roll_no, password, captcha]):
+        if not all([roll_no, password]):
             return jsonify({
                 "success": False,
                 "error": "Missing required fields"
             }), 400
         
-        print(f"📊 Scraping attendance for: {roll_no[:3]}***")
+        if terms is not None:
+            if not _valid_terms(terms):
+                return jsonify({
+                    "success": False,
+                    "error": "terms must be a non-empty list of [year, semester] pairs"
+                }), 400
+            terms = [tuple(term) for term in terms]
+            since = None
         
-        # CAPTCHA solver
-        def captcha_solver(driver):
-            return captcha
+        key = cache_key(roll_no, year_idx, sem_idx)
+        owner = (roll_no, password)
         
-        # Call scraper
-        result = scrape_attendance(
-            roll_no=roll_no,
-            password=password,
-            year_idx=year_idx,
-            semester_idx=sem_idx,
-            captcha_solver=captcha_solver,
-            headless=False
-        )
+        # A session_token means the user just solved a CAPTCHA: always scrape
+        if terms and not token and not refresh:
+            cached_terms = _cached_terms(roll_no, password, terms)
+            if cached_terms is not None:
+                return jsonify({
+                    "success": True,
+                    "results": cached_terms,
+                    "cached": True
+                }), 200
+        elif not token and not refresh:
+            cached = result_cache.get(key, owner=owner)
+            if cached is not None:
+                if cached.stale:
+                    result_cache.refresh(key, lambda: _refetch(roll_no, password, year_idx, sem_idx), owner=owner)
+                data_hash = snapshot_store.current_hash(key)
+                response = {
+                    "success": True,
+                    "cached": True,
+                    "stale": cached.stale,
+                    "age": cached.age,
+                    "hash": data_hash
+                }
+                if since and since == data_hash:
+                    response["unchanged"] = True
+                else:
+                    response["data"] = cached.value
+                return jsonify(response), 200
+        
+        if not captcha and not token and ocr_solver is not None:
+            # Nobody to type the CAPTCHA: let OCR log in
+            engine = OCR_ENGINE
+        elif not captcha and not auth_cache.has(roll_no):
+            return jsonify({
+                "success": False,
+                "error": "captcha is required"
+            }), 400
+        
+        # Finish the login on the session that served the CAPTCHA
+        live = {}
+        if token:
+            engine, live, error, status = _take_live_session(token, roll_no)
+            if error:
+                return jsonify({
+                    "success": False,
+                    "error": error
+                }), status
         
-        return jsonify(result), 200 if result['success'] else 500
+        try:
+            job = job_queue.submit(_run_scrape, roll_no, password, captcha, year_idx, sem_idx, engine, live,
+                                   since=since, terms=terms, owner=roll_no)
+        except QueueFull as e:
+            if live:
+                _release_handle(engine, live.get('portal') or live.get('driver'))
+            response = jsonify({
+                "success": False,
+                "error": str(e)
+            })
+            response.headers['Retry-After'] = '30'
+            return response, 429
+        
+        print(f"📊 Queued attendance scrape for: {roll_no[:3]}*** (job {job.id[:6]})")
+        
+        return jsonify({
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/api/jobs/{job.id}"
+        }), 202
         
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -187,6 +495,434 @@ def get_attendance():
         }), 500
 
 
+@app.route('/api/attendance/batch', methods=['POST'])
+def get_attendance_batch():
+    """
+    Fetch attendance for many students at once
+    
+    Request:
+    {
+        "students": [
+            {
+                "roll_no": "202300123",
+                "password": "password",
+                "captcha": "abc123",                (or a recent login)
+                "session_token": "from /api/captcha",
+                "year": 0,
+                "semester": 0
+            },
+            ...
+        ]
+    }
+    
+    Response: newline-delimited JSON, one line per student in the order
+    they finish:
+    {"index": 0, "roll_no": "202300123", "success": true, "data": [...]}
+    {"index": 1, "roll_no": "202300124", "success": false, "error": "..."}
+    
+    Students are scraped on the job queue, BATCH_WORKERS at a time, all in
+    one fair-queue lane: the whole batch gets the same turns as a single
+    user's /api/attendance jobs.
+    """
+    data = request.get_json(silent=True) or {}
+    students = data.get('students')
+    
+    if not isinstance(students, list) or not students:
+        return jsonify({
+            "success": False,
+            "error": "students must be a non-empty list"
+        }), 400
+    
+    if len(students) > BATCH_MAX_STUDENTS:
+        return jsonify({
+            "success": False,
+            "error": f"At most {BATCH_MAX_STUDENTS} students per batch"
+        }), 400
+    
+    print(f"📚 Batch attendance for {len(students)} students")
+    
+    # Claim live sessions now, before their TTL runs out in the backlog
+    ready = []
+    pending = deque()
+    for index, student in enumerate(students):
+        student = student if isinstance(student, dict) else {}
+        roll_no = student.get('roll_no')
+        
+        if not roll_no or not student.get('password'):
+            ready.append({"index": index, "roll_no": roll_no, "success": False,
+                          "error": "Missing required fields"})
+            continue
+        
+        engine = student.get('engine', 'selenium')
+        live = {}
+        if student.get('session_token'):
+            engine, live, error, _ = _take_live_session(student['session_token'], roll_no)
+            if error:
+                ready.append({"index": index, "roll_no": roll_no, "success": False, "error": error})
+                continue
+        
+        pending.append((index, student, engine, live))
+    
+    lane = f"batch:{os.urandom(8).hex()}"
+    finished = Queue()
+    
+    def run(index, student, engine, live):
+        finished.put(_batch_one(index, student, engine, live))
+    
+    def generate():
+        for line in ready:
+            yield json.dumps(line) + "\n"
+        
+        in_flight = 0
+        try:
+            while pending or in_flight:
+                # Top the batch's lane up as its students finish
+                while pending and in_flight < BATCH_WORKERS:
+                    index, student, engine, live = pending.popleft()
+                    try:
+                        job_queue.submit(run, index, student, engine, live, owner=lane)
+                    except QueueFull as e:
+                        _release_live(engine, live)
+                        yield json.dumps({"index": index, "roll_no": student['roll_no'], "success": False,
+                                          "error": str(e)}) + "\n"
+                        continue
+                    in_flight += 1
+                if in_flight:
+                    yield json.dumps(finished.get()) + "\n"
+                    in_flight -= 1
+        finally:
+            # Client went away: don't keep the unsubmitted students' logins
+            while pending:
+                _, _, engine, live = pending.popleft()
+                _release_live(engine, live)
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def _batch_one(index, student, engine, live):
+    """One student of a batch; never raises so one failure can't sink the rest"""
+    roll_no = student['roll_no']
+    password = student['password']
+    year_idx = student.get('year', 0)
+    sem_idx = student.get('semester', 0)
+    
+    # Once scrape_attendance has the live session it hands it back itself
+    # (a driver goes back to driver_pool); releasing it here again would
+    # check the same driver in twice
+    handed_over = False
+    
+    try:
+        if not live:
+            cached = result_cache.get(cache_key(roll_no, year_idx, sem_idx), owner=(roll_no, password))
+            if cached is not None:
+                return {"index": index, "roll_no": roll_no, "success": True,
+                        "data": cached.value, "cached": True, "stale": cached.stale}
+        
+        handed_over = True
+        result = _run_scrape(roll_no, password, student.get('captcha'), year_idx, sem_idx, engine, live)
+        
+        line = {"index": index, "roll_no": roll_no, "success": result['success']}
+        if result['success']:
+            line['data'] = result['data']
+        else:
+            line['error'] = result.get('error', 'Unknown error')
+        return line
+        
+    except Exception as e:
+        if not handed_over:
+            _release_live(engine, live)
+        return {"index": index, "roll_no": roll_no, "success": False, "error": str(e)}
+
+
+def _release_live(engine, live):
+    """Hand back a claimed login (_take_live_session) that won't be scraped"""
+    if live:
+        _release_handle(engine, live.get('portal') or live.get('driver'))
+
+
+def _take_live_session(token, roll_no):
+    """
+    Claim the parked login for `token`
+    
+    Returns:
+        tuple: (engine, live kwargs for scrape_attendance, error, HTTP status)
+    """
+    portal_session = session_store.take(token)
+    
+    if portal_session is None:
+        return None, {}, "Session expired, request a new CAPTCHA", 410
+    
+    if portal_session.roll_no != roll_no:
+        _release_handle(portal_session.engine, portal_session.handle)
+        return None, {}, "Session belongs to a different roll_no", 403
+    
+    if portal_session.engine == 'http':
+        return portal_session.engine, {'portal': portal_session.handle}, None, None
+    return portal_session.engine, {'driver': portal_session.handle}, None, None
+
+
+@app.route('/api/history', methods=['POST'])
+def get_history():
+    """
+    Attendance history from earlier scrapes, served from the local store
+    
+    Request:
+    {
+        "roll_no": "202300123",
+        "password": "password",
+        "semester": 0,              (optional)
+        "subject_code": "ITITC601", (optional)
+        "since": 1760000000,        (optional, Unix time)
+        "until": 1770000000,        (optional)
+        "limit": 500                (optional, newest rows only)
+    }
+    
+    Response:
+    {
+        "success": true,
+        "rows": [{"roll_no": ..., "subject_code": ..., "classes_present": ..., "scraped_at": ...}, ...]
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    roll_no = data.get('roll_no')
+    password = data.get('password')
+    
+    if not all([roll_no, password]):
+        return jsonify({
+            "success": False,
+            "error": "Missing required fields"
+        }), 400
+    
+    filters = {}
+    for field, integer in (('semester', True), ('since', False), ('until', False), ('limit', True)):
+        try:
+            filters[field] = _number(data.get(field), integer)
+        except ValueError:
+            return jsonify({
+                "success": False,
+                "error": f"{field} must be {'an integer' if integer else 'a number'}"
+            }), 400
+    if filters['limit'] is not None and filters['limit'] < 1:
+        return jsonify({
+            "success": False,
+            "error": "limit must be at least 1"
+        }), 400
+    
+    try:
+        rows = history_store.history(
+            roll_no,
+            password=password,
+            semester_idx=filters['semester'],
+            subject_code=data.get('subject_code'),
+            since=filters['since'],
+            until=filters['until'],
+            limit=filters['limit'],
+        )
+    except Exception as e:
+        print(f"❌ History error: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+    
+    return jsonify({
+        "success": True,
+        "rows": rows
+    }), 200
+
+
+@app.route('/api/export', methods=['GET'])
+def export_history():
+    """
+    Stream every stored attendance row as a download
+    
+    Query: format=csv|xlsx|parquet (default csv), since / until (Unix time)
+    Header: Authorization: Bearer <EXPORT_TOKEN>
+    
+    Rows are read from the history store in batches and written out as
+    they come (Parquet one row group at a time), so memory stays flat
+    however much is exported. XLSX is built on disk through openpyxl's
+    write-only mode and only starts downloading once every row is in.
+    """
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    if not EXPORT_TOKEN or not hmac.compare_digest(supplied, EXPORT_TOKEN):
+        return jsonify({
+            "success": False,
+            "error": "Export is disabled or the token is wrong"
+        }), 403
+    
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in FORMATS:
+        return jsonify({
+            "success": False,
+            "error": f"format must be one of {', '.join(FORMATS)}"
+        }), 400
+    
+    try:
+        since = request.args.get('since', type=float)
+        until = request.args.get('until', type=float)
+        chunks = exporter(fmt)(history_store.iter_rows(since=since, until=until))
+    except ImportError as e:
+        return jsonify({
+            "success": False,
+            "error": f"{fmt} export is not available: {e}"
+        }), 501
+    
+    mimetype, extension = FORMATS[fmt]
+    filename = f"attendance_history_{time.strftime('%Y%m%d_%H%M%S')}.{extension}"
+    print(f"📤 Exporting history as {fmt}")
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Poll a queued scrape
+    
+    Response:
+    {
+        "job_id": "abc",
+        "status": "queued" | "running" | "done" | "failed",
+        "position": 2,              (while queued)
+        "result": {...}             (scrape_attendance result, once done)
+    }
+    """
+    job = job_queue.get(job_id)
+    
+    if job is None:
+        return jsonify({
+            "success": False,
+            "error": "Unknown or expired job"
+        }), 404
+    
+    return jsonify(job.to_dict(position=job_queue.position(job))), 200
+
+
+def _run_scrape(roll_no, password, captcha, year_idx, sem_idx, engine, live, since=None, terms=None):
+    """Job body: scrape on a worker thread and cache the result (each term's, with `terms`)"""
+    
+    # CAPTCHA solver
+    def captcha_solver(driver):
+        return captcha
+    
+    timer = StepTimer()
+    result = scrape_attendance(
+        roll_no=roll_no,
+        password=password,
+        year_idx=year_idx,
+        semester_idx=sem_idx,
+        captcha_solver=captcha_solver if captcha else (None if live else ocr_solver),
+        driver_pool=driver_pool,
+        engine=engine,
+        auth_cache=auth_cache,
+        snapshots=snapshot_store,
+        terms=terms,
+        timer=timer,
+        **live
+    )
+    _observe(timer, engine, result)
+    
+    if terms:
+        for year, sem in terms:
+            term_result = result.get('results', {}).get(f"{year}_{sem}", {})
+            if term_result.get('success'):
+                result_cache.set(cache_key(roll_no, year, sem), term_result['data'], owner=(roll_no, password))
+                _record_history(roll_no, password, year, sem, term_result)
+    elif result['success']:
+        result_cache.set(cache_key(roll_no, year_idx, sem_idx), result['data'], owner=(roll_no, password))
+        _record_history(roll_no, password, year_idx, sem_idx, result)
+        
+        # The client holds the data the delta is based on: send only the changes
+        if since and result.get('delta', {}).get('base') == since:
+            result = {k: v for k, v in result.items() if k != 'data'}
+    
+    return result
+
+
+def _number(value, integer=False):
+    """
+    JSON field (number or numeric string) as an int / float; None stays
+    None. Raises ValueError for anything else, booleans included.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(value)
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(value)
+    if integer:
+        if not number.is_integer():
+            raise ValueError(value)
+        return int(number)
+    return number
+
+
+def _valid_terms(terms):
+    return isinstance(terms, list) and len(terms) > 0 and all(
+        isinstance(term, (list, tuple)) and len(term) == 2 and all(isinstance(i, int) for i in term)
+        for term in terms
+    )
+
+
+def _cached_terms(roll_no, password, terms):
+    """Cached results for every term keyed "<year>_<semester>", or None if any is missing"""
+    results = {}
+    for year, sem in terms:
+        key = cache_key(roll_no, year, sem)
+        cached = result_cache.get(key, owner=(roll_no, password))
+        if cached is None:
+            return None
+        if cached.stale:
+            result_cache.refresh(key, lambda y=year, s=sem: _refetch(roll_no, password, y, s),
+                                 owner=(roll_no, password))
+        results[f"{year}_{sem}"] = {"success": True, "data": cached.value, "stale": cached.stale, "age": cached.age}
+    return results
+
+
+def _refetch(roll_no, password, year_idx, sem_idx):
+    """Background refresh: through the cached portal login, or a fresh OCR login if enabled"""
+    timer = StepTimer()
+    result = scrape_attendance(
+        roll_no=roll_no,
+        password=password,
+        year_idx=year_idx,
+        semester_idx=sem_idx,
+        captcha_solver=ocr_solver,
+        driver_pool=driver_pool,
+        engine=OCR_ENGINE,
+        auth_cache=auth_cache,
+        snapshots=snapshot_store,
+        timer=timer
+    )
+    _observe(timer, OCR_ENGINE, result)
+    if not result['success']:
+        return None
+    _record_history(roll_no, password, year_idx, sem_idx, result)
+    return result['data']
+
+
+def _observe(timer, engine, result):
+    """Feed a finished scrape's spans into the /api/metrics histograms"""
+    outcome = 'success' if result['success'] else 'failure'
+    if result.get('session_reused'):
+        outcome = 'session_reused'
+    metrics.observe_scrape(timer, engine, outcome)
+
+
+def _record_history(roll_no, password, year_idx, sem_idx, result):
+    """Append a scrape to the history store; a failure here never fails the scrape"""
+    try:
+        history_store.append(roll_no, year_idx, sem_idx, result['data'], password=password, source='api')
+    except Exception as e:
+        print(f"⚠️  Could not record history: {e}")
+
+
 if __name__ == '__main__':
     print("\n" + "="*60)
     print("🎓 ATTENDANCE DASHBOARD API v2.0")
@@ -195,13 +931,23 @@ if __name__ == '__main__':
     print("\n📋 Endpoints:")
     print("  GET  /api/health          - Health check")
     print("  POST /api/captcha         - Get CAPTCHA image")
-    print("  POST /api/attendance      - Get attendance data")
+    print("  POST /api/attendance      - Queue attendance scrape")
+    print("  POST /api/attendance/batch - Many students, streamed NDJSON")
+    print("  GET  /api/jobs/<job_id>   - Poll scrape job")
+    print("  POST /api/history         - Stored attendance history")
+    print("  GET  /api/export          - Stream history as CSV/XLSX/Parquet")
     print("\n💡 Workflow:")
     print("  1. Frontend calls /api/captcha with roll_no")
-    print("  2. API returns CAPTCHA image (base64)")
+    print("  2. API returns CAPTCHA image (base64) and a session_token")
     print("  3. User sees CAPTCHA and types it")
-    print("  4. Frontend calls /api/attendance with all data")
-    print("  5. API returns attendance data")
+    print("  4. Frontend calls /api/attendance with all data + session_token")
+    print("  5. API returns a job_id; poll /api/jobs/<job_id> for the data")
     print("="*60 + "\n")
     
+    # Only warm in the reloader child, not the watcher process
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        driver_pool.warm_async()
+        session_store.start_reaper()
+        for prefetcher in login_prefetchers.values():
+            prefetcher.start()
     app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+attendance_parser
+Single parser for the IMS "My Attendance" page, shared by the API and the
+CLI scripts
+
+    from attendance_parser import parse_attendance
+
+    report = parse_attendance(html)
+    report.records()          # API dicts (subject_code, subject_name, ...)
+    report.subjects[0].name   # typed access
+    extract_timeline(report)  # per-day NumPy grid (see timeline.py)
+"""
+
+from .models import AttendanceReport, DayRow, SubjectAttendance
+from .parser import parse_attendance
+from .timeline import AttendanceTimeline, extract_timeline
+
+__all__ = [
+    'AttendanceReport',
+    'AttendanceTimeline',
+    'DayRow',
+    'SubjectAttendance',
+    'extract_timeline',
+    'parse_attendance',
+]
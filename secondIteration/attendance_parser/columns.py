@@ -0,0 +1,37 @@
+"""
+columns.py
+Records keyed by the CLI scripts' CSV column names, for 01_virtual_py/nsu3.py
+"""
+
+from .parser import parse_attendance
+
+
+def extract_attendance_table_enhanced(html, debug=True):
+    """
+    Parse the attendance page with the shared attendance_parser package
+    Returns records keyed by nsu3.py's CSV column names
+    """
+    report = parse_attendance(html)
+    
+    if debug:
+        print("\n" + "="*80)
+        print("🔍 DEBUG: Parsed attendance page")
+        print("="*80)
+        print(f"   Student: {report.student_name} ({report.roll_no}), Semester {report.semester}")
+        print(f"   📋 Subject codes: {report.codes}")
+        print(f"   📅 Day rows: {len(report.days)}")
+    
+    attendance_data = [{
+        'Subject Code': subject.code,
+        'Subject Name': subject.name,
+        'Classes Present': subject.present,
+        'Classes Absent': subject.absent,
+        'Total Classes': subject.classes,
+        'Attendance %': subject.percentage,
+    } for subject in report.subjects]
+    
+    if debug:
+        print(f"\n✅ FINAL: Extracted {len(attendance_data)} total records")
+        print("="*80)
+    
+    return attendance_data
@@ -0,0 +1,90 @@
+"""
+models.py
+Typed results returned by parse_attendance
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class SubjectAttendance:
+    """
+    One subject column of the attendance table
+
+    `total_*` come from the "Total ..." rows (or P/A rows on older pages),
+    `overall_*` from the "Overall ..." rows; None means the row was absent.
+    """
+    code: str
+    name: str = 'Unknown'
+    total_classes: Optional[int] = None
+    total_absent: Optional[int] = None
+    total_present: Optional[int] = None
+    overall_classes: Optional[int] = None
+    overall_absent: Optional[int] = None
+    overall_present: Optional[int] = None
+    overall_percentage: Optional[float] = None
+
+    @property
+    def present(self):
+        return _first(self.overall_present, self.total_present, 0)
+
+    @property
+    def absent(self):
+        return _first(self.overall_absent, self.total_absent, 0)
+
+    @property
+    def classes(self):
+        return _first(self.overall_classes, self.total_classes, self.present + self.absent)
+
+    @property
+    def percentage(self):
+        if self.overall_percentage is not None:
+            return self.overall_percentage
+        classes = self.classes
+        return round(self.present / classes * 100, 2) if classes > 0 else 0
+
+    def record(self):
+        """Dict in the API's attendance format"""
+        return {
+            'subject_code': self.code,
+            'subject_name': self.name,
+            'classes_present': self.present,
+            'classes_absent': self.absent,
+            'total_classes': self.classes,
+            'attendance_percentage': self.percentage,
+        }
+
+
+@dataclass
+class DayRow:
+    """One date row: the raw mark per subject column ('', '0', '1', '1+1', 'GH', ...)"""
+    date: str
+    marks: Tuple[str, ...]
+
+
+@dataclass
+class AttendanceReport:
+    student_name: Optional[str] = None
+    roll_no: Optional[str] = None
+    semester: Optional[int] = None
+    subjects: List[SubjectAttendance] = field(default_factory=list)
+    days: List[DayRow] = field(default_factory=list)
+
+    @property
+    def codes(self):
+        return [subject.code for subject in self.subjects]
+
+    def records(self):
+        """List of API attendance dicts, one per subject"""
+        return [subject.record() for subject in self.subjects]
+
+    def __bool__(self):
+        return bool(self.subjects)
+
+
+def _first(*values):
+    for value in values:
+        if value is not None:
+            return value
+    return None
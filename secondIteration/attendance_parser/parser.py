@@ -0,0 +1,139 @@
+"""
+parser.py
+One pass over the page's rows, classifying each by its first cell
+"""
+
+from lxml import etree, html as lxml_html
+
+from .models import AttendanceReport, DayRow, SubjectAttendance
+from .plan import (
+    DAY_RE,
+    HEADER_LABEL,
+    PERCENT_RE,
+    ROW_FIELDS,
+    STUDENT_RE,
+    SUBJECT_CODE_RE,
+    SUBJECT_NAME_RE,
+)
+
+
+def parse_attendance(html):
+    """
+    Parse an IMS My Attendance page (the `data` frame)
+
+    Handles the current layout (Days header, one row per date, Total /
+    Overall summary rows, CODE-Name legend) and the older one with P / A
+    summary rows. Only the first attendance grid on the page is read.
+
+    Args:
+        html (str | bytes): Page source
+
+    Returns:
+        AttendanceReport: Empty (falsy) if no attendance grid was found,
+            including for a blank page
+    """
+    report = AttendanceReport()
+    root = _parse_html(html)
+    if root is None:
+        return report
+
+    subjects = None
+    names = {}
+
+    for row in root.iter('tr'):
+        cells = [cell for cell in row if cell.tag in ('td', 'th')]
+        if not cells:
+            continue
+
+        first = _text(cells[0])
+
+        if subjects is None:
+            if report.roll_no is None and 'Name' in first:
+                _read_student(report, first)
+
+            codes = [_text(cell) for cell in cells[1:]]
+            if first.lower() == HEADER_LABEL or any(SUBJECT_CODE_RE.match(code) for code in codes):
+                subjects = [SubjectAttendance(code) for code in codes if code]
+                report.subjects = subjects
+                continue
+
+        # Legend cells hold "CODE-Name<br>CODE-Name..."; they may sit in any row
+        if SUBJECT_NAME_RE.match(first):
+            _read_legend(cells[0], names)
+            continue
+
+        if subjects is None:
+            continue
+
+        if DAY_RE.match(first):
+            report.days.append(DayRow(first, tuple(_text(cell) for cell in cells[1:len(subjects) + 1])))
+            continue
+
+        field_name = ROW_FIELDS.get(''.join(first.split()).lower())
+        if field_name is None:
+            continue
+
+        for subject, cell in zip(subjects, cells[1:]):
+            setattr(subject, field_name, _number(_text(cell), field_name == 'overall_percentage'))
+
+    for subject in report.subjects:
+        subject.name = names.get(subject.code, subject.name)
+
+    return report
+
+
+def _parse_html(html):
+    """Root element of the page, or None for a blank (or comment-only) document"""
+    if not html or not html.strip():
+        return None
+    try:
+        try:
+            return lxml_html.fromstring(html)
+        except ValueError:
+            # str input with an XML encoding declaration
+            return lxml_html.fromstring(html.encode('utf-8'))
+    except etree.ParserError:
+        # "Document is empty"
+        return None
+
+
+def _text(cell):
+    """Cell text (no comments) with whitespace collapsed to single spaces"""
+    if len(cell) == 0:
+        # Plain text cell, the common case for date rows
+        text = cell.text
+        return ' '.join(text.split()) if text else ''
+    return ' '.join(cell.text_content().split())
+
+
+def _number(value, percentage=False):
+    if percentage:
+        match = PERCENT_RE.search(value)
+        return float(match.group(1)) if match else None
+    return int(value) if value.isdigit() else 0
+
+
+def _read_student(report, text):
+    match = STUDENT_RE.search(text)
+    if match:
+        report.student_name = match.group('name').strip()
+        report.roll_no = match.group('roll_no').strip()
+        report.semester = int(match.group('semester'))
+
+
+def _read_legend(cell, names):
+    """
+    Split a legend cell on its text nodes; a node that doesn't start with a
+    code continues the previous subject's name (names can wrap over <br>)
+    """
+    last = None
+    for text in cell.xpath('.//text()'):
+        text = ' '.join(text.split())
+        if not text:
+            continue
+        match = SUBJECT_NAME_RE.match(text)
+        if match:
+            last = match.group(1)
+            names[last] = match.group(2)
+        elif last is not None:
+            names[last] = f'{names[last]} {text}'
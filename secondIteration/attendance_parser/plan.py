@@ -0,0 +1,44 @@
+"""
+plan.py
+Everything the parser matches against, compiled once at import time
+"""
+
+import re
+
+
+# Subject codes like ITITC601, CSE301, DNCS0603
+SUBJECT_CODE_RE = re.compile(r'^[A-Z]{2,5}\d{3,4}$')
+
+# Legend lines like "ITITC601-Web Technology"
+SUBJECT_NAME_RE = re.compile(r'^([A-Z]{2,5}\d{3,4})\s*-\s*(.+)$')
+
+# Day rows like "Jan-08"
+DAY_RE = re.compile(r'^[A-Z][a-z]{2}-\d{1,2}$')
+
+# "Name: ABHISHEK (2023UIT3082), Semester : 6"
+STUDENT_RE = re.compile(r'Name\s*:\s*(?P<name>[^(]+?)\s*\((?P<roll_no>[^)]+)\).*?Semester\s*:\s*(?P<semester>\d+)')
+
+PERCENT_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+# First-cell label (lowercased, whitespace removed) -> SubjectAttendance field
+ROW_FIELDS = {
+    'totalclasses': 'total_classes',
+    'totalclass': 'total_classes',
+    'totalabsent': 'total_absent',
+    'totalpresent': 'total_present',
+    'overallclass': 'overall_classes',
+    'overallclasses': 'overall_classes',
+    'overallabsent': 'overall_absent',
+    'overallpresent': 'overall_present',
+    'overall(%)': 'overall_percentage',
+    'overall%': 'overall_percentage',
+    'attendance%': 'overall_percentage',
+    'percentage': 'overall_percentage',
+    # Older layout with plain P / A summary rows
+    'p': 'total_present',
+    'present': 'total_present',
+    'a': 'total_absent',
+    'absent': 'total_absent',
+}
+
+HEADER_LABEL = 'days'
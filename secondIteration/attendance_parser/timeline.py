@@ -0,0 +1,212 @@
+"""
+timeline.py
+Day x subject attendance grid as compact NumPy arrays, for streaks, weekly
+rates and trends without re-scraping
+
+    from attendance_parser import parse_attendance, extract_timeline
+
+    timeline = extract_timeline(parse_attendance(html), year=2025)
+    timeline.to_frame()        # pandas, (date) x (code, present|absent)
+    timeline.weekly_rates()    # attendance % per ISO week and subject
+"""
+
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .parser import parse_attendance
+
+
+MONTHS = {name: i for i, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), start=1)}
+
+
+@dataclass
+class AttendanceTimeline:
+    """
+    Per-day present / absent counts
+
+    `present[i, j]` and `absent[i, j]` are the classes attended / missed on
+    `dates[i]` in subject `codes[j]` (a "1+0" mark is one of each). Marks
+    that aren't classes (GH, TL, ...) are kept sparsely in `notes`, keyed by
+    (day index, subject index).
+    """
+    dates: np.ndarray                     # datetime64[D], one per day row
+    codes: Tuple[str, ...]
+    present: np.ndarray                   # int8, (days, subjects)
+    absent: np.ndarray                    # int8, (days, subjects)
+    notes: Dict[Tuple[int, int], str] = field(default_factory=dict)
+
+    @property
+    def classes(self):
+        return self.present + self.absent
+
+    def totals(self):
+        """{code: (present, absent)} summed over the whole timeline"""
+        present = self.present.sum(axis=0, dtype=np.int32)
+        absent = self.absent.sum(axis=0, dtype=np.int32)
+        return {code: (int(p), int(a)) for code, p, a in zip(self.codes, present, absent)}
+
+    def to_frame(self):
+        """DataFrame indexed by date with (code, present|absent) int8 columns"""
+        columns = pd.MultiIndex.from_product([self.codes, ('present', 'absent')], names=('subject', 'mark'))
+        grid = np.stack([self.present, self.absent], axis=2).reshape(len(self.dates), -1)
+        return pd.DataFrame(grid, index=pd.DatetimeIndex(self.dates, name='date'), columns=columns)
+
+    def weekly_rates(self):
+        """Attendance % per subject for each week (weeks start Monday); NaN where no classes were held"""
+        frame = self.to_frame()
+        weekly = frame.groupby(frame.index.to_period('W')).sum()
+        present = weekly.xs('present', axis=1, level='mark')
+        held = present + weekly.xs('absent', axis=1, level='mark')
+        return (present / held.where(held > 0) * 100).round(2)
+
+    def current_streaks(self):
+        """{code: n} classes attended in a row up to the latest absence, counting back from the last class"""
+        streaks = {}
+        for j, code in enumerate(self.codes):
+            held = self.classes[:, j] > 0
+            missed = np.flatnonzero(self.absent[held, j])
+            attended = self.present[held, j]
+            tail = attended[missed[-1] + 1:] if missed.size else attended
+            streaks[code] = int(tail.sum(dtype=np.int32))
+        return streaks
+
+    def diff(self, previous):
+        """
+        Day rows that differ from an earlier timeline
+
+        Returns:
+            tuple: (indices into self of new or changed days, dates in
+            `previous` that are gone). With no comparable previous timeline
+            (None, or different subjects) every day counts as changed.
+        """
+        everything = np.arange(len(self.dates))
+        if previous is None or previous.codes != self.codes:
+            return everything, np.array([], dtype='datetime64[D]')
+
+        _, mine, theirs = np.intersect1d(self.dates, previous.dates, return_indices=True)
+        changed = np.ones(len(self.dates), dtype=bool)
+        changed[mine] = ((self.present[mine] != previous.present[theirs]) |
+                         (self.absent[mine] != previous.absent[theirs])).any(axis=1)
+
+        moved = dict(zip(theirs.tolist(), mine.tolist()))
+        old_notes = {(moved[i], j): mark for (i, j), mark in previous.notes.items() if i in moved}
+        for (i, _), _ in self.notes.items() ^ old_notes.items():
+            changed[i] = True
+
+        removed = np.setdiff1d(previous.dates, self.dates)
+        return everything[changed], removed
+
+    def to_dict(self):
+        """JSON-friendly form; from_dict() restores it"""
+        return {
+            'dates': [str(d) for d in self.dates],
+            'codes': list(self.codes),
+            'present': self.present.tolist(),
+            'absent': self.absent.tolist(),
+            'notes': [[i, j, mark] for (i, j), mark in sorted(self.notes.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        n_subjects = len(data['codes'])
+        return cls(
+            dates=np.array(data['dates'], dtype='datetime64[D]'),
+            codes=tuple(data['codes']),
+            present=np.array(data['present'], dtype=np.int8).reshape(-1, n_subjects),
+            absent=np.array(data['absent'], dtype=np.int8).reshape(-1, n_subjects),
+            notes={(i, j): mark for i, j, mark in data['notes']},
+        )
+
+    def __len__(self):
+        return len(self.dates)
+
+
+def extract_timeline(page, year=None):
+    """
+    Build an AttendanceTimeline from the page's date rows
+
+    Args:
+        page (AttendanceReport | str | bytes): Parsed report or page HTML
+        year (int, optional): Year of the first date row. The page only
+            shows "Jan-08"; by default the most recent year that doesn't put
+            the last row in the future is used. Dates roll into the next
+            year when the month wraps (Dec -> Jan). Without `year`, a Feb-29
+            row moves the start to the most recent year that has one; with
+            it, a row the year can't hold gets a NaT date (see _dates).
+
+    Returns:
+        AttendanceTimeline
+    """
+    report = page if hasattr(page, 'days') else parse_attendance(page)
+    codes = tuple(report.codes)
+    n_days, n_subjects = len(report.days), len(codes)
+
+    present = np.zeros((n_days, n_subjects), dtype=np.int8)
+    absent = np.zeros((n_days, n_subjects), dtype=np.int8)
+    notes = {}
+
+    month_days = []
+    for i, day in enumerate(report.days):
+        month_days.append(_month_day(day.date))
+        for j, mark in enumerate(day.marks):
+            if not mark:
+                continue
+            for part in mark.split('+'):
+                part = part.strip()
+                if part == '1':
+                    present[i, j] += 1
+                elif part == '0':
+                    absent[i, j] += 1
+                elif part:
+                    notes[(i, j)] = mark
+
+    return AttendanceTimeline(_dates(month_days, year), codes, present, absent, notes)
+
+
+def _month_day(text):
+    """'Jan-08' -> (1, 8)"""
+    month, _, day = text.partition('-')
+    return MONTHS[month[:3].title()], int(day)
+
+
+def _dates(month_days, year):
+    """
+    Dates for the rows' (month, day) pairs. An explicit `year` is kept and
+    a row it makes impossible (Feb-29 outside a leap year) comes back as
+    NaT. The default start year skips to the most recent past one that
+    fits every row; rows that fit none come back as NaT.
+    """
+    if not month_days:
+        return np.array([], dtype='datetime64[D]')
+
+    if year is not None:
+        return np.array(_assign_years(month_days, year), dtype='datetime64[D]')
+
+    today = datetime.date.today()
+    candidates = [today.year - k for k in range(8)]
+    for candidate in candidates:
+        dates = _assign_years(month_days, candidate)
+        if None in dates or dates[-1] > today:
+            continue
+        return np.array(dates, dtype='datetime64[D]')
+
+    return np.array(_assign_years(month_days, candidates[0]), dtype='datetime64[D]')
+
+
+def _assign_years(month_days, year):
+    """Dates from `year` on, rolling over when the month wraps; None for impossible days"""
+    dates, last_month = [], None
+    for month, day in month_days:
+        if last_month is not None and month < last_month:
+            year += 1
+        last_month = month
+        try:
+            dates.append(datetime.date(year, month, day))
+        except ValueError:
+            dates.append(None)
+    return dates
@@ -3,19 +3,32 @@ attendance_scraper_api.py
 Refactored scraper that can be called by Flask API
 """
 
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import os
+
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-from bs4 import BeautifulSoup
-import re
 import traceback
 
+from attendance_parser import parse_attendance
+from driver_pool import start_driver
+from frames import (CONTENT_FRAMES, MENU_FRAMES, attendance_tables_html, find_link, find_tree_node, frame_map,
+                    learned_urls, login_failed)
+from metrics import StepTimer
+from result_cache import cache_key
+from waits import Waiter
+
+
+# Overridable to point the scraper at a stand-in portal (benchmarks/fake_ims.py)
+IMS_BASE_URL = os.getenv("IMS_BASE_URL", "https://www.imsnsit.org/imsnsit/")
 
-def scrape_attendance(roll_no, password, year_idx, semester_idx, captcha_solver=None, headless=False):
+# Frame "name" for a page loaded at the top level instead of in the frameset
+TOP_DOCUMENT = (None,)
+
+
+def scrape_attendance(roll_no, password, year_idx, semester_idx, captcha_solver=None, headless=False,
+                      driver_pool=None, wait_timeouts=None, engine="selenium", driver=None, portal=None,
+                      auth_cache=None, snapshots=None, terms=None, timer=None, profile='default'):
     """
     Scrape attendance data from IMS NSIT portal
     
@@ -26,225 +39,373 @@ def scrape_attendance(roll_no, password, year_idx, semester_idx, captcha_solver=
         semester_idx (int): Semester dropdown index (0-based)
         captcha_solver (callable, optional): Function to solve CAPTCHA, receives driver as argument
         headless (bool): Run browser in headless mode
+        driver_pool (DriverPool, optional): Borrow a warm driver instead of starting Chrome
+        wait_timeouts (dict, optional): Overrides for waits.DEFAULT_TIMEOUTS
+        engine (str): "selenium" drives Chrome; "http" replays the flow with requests
+            and falls back to Selenium if the login page can't be handled over HTTP,
+            or, on the same logged-in session, if the portal answers the form with
+            another semester. With "http" the captcha_solver receives the HttpPortal
+            instead of a driver
+        driver (WebDriver, optional): Live driver already on the login form (see
+            open_login_page); it is checked back into driver_pool, or quit, when done
+        portal (HttpPortal, optional): Live HTTP session already on the login page
+        auth_cache (AuthSessionCache, optional): Reuse a cached logged-in session for
+            this roll_no (no CAPTCHA needed) and remember the session after login; a
+            term the portal won't switch to over HTTP is fetched in a browser on it
+        snapshots (SnapshotStore, optional): Diff the page against the last scrape
+            of this roll_no / year / semester and add a 'delta'
+        terms (list, optional): (year_idx, semester_idx) pairs to fetch in one login,
+            instead of year_idx / semester_idx
+        timer (StepTimer, optional): Receives a span per step (driver start, login,
+            menu clicks, form submit, frame fetch, parse); pass one to read the
+            spans of a failed scrape too
+        profile (str): Driver profile (driver_pool.PROFILES) when this call starts
+            Chrome itself; "performance" runs headless, eager and without images,
+            CSS, fonts or third-party hosts. Pooled drivers use the pool's profile
         
     Returns:
         dict: {
             'success': bool,
             'data': list of dicts with attendance data,
+            'waits': per-step wait durations (only if success=True),
+            'timings': timer.report() (only if success=True or on a scraper error),
+            'session_reused': True when served from auth_cache,
+            'delta': SnapshotDelta.to_dict() (only with snapshots),
             'error': str (only if success=False)
         }
+        With `terms`, 'data' / 'delta' / 'error' move into 'results', a dict of
+        per-term results keyed "<year_idx>_<semester_idx>", and 'success' is
+        True if any term succeeded.
     """
     
-    options = Options()
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    if headless:
-        options.add_argument("--headless")
+    multi = terms is not None
+    terms = [tuple(term) for term in terms] if multi else [(year_idx, semester_idx)]
+    timer = timer or StepTimer()
     
-    driver = None
+    def extract_for(year, semester):
+        if snapshots is None:
+            return _extract_attendance_table
+        return _SnapshotExtractor(snapshots, cache_key(roll_no, year, semester))
     
-    try:
-        driver = webdriver.Chrome(options=options)
-        driver.maximize_window()
-        wait = WebDriverWait(driver, 10)
+    def browser_fallback(extract_for):
+        """Fetches terms the HTTP flow got another semester for (TermMismatch) in a browser"""
+        return lambda cookies, form_url, fallback_terms: _scrape_in_browser(
+            cookies, form_url, fallback_terms, extract_for, driver_pool=driver_pool, headless=headless,
+            profile=profile, wait_timeouts=wait_timeouts, timer=timer)
+    
+    if auth_cache is not None and driver is None and portal is None:
+        extractors = {term: extract_for(*term) for term in terms}
+        cached_extract_for = lambda year, semester: extractors[(year, semester)]
+        with timer.span('auth_cache'):
+            cached = auth_cache.fetch(roll_no, password, terms, cached_extract_for,
+                                      browser_fallback=browser_fallback(cached_extract_for))
+        if cached is not None:
+            results = {term: _term_result(data, extractors[term]) for term, data in cached.items()}
+            return _combine(results, multi, session_reused=True, timings=timer.report())
+    
+    if not captcha_solver and driver is None and portal is None:
+        # Don't start a browser just to discover we can't log in
+        return {
+            'success': False,
+            'error': 'CAPTCHA required but no solver provided'
+        }
+    
+    if engine == "http":
+        from http_engine import HttpPortal, scrape_attendance_http
         
+        if portal is None:
+            try:
+                with timer.span('open_login'):
+                    portal = HttpPortal().open_login()
+            except Exception:
+                # Nothing consumed yet (no CAPTCHA shown), so the browser can take over
+                portal = None
+        
+        if portal is not None:
+            return scrape_attendance_http(roll_no, password, year_idx, semester_idx,
+                                          captcha_solver=captcha_solver, portal=portal,
+                                          auth_cache=auth_cache, extract_for=extract_for,
+                                          terms=terms if multi else None, timer=timer,
+                                          browser_fallback=browser_fallback(extract_for))
+    elif engine != "selenium":
+        return {'success': False, 'error': f'Unknown engine: {engine}'}
+    
+    failed = False
+    
+    try:
         # Step 1: Login
-        driver.get("https://www.imsnsit.org/imsnsit/")
-        
-        login_link = wait.until(EC.element_to_be_clickable((By.PARTIAL_LINK_TEXT, "Student Login")))
-        login_link.click()
-        time.sleep(5)
-        
-        # Fill login form
-        driver.switch_to.frame(0)  # banner frame
-        
-        uid_input = wait.until(EC.presence_of_element_located((By.ID, "uid")))
-        uid_input.send_keys(roll_no)
-        
-        pwd_input = driver.find_element(By.ID, "pwd")
-        pwd_input.send_keys(password)
-        
-        # Handle CAPTCHA
-        if captcha_solver:
-            captcha_text = captcha_solver(driver)
+        if driver is None:
+            with timer.span('driver_start'):
+                if driver_pool:
+                    driver = driver_pool.checkout()
+                else:
+                    driver = start_driver(headless, profile)
+            waiter = Waiter(driver, wait_timeouts)
+            with timer.span('open_login'):
+                open_login_page(driver, waiter)
         else:
-            # For API, we'll need to pass CAPTCHA text
-            return {
-                'success': False,
-                'error': 'CAPTCHA required but no solver provided'
-            }
-        
-        captcha_input = driver.find_element(By.ID, "cap")
-        captcha_input.send_keys(captcha_text)
-        
-        login_button = driver.find_element(By.ID, "login")
-        login_button.click()
-        
-        time.sleep(8)
-        driver.switch_to.default_content()
-        
-        # Step 2: Navigate to My Activities
-        if not _find_and_click_link(driver, ['My Activities', 'Activities']):
-            return {'success': False, 'error': 'Could not find My Activities link'}
-        
-        time.sleep(5)
-        
-        # Step 3: Expand Attendance menu
-        if not _find_and_expand_tree_node(driver, ['Attendance']):
-            return {'success': False, 'error': 'Could not find Attendance menu'}
-        
-        time.sleep(3)
-        
-        # Step 4: Click My Attendance
-        if not _find_and_click_link(driver, ['My Attendance'], exact_match=True):
-            return {'success': False, 'error': 'Could not find My Attendance option'}
-        
-        time.sleep(5)
-        
-        # Step 5: Select Year and Semester
-        form_submitted = False
-        
-        for frame_name in ['data', 'contents', 'bottom', 'top']:
-            try:
-                driver.switch_to.default_content()
-                driver.switch_to.frame(frame_name)
-                
-                selects = driver.find_elements(By.TAG_NAME, "select")
-                
-                year_select = None
-                sem_select = None
-                
-                for select_elem in selects:
-                    select_name = (select_elem.get_attribute("name") or select_elem.get_attribute("id") or "").lower()
-                    
-                    if 'year' in select_name or 'yr' in select_name:
-                        year_select = Select(select_elem)
-                    elif 'sem' in select_name:
-                        sem_select = Select(select_elem)
-                
-                if year_select and sem_select:
-                    # Select values
-                    year_select.select_by_index(year_idx)
-                    time.sleep(1)
-                    sem_select.select_by_index(semester_idx)
-                    time.sleep(1)
-                    
-                    # Find and click submit
-                    buttons = driver.find_elements(By.TAG_NAME, "input") + driver.find_elements(By.TAG_NAME, "button")
-                    
-                    for button in buttons:
-                        button_type = button.get_attribute("type") or ""
-                        button_value = (button.get_attribute("value") or button.text or "").lower()
-                        button_name = (button.get_attribute("name") or "").lower()
-                        
-                        if 'pdf' in button_value or 'download' in button_value:
-                            continue
-                        
-                        if (button_type.lower() == "submit" and button_name == "submit") or button_value == "submit":
-                            button.click()
-                            time.sleep(5)
-                            form_submitted = True
-                            break
-                    
-                    if form_submitted:
-                        break
-                        
-            except:
-                continue
-        
-        if not form_submitted:
-            return {'success': False, 'error': 'Could not submit attendance form'}
-        
-        # Step 6: Extract attendance data
-        attendance_data = []
-        
-        for frame_name in ['data', 'contents', 'bottom', 'top']:
-            try:
-                driver.switch_to.default_content()
-                driver.switch_to.frame(frame_name)
-                
-                html = driver.page_source
-                
-                if 'attend' in html.lower() and len(html) > 500:
-                    # Parse attendance data
-                    parsed_data = _extract_attendance_table(html)
-                    
-                    if parsed_data:
-                        attendance_data.extend(parsed_data)
-                        break
-                        
-            except:
-                continue
-        
-        if not attendance_data:
-            return {'success': False, 'error': 'No attendance data found'}
+            waiter = Waiter(driver, wait_timeouts)
+            driver.switch_to.default_content()
         
-        return {
-            'success': True,
-            'data': attendance_data
-        }
+        # Fill login form; a solver with max_attempts (e.g. OcrCaptchaSolver)
+        # gets another go at the fresh CAPTCHA after a rejected login
+        attempts = getattr(captcha_solver, 'max_attempts', 1) if captcha_solver else 1
+        for attempt in range(1, attempts + 1):
+            waiter.frame(0, 'login_frame')  # banner frame
+            
+            uid_input = waiter.element((By.ID, "uid"), 'login_form')
+            uid_input.clear()
+            uid_input.send_keys(roll_no)
+            
+            pwd_input = driver.find_element(By.ID, "pwd")
+            pwd_input.clear()
+            pwd_input.send_keys(password)
+            
+            # Handle CAPTCHA
+            if captcha_solver:
+                with timer.span('captcha'):
+                    captcha_text = captcha_solver(driver)
+            else:
+                # For API, we'll need to pass CAPTCHA text
+                return {
+                    'success': False,
+                    'error': 'CAPTCHA required but no solver provided'
+                }
+            
+            captcha_input = driver.find_element(By.ID, "cap")
+            captcha_input.clear()
+            captcha_input.send_keys(captcha_text)
+            
+            login_button = driver.find_element(By.ID, "login")
+            with timer.span('login'):
+                waiter.navigation(login_button.click, 'login')
+                waiter.network_idle('login:network_idle')
+                rejected = login_failed(driver)
+            _record_captcha(captcha_solver, not rejected)
+            if not rejected:
+                break
+            if attempt == attempts:
+                return {'success': False, 'error': 'Login failed: wrong credentials or CAPTCHA'}
+        
+        # Steps 2-5: open My Attendance (straight from the URL learned on
+        # this student's last scrape when there is one, else through the
+        # menus) and submit the first year / semester
+        year_idx, semester_idx = terms[0]
+        form_url = None
+        learned_url = learned_urls.get(roll_no)
+        if learned_url:
+            with timer.span('open_attendance_url'):
+                form_url = _open_attendance_directly(driver, waiter, learned_url, year_idx, semester_idx)
+            if form_url is None:
+                learned_urls.forget(roll_no)
+        
+        if form_url is None:
+            # Step 2: Navigate to My Activities
+            with timer.span('find_and_click_link:My Activities'):
+                found = _find_and_click_link(driver, ['My Activities', 'Activities'], waiter=waiter)
+            if not found:
+                return {'success': False, 'error': 'Could not find My Activities link'}
+            
+            # Step 3: Expand Attendance menu
+            with timer.span('find_and_expand_tree_node:Attendance'):
+                found = _find_and_expand_tree_node(driver, ['Attendance'], waiter=waiter)
+            if not found:
+                return {'success': False, 'error': 'Could not find Attendance menu'}
+            
+            # Step 4: Click My Attendance
+            with timer.span('find_and_click_link:My Attendance'):
+                found = _find_and_click_link(driver, ['My Attendance'], exact_match=True, waiter=waiter)
+            if not found:
+                return {'success': False, 'error': 'Could not find My Attendance option'}
+            
+            # Step 5: Select Year and Semester
+            with timer.span('form_submit'):
+                form_url = _submit_attendance_form(driver, waiter, year_idx, semester_idx)
+            if form_url is None:
+                return {'success': False, 'error': 'Could not submit attendance form'}
+            learned_urls.remember(roll_no, form_url)
+        
+        # Step 6: Extract attendance data, then resubmit the form (it stays
+        # on the results page) for any further terms
+        results = {}
+        for i, term in enumerate(terms):
+            if i > 0:
+                with timer.span('form_submit'):
+                    submitted = _submit_attendance_form(driver, waiter, *term)
+                if submitted is None:
+                    results[term] = {'success': False, 'error': 'Could not submit attendance form'}
+                    continue
+            extract = extract_for(*term)
+            results[term] = _term_result(_read_attendance_tables(driver, extract, timer), extract)
+        
+        if auth_cache is not None and any(result['success'] for result in results.values()):
+            auth_cache.store(roll_no, password, driver.get_cookies(), form_url)
+        
+        return _combine(results, multi, waits=waiter.report(), timings=timer.report())
         
     except Exception as e:
+        failed = True
         return {
             'success': False,
             'error': f'Scraper error: {str(e)}',
-            'traceback': traceback.format_exc()
+            'traceback': traceback.format_exc(),
+            'timings': timer.report()
         }
         
     finally:
         if driver:
-            driver.quit()
+            if driver_pool:
+                driver_pool.checkin(driver, broken=failed)
+            else:
+                driver.quit()
 
 
-def _find_and_click_link(driver, keywords, frame_names=['data', 'top', 'contents', 'bottom', 'banner'], exact_match=False):
-    """Helper to find and click a link across frames"""
-    for frame_name in frame_names:
+def _submit_attendance_form(driver, waiter, year_idx, semester_idx, frame_names=CONTENT_FRAMES):
+    """
+    Pick year / semester on the My Attendance form and submit it
+    
+    Returns:
+        str: URL of the form page, or None if no form was found
+    """
+    for frame_name in frame_map.order(driver, 'attendance_form', frame_names):
         try:
             driver.switch_to.default_content()
-            driver.switch_to.frame(frame_name)
+            if frame_name:
+                driver.switch_to.frame(frame_name)
+            
+            selects = driver.find_elements(By.TAG_NAME, "select")
+            
+            year_select = None
+            sem_select = None
             
-            links = driver.find_elements(By.TAG_NAME, "a")
-            for link in links:
-                link_text = link.text.strip()
+            for select_elem in selects:
+                select_name = (select_elem.get_attribute("name") or select_elem.get_attribute("id") or "").lower()
                 
-                if exact_match:
-                    if link_text in keywords:
-                        link.click()
-                        return True
-                else:
-                    if any(keyword.lower() in link_text.lower() for keyword in keywords):
-                        link.click()
-                        return True
+                if 'year' in select_name or 'yr' in select_name:
+                    year_select = Select(select_elem)
+                elif 'sem' in select_name:
+                    sem_select = Select(select_elem)
+            
+            if not (year_select and sem_select):
+                continue
+            
+            if frame_name:
+                frame_map.remember(driver, 'attendance_form', frame_name)
+            form_url = driver.execute_script("return document.location.href")
+            
+            # Select values
+            year_select.select_by_index(year_idx)
+            waiter.settled('select_year')
+            sem_select.select_by_index(semester_idx)
+            waiter.settled('select_semester')
+            
+            # Find and click submit
+            buttons = driver.find_elements(By.TAG_NAME, "input") + driver.find_elements(By.TAG_NAME, "button")
+            
+            for button in buttons:
+                button_type = button.get_attribute("type") or ""
+                button_value = (button.get_attribute("value") or button.text or "").lower()
+                button_name = (button.get_attribute("name") or "").lower()
+                
+                if 'pdf' in button_value or 'download' in button_value:
+                    continue
+                
+                if (button_type.lower() == "submit" and button_name == "submit") or button_value == "submit":
+                    waiter.navigation(button.click, 'submit_form')
+                    return form_url
+                    
+        except:
+            continue
+    
+    return None
+
+
+def _open_attendance_directly(driver, waiter, url, year_idx, semester_idx):
+    """
+    Load a learned My Attendance URL into the form's frame and submit it,
+    skipping the menus
+    
+    Returns:
+        str: URL of the form page, or None to fall back to the menu walk
+    """
+    frame_name = frame_map.order(driver, 'attendance_form')[0]
+    
+    try:
+        driver.switch_to.default_content()
+        waiter.navigation(
+            lambda: driver.execute_script("window.top.frames[arguments[0]].location.href = arguments[1];",
+                                          frame_name, url),
+            'open_attendance_url',
+        )
+    except Exception:
+        return None
+    
+    return _submit_attendance_form(driver, waiter, year_idx, semester_idx)
+
+
+def open_login_page(driver, waiter):
+    """Load the portal and click through to the Student Login frameset"""
+    driver.get(IMS_BASE_URL)
+    
+    login_link = waiter.element((By.PARTIAL_LINK_TEXT, "Student Login"), 'student_login_link', clickable=True)
+    waiter.navigation(login_link.click, 'student_login')
+
+
+def _find_and_click_link(driver, keywords, frame_names=MENU_FRAMES, exact_match=False, waiter=None):
+    """
+    Helper to find and click a link across frames, waiting for the load it triggers
+    
+    One script call per frame finds the link and its text; the frame it
+    was found in is tried first next time.
+    """
+    role = f"link:{'|'.join(keywords)}"
+    for frame_name in frame_map.order(driver, role, frame_names):
+        try:
+            driver.switch_to.default_content()
+            driver.switch_to.frame(frame_name)
+            
+            found = find_link(driver, keywords, exact_match)
+            if not found:
+                continue
+            
+            link, link_text = found
+            frame_map.remember(driver, role, frame_name)
+            if waiter:
+                waiter.navigation(link.click, f'click:{link_text}')
+            else:
+                link.click()
+            return True
+        except TimeoutException:
+            raise
         except:
             continue
     return False
 
 
-def _find_and_expand_tree_node(driver, text_keywords, frame_names=['data', 'top', 'contents', 'bottom', 'banner']):
-    """Find and expand a tree node (for menu items)"""
-    for frame_name in frame_names:
+def _find_and_expand_tree_node(driver, text_keywords, frame_names=MENU_FRAMES, waiter=None):
+    """Find and expand a tree node (for menu items), waiting for the toggle"""
+    role = f"tree:{'|'.join(text_keywords)}"
+    for frame_name in frame_map.order(driver, role, frame_names):
         try:
             driver.switch_to.default_content()
             driver.switch_to.frame(frame_name)
             
-            hitareas = driver.find_elements(By.CLASS_NAME, "hitarea")
+            found = find_tree_node(driver, text_keywords)
+            if not found:
+                continue
             
-            for hitarea in hitareas:
-                classes = hitarea.get_attribute("class") or ""
-                
-                if "expandable-hitarea" in classes:
-                    try:
-                        parent = hitarea.find_element(By.XPATH, "./..")
-                        text = parent.text.strip()
-                        
-                        if any(keyword.lower() in text.lower() for keyword in text_keywords):
-                            hitarea.click()
-                            time.sleep(2)
-                            driver.switch_to.default_content()
-                            return True
-                    except:
-                        continue
-                        
+            hitarea, text = found
+            frame_map.remember(driver, role, frame_name)
+            hitarea.click()
+            if waiter:
+                waiter.until(
+                    lambda d: 'collapsable-hitarea' in (hitarea.get_attribute("class") or ""),
+                    f'expand:{text}',
+                )
+            driver.switch_to.default_content()
+            return True
+        except TimeoutException:
+            raise
         except:
             continue
     
@@ -256,99 +417,142 @@ def _extract_attendance_table(html):
     Extract attendance data from HTML
     Returns list of dicts with attendance info
     """
-    soup = BeautifulSoup(html, 'html.parser')
-    tables = soup.find_all('table')
-    
-    attendance_data = []
-    
-    for table in tables:
-        rows = table.find_all('tr')
-        
-        # Find header row with subject codes
-        header_row = None
-        header_row_idx = -1
-        
-        for row_idx, row in enumerate(rows):
-            cells = row.find_all(['td', 'th'])
-            cell_texts = [cell.get_text(strip=True) for cell in cells]
-            
-            # Look for subject codes (pattern: ITITC601, CSE301, etc.)
-            has_subject_codes = any(
-                bool(re.match(r'^[A-Z]{2,4}[A-Z]?\d{3,4}$', text)) 
-                for text in cell_texts
-            )
+    return parse_attendance(html).records()
+
+
+def _record_captcha(captcha_solver, success):
+    """Tell a solver that tracks accuracy (OcrCaptchaSolver) how its answer did"""
+    record = getattr(captcha_solver, 'record', None)
+    if record:
+        record(success)
+
+
+def _read_attendance_tables(driver, extract, timer=None, frame_names=CONTENT_FRAMES):
+    """
+    Records from the attendance tables, fetched from the frame they were
+    last found in first (normally 'data'); only the tables come over the wire
+    """
+    timer = timer or StepTimer()
+    for frame_name in frame_map.order(driver, 'attendance_table', frame_names):
+        try:
+            driver.switch_to.default_content()
+            if frame_name:
+                driver.switch_to.frame(frame_name)
             
-            if has_subject_codes or 'Days' in cell_texts:
-                header_row = cell_texts
-                header_row_idx = row_idx
-                break
-        
-        if not header_row:
-            continue
-        
-        # Extract subject codes
-        subject_codes = []
-        for i, cell in enumerate(header_row):
-            if i == 0:
+            with timer.span('frame_fetch'):
+                html = attendance_tables_html(driver)
+            if not html:
                 continue
-            if re.match(r'^[A-Z]{2,4}[A-Z]?\d{3,4}$', cell):
-                subject_codes.append(cell)
-        
-        if not subject_codes:
+            
+            with timer.span('parse'):
+                parsed_data = extract(html)
+            if parsed_data:
+                if frame_name:
+                    frame_map.remember(driver, 'attendance_table', frame_name)
+                return parsed_data
+                    
+        except:
             continue
-        
-        # Find subject names (usually 2 rows after header)
-        subject_names = {}
-        for row_offset in [1, 2]:
-            if header_row_idx + row_offset < len(rows):
-                name_row = rows[header_row_idx + row_offset]
-                name_cells = name_row.find_all(['td', 'th'])
-                
-                for i, code in enumerate(subject_codes):
-                    if i + 1 < len(name_cells):
-                        name = name_cells[i + 1].get_text(strip=True)
-                        if name and not name.isdigit():
-                            subject_names[code] = name
-        
-        # Find attendance data (Present/Absent rows)
-        attendance_rows = {'P': {}, 'A': {}}
-        
-        for row in rows[header_row_idx:]:
-            cells = row.find_all(['td', 'th'])
-            if len(cells) < 2:
+    
+    return []
+
+
+def _scrape_in_browser(cookies, form_url, terms, extract_for, driver_pool=None, headless=False,
+                       profile='default', wait_timeouts=None, timer=None):
+    """
+    Fetch `terms` in a browser on a portal session that is already logged
+    in (HttpPortal cookies), for when the HTTP engine can't get the portal
+    to switch terms. The My Attendance form page is loaded at the top
+    level and each term picked through the real dropdowns.
+    
+    Returns:
+        dict: {(year_idx, semester_idx): term result}
+    """
+    timer = timer or StepTimer()
+    driver = None
+    failed = False
+    
+    try:
+        with timer.span('driver_start'):
+            driver = driver_pool.checkout() if driver_pool else start_driver(headless, profile)
+        waiter = Waiter(driver, wait_timeouts)
+        
+        with timer.span('open_attendance_url'):
+            # Cookies can only be set on a page of their own site
+            driver.get(IMS_BASE_URL)
+            for cookie in cookies:
+                driver.add_cookie({'name': cookie['name'], 'value': cookie['value'],
+                                   'path': cookie.get('path') or '/'})
+            driver.get(form_url)
+            waiter.settled('open_attendance_url')
+        
+        results = {}
+        for term in terms:
+            with timer.span('form_submit'):
+                submitted = _submit_attendance_form(driver, waiter, *term, frame_names=TOP_DOCUMENT)
+            if submitted is None:
+                results[term] = {'success': False, 'error': 'Could not submit attendance form'}
                 continue
-            
-            first_cell = cells[0].get_text(strip=True)
-            
-            if first_cell in ['P', 'Present']:
-                for i, code in enumerate(subject_codes):
-                    if i + 1 < len(cells):
-                        val = cells[i + 1].get_text(strip=True)
-                        attendance_rows['P'][code] = int(val) if val.isdigit() else 0
-                        
-            elif first_cell in ['A', 'Absent']:
-                for i, code in enumerate(subject_codes):
-                    if i + 1 < len(cells):
-                        val = cells[i + 1].get_text(strip=True)
-                        attendance_rows['A'][code] = int(val) if val.isdigit() else 0
-        
-        # Build final data
-        for code in subject_codes:
-            present = attendance_rows['P'].get(code, 0)
-            absent = attendance_rows['A'].get(code, 0)
-            total = present + absent
-            percentage = round((present / total * 100), 2) if total > 0 else 0
-            
-            attendance_data.append({
-                'subject_code': code,
-                'subject_name': subject_names.get(code, 'Unknown'),
-                'classes_present': present,
-                'classes_absent': absent,
-                'total_classes': total,
-                'attendance_percentage': percentage
-            })
+            extract = extract_for(*term)
+            results[term] = _term_result(_read_attendance_tables(driver, extract, timer, TOP_DOCUMENT), extract)
+        return results
+    
+    except Exception as e:
+        failed = True
+        return {term: {'success': False, 'error': f'Scraper error: {str(e)}'} for term in terms}
+    
+    finally:
+        if driver:
+            if driver_pool:
+                driver_pool.checkin(driver, broken=failed)
+            else:
+                driver.quit()
+
+
+class _SnapshotExtractor:
+    """Extractor that goes through the snapshot store, keeping the page's delta"""
+    
+    def __init__(self, snapshots, key):
+        self.snapshots = snapshots
+        self.key = key
+        self.delta = None
+    
+    def __call__(self, html):
+        change = self.snapshots.update(self.key, html)
+        if change is None:
+            return []
+        self.delta = change.to_dict()
+        return change.records
+
+
+def _term_result(data, extract):
+    """Result for one year / semester"""
+    if not data:
+        return {'success': False, 'error': 'No attendance data found'}
+    result = {'success': True, 'data': data}
+    delta = getattr(extract, 'delta', None)
+    if delta:
+        result['delta'] = delta
+    return result
+
+
+def _combine(results, multi, **extra):
+    """
+    Per-term results -> scrape_attendance result: the single term's own
+    result, or {'success', 'results'} keyed "<year_idx>_<semester_idx>"
+    """
+    if not multi:
+        result = next(iter(results.values()))
+        if result['success']:
+            result.update(extra)
+        return result
     
-    return attendance_data
+    combined = {
+        'success': any(result['success'] for result in results.values()),
+        'results': {f"{year}_{semester}": result for (year, semester), result in results.items()},
+    }
+    combined.update(extra)
+    return combined
 
 
 # For testing
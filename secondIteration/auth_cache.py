@@ -0,0 +1,214 @@
+"""
+auth_cache.py
+Cache of logged-in portal sessions, so repeat fetches for a student skip
+the CAPTCHA and the whole menu walk
+"""
+
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from bs4 import BeautifulSoup
+from cryptography.fernet import Fernet, InvalidToken
+
+from http_engine import HttpPortal, HttpPortalError, TermMismatch
+
+
+class _AuthEntry:
+    def __init__(self, password_digest, cookie_blob, attendance_url):
+        self.password_digest = password_digest
+        self.cookie_blob = cookie_blob
+        self.attendance_url = attendance_url
+        self.last_used = time.monotonic()
+
+
+class AuthSessionCache:
+    """
+    LRU cache of authenticated portal cookies keyed by roll number
+
+    Cookies are kept Fernet-encrypted with a per-process key, and a
+    cached session is only handed out to a caller presenting the same
+    password that created it. Entries idle for longer than
+    `idle_timeout` are assumed dead on the portal side and dropped
+    without a round trip; younger ones are re-validated with a single GET
+    of the My Attendance page (the `data` frame) before use.
+
+    Args:
+        max_entries (int): LRU capacity
+        idle_timeout (float): Seconds after which the portal session is
+            considered expired
+    """
+
+    def __init__(self, max_entries=50, idle_timeout=900):
+        self.max_entries = max_entries
+        self.idle_timeout = idle_timeout
+
+        self._fernet = Fernet(Fernet.generate_key())
+        self._secret = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def store(self, roll_no, password, cookies, attendance_url):
+        """
+        Remember a freshly logged-in session
+
+        Args:
+            roll_no (str): Student roll number
+            password (str): Password the session was opened with
+            cookies (list): Cookie dicts (Selenium get_cookies() format)
+            attendance_url (str): URL of the My Attendance form page
+        """
+        if not cookies or not attendance_url:
+            return
+
+        blob = self._fernet.encrypt(json.dumps(cookies).encode('utf-8'))
+        entry = _AuthEntry(self._digest(roll_no, password), blob, attendance_url)
+
+        with self._lock:
+            self._entries[roll_no] = entry
+            self._entries.move_to_end(roll_no)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def has(self, roll_no):
+        """True if a non-idle session is cached (does not validate it)"""
+        with self._lock:
+            entry = self._entries.get(roll_no)
+            return entry is not None and not self._idle(entry)
+
+    def invalidate(self, roll_no):
+        with self._lock:
+            self._entries.pop(roll_no, None)
+
+    def portal(self, roll_no, password):
+        """
+        HttpPortal restored from the cache and already on the My Attendance
+        form, or None if there is no usable session
+        """
+        with self._lock:
+            entry = self._entries.get(roll_no)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self._idle(entry):
+                del self._entries[roll_no]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            if not hmac.compare_digest(entry.password_digest, self._digest(roll_no, password)):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(roll_no)
+
+        try:
+            cookies = json.loads(self._fernet.decrypt(entry.cookie_blob))
+        except InvalidToken:
+            self.invalidate(roll_no)
+            self.misses += 1
+            return None
+
+        portal = HttpPortal()
+        portal.add_cookies(cookies)
+
+        try:
+            html = portal.resume_attendance_form(entry.attendance_url)
+        except requests.RequestException:
+            self.invalidate(roll_no)
+            self.misses += 1
+            return None
+
+        if not _is_logged_in(html):
+            self.invalidate(roll_no)
+            self.misses += 1
+            return None
+
+        entry.last_used = time.monotonic()
+        self.hits += 1
+        return portal
+
+    def fetch(self, roll_no, password, terms, extract_for, browser_fallback=None):
+        """
+        Scrape through a cached session
+
+        Args:
+            terms (list): (year_idx, semester_idx) pairs, all fetched on the session
+            extract_for (callable): (year_idx, semester_idx) -> extractor
+                (html -> attendance records)
+            browser_fallback (callable, optional): (cookies, form URL, terms) ->
+                {term: result}, as for scrape_attendance_http; fetches the terms
+                the portal answers with another semester (TermMismatch) on this
+                same session. Without one those terms come back empty
+
+        Returns:
+            dict: {(year_idx, semester_idx): records}, or None on a cache miss
+        """
+        portal = self.portal(roll_no, password)
+        if portal is None:
+            return None
+
+        records = {}
+        mismatched = []
+        try:
+            for term in terms:
+                try:
+                    html = portal.submit_attendance_form(*term)
+                except TermMismatch:
+                    # The session is still logged in; only the term switch
+                    # needs a browser
+                    mismatched.append(term)
+                    continue
+                records[term] = extract_for(*term)(html)
+        except (HttpPortalError, requests.RequestException):
+            self.invalidate(roll_no)
+            return None
+
+        if records and not any(records.values()):
+            # Logged out between validation and submit, or only empty
+            # semesters; either way let the full flow decide
+            self.invalidate(roll_no)
+            return None
+
+        if mismatched:
+            fetched = browser_fallback(portal.cookies(), portal.attendance_url, mismatched) if browser_fallback else {}
+            for term in mismatched:
+                records[term] = fetched.get(term, {}).get('data') or []
+
+        self.store(roll_no, password, portal.cookies(), portal.attendance_url)
+        return {term: records[term] for term in terms}
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return {
+            'size': size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def _idle(self, entry):
+        return time.monotonic() - entry.last_used > self.idle_timeout
+
+    def _digest(self, roll_no, password):
+        return hmac.new(self._secret, f'{roll_no}\0{password}'.encode('utf-8'), hashlib.sha256).digest()
+
+
+def _is_logged_in(html):
+    """The My Attendance page carries the year/semester form only when logged in"""
+    soup = BeautifulSoup(html, 'html.parser')
+    if soup.find('input', id='uid'):
+        return False
+    return soup.find('select', attrs={'name': 'year'}) is not None and \
+        soup.find('select', attrs={'name': 'sem'}) is not None
+
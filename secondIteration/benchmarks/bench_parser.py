@@ -0,0 +1,63 @@
+"""
+bench_parser.py
+Time attendance_parser.parse_attendance against the parsers it replaced,
+on the saved attendance page
+
+Usage (from secondIteration/):
+    python benchmarks/bench_parser.py [--repeat 200] [--html ../data_files/attendance_data.html]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from attendance_parser import parse_attendance
+from legacy_parsers import (
+    _extract_attendance_table,
+    extract_attendance_table,
+    extract_attendance_table_enhanced,
+    parse_ims_attendance,
+)
+
+
+DEFAULT_HTML = os.path.join(HERE, '..', '..', 'data_files', 'attendance_data.html')
+
+PARSERS = [
+    ('attendance_parser', lambda html: parse_attendance(html).records()),
+    ('api bs4 (legacy)', _extract_attendance_table),
+    ('nsu3 enhanced (legacy)', lambda html: extract_attendance_table_enhanced(html, debug=False)),
+    ('nsut2 (legacy)', extract_attendance_table),
+    ('lms parser (legacy)', lambda html: parse_ims_attendance(html, debug=False)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--html', default=DEFAULT_HTML, help='Saved attendance frame HTML')
+    parser.add_argument('--repeat', type=int, default=200, help='Parses per timing run')
+    args = parser.parse_args()
+
+    with open(args.html, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    print(f"📄 {os.path.basename(args.html)}: {len(html):,} chars, {args.repeat} parses per run\n")
+
+    timings = {}
+    for name, func in PARSERS:
+        records = func(html)
+        best = min(timeit.repeat(lambda: func(html), number=args.repeat, repeat=5))
+        timings[name] = best / args.repeat
+        print(f"  {name:<24} {timings[name] * 1000:8.3f} ms/parse   {len(records)} records")
+
+    baseline = timings['attendance_parser']
+    print()
+    for name, _ in PARSERS[1:]:
+        print(f"🚀 {timings[name] / baseline:5.1f}x faster than {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+bench_scrape.py
+End-to-end scraper benchmark against the local IMS stand-in (fake_ims.py)
+
+Every engine / driver profile / concurrency combination runs in a fresh
+worker process, so the reported peak RSS belongs to that scenario alone
+(Chrome's own processes are counted separately as children). Requests
+per scrape show what a profile keeps off the wire.
+
+Usage (from secondIteration/):
+    python benchmarks/bench_scrape.py [--engines http,selenium,parser] [--users 1,4,8]
+                                      [--scrapes 20] [--latency 50] [--jitter 0]
+                                      [--profiles default,performance]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+sys.path.insert(0, HERE)
+
+from fake_ims import DEFAULT_CAPTCHA_ANSWER, FakePortal, serve_in_thread
+
+
+ROLL_NO = '2023UIT3082'
+PASSWORD = 'benchmark'
+
+# Year / semester picked on the saved My Attendance form
+YEAR_IDX, SEMESTER_IDX = 1, 5
+
+
+def run_scenario(base_url, engine, users, scrapes, profile='default'):
+    """
+    Worker process body: `scrapes` scrapes spread over `users` threads
+
+    Returns:
+        dict: latencies (s), wall time (s), failures, mean span per step,
+            worker and children peak RSS (MB)
+    """
+    os.environ['IMS_BASE_URL'] = base_url
+    # Let the pool start one browser per user unless a cap was asked for
+    os.environ.setdefault('MAX_BROWSERS', str(users))
+
+    from attendance_parser import parse_attendance
+    from attendance_scraper_api import scrape_attendance
+    from metrics import StepTimer
+
+    pool = None
+    if engine == 'selenium':
+        from driver_pool import DriverPool
+        pool = DriverPool(size=users, headless=True, profile=profile)
+        pool.warm()
+
+    page = None
+    if engine == 'parser':
+        from fake_ims import DATA_DIR
+        with open(os.path.join(DATA_DIR, 'attendance_data.html'), 'r', encoding='utf-8') as f:
+            page = f.read()
+
+    def one(_):
+        timer = StepTimer()
+        if engine == 'parser':
+            with timer.span('parse'):
+                ok = bool(parse_attendance(page).records())
+        else:
+            result = scrape_attendance(ROLL_NO, PASSWORD, YEAR_IDX, SEMESTER_IDX,
+                                       captcha_solver=lambda handle: DEFAULT_CAPTCHA_ANSWER,
+                                       engine=engine, driver_pool=pool, timer=timer)
+            ok = result['success']
+        return ok, time.perf_counter() - timer.started, timer.spans
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as executor:
+            outcomes = list(executor.map(one, range(scrapes)))
+        wall = time.perf_counter() - started
+    finally:
+        if pool is not None:
+            pool.close()
+
+    steps = defaultdict(list)
+    for _, _, spans in outcomes:
+        for step, seconds in spans:
+            steps[step].append(seconds)
+
+    return {
+        'latencies': [latency for ok, latency, _ in outcomes if ok],
+        'failures': sum(1 for ok, _, _ in outcomes if not ok),
+        'wall': wall,
+        'steps': {step: statistics.mean(values) for step, values in steps.items()},
+        'rss_mb': _max_rss_mb(resource.RUSAGE_SELF),
+        'children_rss_mb': _max_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def _max_rss_mb(who):
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--engines', default='http,parser', help='Comma-separated: http, selenium, parser')
+    parser.add_argument('--users', default='1,4,8', help='Comma-separated concurrency levels')
+    parser.add_argument('--scrapes', type=int, default=20, help='Scrapes per scenario')
+    parser.add_argument('--latency', type=float, default=50, help='Fake portal delay per response (ms)')
+    parser.add_argument('--jitter', type=float, default=0, help='Extra random delay, up to this (ms)')
+    parser.add_argument('--profiles', default='default', help='Comma-separated driver profiles (selenium only)')
+    parser.add_argument('--steps', action='store_true', help='Also print the mean time per step')
+    args = parser.parse_args()
+
+    portal = FakePortal(args.latency / 1000, args.jitter / 1000)
+    server, base_url = serve_in_thread(portal)
+    context = multiprocessing.get_context('spawn')
+
+    print(f"🧪 Fake IMS at {base_url}, {args.latency:g} ms latency, {args.scrapes} scrapes per scenario\n")
+    print(f"  {'engine':<10}{'profile':<13}{'users':>6}{'p50 ms':>10}{'p95 ms':>10}{'scrapes/s':>11}"
+          f"{'failed':>8}{'reqs/scrape':>13}{'worker MB':>11}{'chrome MB':>11}")
+
+    scenarios = []
+    for engine in args.engines.split(','):
+        profiles = args.profiles.split(',') if engine == 'selenium' else ['-']
+        for profile in profiles:
+            for users in (int(u) for u in args.users.split(',')):
+                scenarios.append((engine, profile, users))
+
+    try:
+        for engine, profile, users in scenarios:
+            served = portal.stats()['requests']
+            with context.Pool(1) as worker:
+                report = worker.apply(run_scenario, (base_url, engine, users, args.scrapes,
+                                                     'default' if profile == '-' else profile))
+            requests_per_scrape = (portal.stats()['requests'] - served) / args.scrapes
+
+            latencies = report['latencies']
+            p50 = percentile(latencies, 50) * 1000 if latencies else float('nan')
+            p95 = percentile(latencies, 95) * 1000 if latencies else float('nan')
+            print(f"  {engine:<10}{profile:<13}{users:>6}{p50:>10.1f}{p95:>10.1f}"
+                  f"{len(latencies) / report['wall']:>11.2f}{report['failures']:>8}{requests_per_scrape:>13.1f}"
+                  f"{report['rss_mb']:>11.1f}{report['children_rss_mb']:>11.1f}")
+
+            if args.steps:
+                for step, seconds in sorted(report['steps'].items(), key=lambda item: -item[1]):
+                    print(f"      {step:<40} {seconds * 1000:8.1f} ms")
+    finally:
+        server.shutdown()
+
+    print(f"\n📊 Portal served {portal.stats()['requests']} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+fake_ims.py
+Local stand-in for the IMS portal, built from the captures in data_files/,
+so the scrapers can be benchmarked without touching the live site
+
+Serves the landing page, the login frameset, the login form with a
+generated CAPTCHA, the logged-in frames, the tree menu and the My
+Attendance page (the same saved page for the form and every submit),
+each after a configurable delay.
+
+Usage (from secondIteration/):
+    python benchmarks/fake_ims.py [--port 8765] [--latency 50] [--jitter 20]
+    IMS_BASE_URL=http://127.0.0.1:8765/imsnsit/ python app_final.py
+"""
+
+import argparse
+import logging
+import os
+import random
+import re
+import secrets
+import threading
+import time
+from io import BytesIO
+
+from flask import Blueprint, Flask, Response, abort, request
+from PIL import Image, ImageDraw
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, '..', '..', 'data_files')
+
+PORTAL_PREFIX = '/imsnsit'
+LIVE_BASE_URL = 'https://www.imsnsit.org/imsnsit/'
+
+DEFAULT_CAPTCHA_ANSWER = '7Kq2p'
+
+LANDING_HTML = """<html><head><title>NSIT Delhi</title></head><body>
+<table><tr><td><a href="student_login.php">Student Login</a></td></tr></table>
+</body></html>"""
+
+LOGIN_FORM_HTML = """<html><head>
+<link href="theme_grey/main.css" type="text/css" rel="stylesheet">
+<script language="javascript" src="js/plumjs.js" type="text/javascript"></script>
+</head><body>
+<form name="loginform" id="loginform" method="post" action="student_login110.php">
+<table>
+<tr><td>Student ID</td><td><input type="text" name="uid" id="uid"></td></tr>
+<tr><td>Password</td><td><input type="password" name="pwd" id="pwd"></td></tr>
+<tr><td><img id="captchaimg" src="images/captcha/captcha_{stamp}.jpg"></td>
+    <td><input type="text" name="cap" id="cap"></td></tr>
+<tr><td colspan="2"><input type="submit" name="login" id="login" value="Login"></td></tr>
+</table>
+</form>
+{error}
+</body></html>"""
+
+# Stand-ins for plumjs.js and the portal's jQuery / treeview: enough for
+# the pages' inline scripts and for tree nodes to expand on click
+PLUMJS = "function resizeX() {}\n"
+
+JQUERY_SHIM = """
+(function () {
+    function toggle(hitarea) {
+        var expand = hitarea.className.indexOf('expandable-hitarea') !== -1;
+        hitarea.className = expand
+            ? hitarea.className.replace('expandable-hitarea', 'collapsable-hitarea')
+            : hitarea.className.replace('collapsable-hitarea', 'expandable-hitarea');
+        var list = hitarea.parentElement.getElementsByTagName('ul')[0];
+        if (list) { list.style.display = expand ? 'block' : 'none'; }
+    }
+    function wrap() {
+        var api = {
+            ready: function (fn) {
+                if (document.readyState === 'loading') { document.addEventListener('DOMContentLoaded', fn); }
+                else { fn(); }
+                return proxy;
+            },
+            treeview: function () {
+                var hitareas = document.getElementsByClassName('hitarea');
+                for (var i = 0; i < hitareas.length; i++) {
+                    hitareas[i].addEventListener('click', function () { toggle(this); });
+                }
+                return proxy;
+            }
+        };
+        var proxy = new Proxy(api, {
+            get: function (target, key) { return key in target ? target[key] : function () { return proxy; }; }
+        });
+        return proxy;
+    }
+    window.jQuery = window.$ = function (arg) {
+        return typeof arg === 'function' ? wrap().ready(arg) : wrap();
+    };
+    window.jQuery.active = 0;
+})();
+"""
+
+# 1x1 transparent GIF for every other image
+PIXEL_GIF = bytes.fromhex('47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b')
+
+
+def _read(name):
+    with open(os.path.join(DATA_DIR, name), 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def _link_token(html, text):
+    """plum_url.php token of the link labelled `text`"""
+    match = re.search(r'plum_url\.php\?([^"\']+)"[^>]*>\s*' + re.escape(text) + r'\s*<', html)
+    if not match:
+        raise ValueError(f"No '{text}' link in the capture")
+    return match.group(1)
+
+
+class FakePortal:
+    """
+    Pages and session state of the stand-in portal
+
+    Args:
+        latency (float): Seconds added to every response
+        jitter (float): Extra random delay, up to this many seconds
+        captcha_answer (str): The only CAPTCHA text a login accepts
+        keep_external (bool): Leave the attendance page's googleapis jQuery
+            reference alone (it is pointed at the local shim by default)
+    """
+
+    def __init__(self, latency=0.05, jitter=0.0, captcha_answer=DEFAULT_CAPTCHA_ANSWER, keep_external=False):
+        self.latency = latency
+        self.jitter = jitter
+        self.captcha_answer = captcha_answer
+
+        self.banner = _read('logged_in_frame_banner.html')
+        self.tree = _read('attendance_top.html')
+        self.attendance = _read('attendance_data.html')
+        self.frames = _read('after_login.html')
+        self.error_page = _read('error_page.html')
+        self.top_frame = _read('logged_in_frame_top.html')
+        self.data_frame = _read('logged_in_frame_data.html')
+
+        # The captured tree has ATTENDANCE already open; start it collapsed
+        self.tree = self.tree.replace(
+            '<li class="collapsable"><div class="hitarea collapsable-hitarea"></div><b>ATTENDANCE</b><ul style="display: block;">',
+            '<li class="expandable"><div class="hitarea expandable-hitarea"></div><b>ATTENDANCE</b><ul style="display: none;">',
+        )
+        if not keep_external:
+            self.attendance = re.sub(r'https?://ajax\.googleapis\.com/[^"\']+', 'css/tree/jquery.js', self.attendance)
+
+        self.routes = {
+            _link_token(self.banner, 'My Activities'): self.tree,
+            _link_token(self.tree, 'My Attendance'): self.attendance,
+        }
+        for index, token in re.findall(r"parent\.frames\[(\d)\]\.location\.href='plum_url\.php\?([^']+)'", self.banner):
+            self.routes.setdefault(token, self.top_frame if index == '2' else self.data_frame)
+
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.logins = 0
+        self.rejected_logins = 0
+
+    def delay(self):
+        with self._lock:
+            self.requests += 1
+        pause = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if pause > 0:
+            time.sleep(pause)
+
+    def login(self, captcha):
+        """New logged-in session id, or None if the CAPTCHA is wrong"""
+        with self._lock:
+            if captcha != self.captcha_answer:
+                self.rejected_logins += 1
+                return None
+            self.logins += 1
+            session_id = secrets.token_hex(16)
+            self._sessions.add(session_id)
+            return session_id
+
+    def logged_in(self, session_id):
+        with self._lock:
+            return session_id in self._sessions
+
+    def page(self, token):
+        return self.routes.get(token, self.data_frame)
+
+    def localise(self, html):
+        """Point the capture's absolute portal links at this server"""
+        return html.replace(LIVE_BASE_URL, request.host_url.rstrip('/') + PORTAL_PREFIX + '/')
+
+    def captcha_image(self):
+        image = Image.new('RGB', (120, 40), (235, 235, 235))
+        draw = ImageDraw.Draw(image)
+        draw.text((18, 12), self.captcha_answer, fill=(30, 30, 30))
+        for _ in range(40):
+            draw.point((random.randrange(120), random.randrange(40)), fill=(120, 120, 120))
+        buffer = BytesIO()
+        image.save(buffer, 'JPEG')
+        return buffer.getvalue()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'logins': self.logins,
+                'rejected_logins': self.rejected_logins,
+                'sessions': len(self._sessions),
+            }
+
+
+def create_app(portal=None):
+    """Flask app serving `portal` (a default FakePortal if omitted) under /imsnsit/"""
+    portal = portal or FakePortal()
+    bp = Blueprint('imsnsit', __name__)
+
+    def html(body):
+        return Response(body, mimetype='text/html')
+
+    def session_id():
+        return request.cookies.get('PHPSESSID')
+
+    @bp.before_request
+    def delay():
+        portal.delay()
+
+    @bp.route('/')
+    def landing():
+        return html(LANDING_HTML)
+
+    @bp.route('/student_login.php')
+    def frameset():
+        response = html(portal.frames)
+        if not session_id():
+            response.set_cookie('PHPSESSID', secrets.token_hex(16), path=PORTAL_PREFIX)
+        return response
+
+    @bp.route('/student_login110.php', methods=['GET', 'POST'])
+    def login():
+        if request.method == 'GET':
+            return html(LOGIN_FORM_HTML.format(stamp=int(time.time() * 1000), error=''))
+
+        new_session = portal.login(request.form.get('cap', ''))
+        if new_session is None:
+            return html(LOGIN_FORM_HTML.format(stamp=int(time.time() * 1000),
+                                               error='<div class="div">Invalid Captcha</div>'))
+        response = html(portal.localise(portal.banner))
+        response.set_cookie('PHPSESSID', new_session, path=PORTAL_PREFIX)
+        return response
+
+    @bp.route('/plum_url.php', methods=['GET', 'POST'])
+    def plum_url():
+        if not portal.logged_in(session_id()):
+            return html(portal.error_page)
+        return html(portal.localise(portal.page(request.query_string.decode('latin-1'))))
+
+    @bp.route('/images/captcha/<name>')
+    def captcha(name):
+        return Response(portal.captcha_image(), mimetype='image/jpeg')
+
+    @bp.route('/blank.htm')
+    def blank():
+        return html('<html><body></body></html>')
+
+    @bp.route('/js/plumjs.js')
+    def plumjs():
+        return Response(PLUMJS, mimetype='application/javascript')
+
+    @bp.route('/css/tree/<name>.js')
+    def jquery(name):
+        return Response(JQUERY_SHIM if name == 'jquery' else '', mimetype='application/javascript')
+
+    @bp.route('/<path:path>')
+    def asset(path):
+        if path.endswith('.css'):
+            return Response('', mimetype='text/css')
+        if path.endswith(('.gif', '.png', '.jpg')):
+            return Response(PIXEL_GIF, mimetype='image/gif')
+        abort(404)
+
+    app = Flask(__name__)
+    app.register_blueprint(bp, url_prefix=PORTAL_PREFIX)
+    app.config['portal'] = portal
+    return app
+
+
+def serve_in_thread(portal=None, host='127.0.0.1', port=0):
+    """
+    Start the stand-in on a background thread
+
+    Returns:
+        tuple: (server, base URL for IMS_BASE_URL); call server.shutdown() when done
+    """
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server(host, port, create_app(portal), threaded=True)
+    threading.Thread(target=server.serve_forever, name='fake-ims', daemon=True).start()
+    return server, f"http://{host}:{server.server_port}{PORTAL_PREFIX}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=50, help='Delay per response (ms)')
+    parser.add_argument('--jitter', type=float, default=0, help='Extra random delay, up to this (ms)')
+    parser.add_argument('--captcha', default=DEFAULT_CAPTCHA_ANSWER, help='CAPTCHA text logins must send')
+    parser.add_argument('--keep-external', action='store_true', help='Keep the googleapis jQuery reference')
+    args = parser.parse_args()
+
+    portal = FakePortal(args.latency / 1000, args.jitter / 1000, args.captcha, args.keep_external)
+    print(f"🧪 Fake IMS on http://{args.host}:{args.port}{PORTAL_PREFIX}/ (CAPTCHA: {args.captcha})")
+    create_app(portal).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
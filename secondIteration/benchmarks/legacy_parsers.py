@@ -0,0 +1,544 @@
+"""
+legacy_parsers.py
+Frozen copies of the parsers that attendance_parser replaced, kept only so
+the benchmarks can compare against what used to run
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+
+
+# secondIteration/attendance_scraper_api.py
+def _extract_attendance_table(html):
+    """
+    Extract attendance data from HTML
+    Returns list of dicts with attendance info
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    tables = soup.find_all('table')
+    
+    attendance_data = []
+    
+    for table in tables:
+        rows = table.find_all('tr')
+        
+        # Find header row with subject codes
+        header_row = None
+        header_row_idx = -1
+        
+        for row_idx, row in enumerate(rows):
+            cells = row.find_all(['td', 'th'])
+            cell_texts = [cell.get_text(strip=True) for cell in cells]
+            
+            # Look for subject codes (pattern: ITITC601, CSE301, etc.)
+            has_subject_codes = any(
+                bool(re.match(r'^[A-Z]{2,4}[A-Z]?\d{3,4}$', text)) 
+                for text in cell_texts
+            )
+            
+            if has_subject_codes or 'Days' in cell_texts:
+                header_row = cell_texts
+                header_row_idx = row_idx
+                break
+        
+        if not header_row:
+            continue
+        
+        # Extract subject codes
+        subject_codes = []
+        for i, cell in enumerate(header_row):
+            if i == 0:
+                continue
+            if re.match(r'^[A-Z]{2,4}[A-Z]?\d{3,4}$', cell):
+                subject_codes.append(cell)
+        
+        if not subject_codes:
+            continue
+        
+        # Find subject names (usually 2 rows after header)
+        subject_names = {}
+        for row_offset in [1, 2]:
+            if header_row_idx + row_offset < len(rows):
+                name_row = rows[header_row_idx + row_offset]
+                name_cells = name_row.find_all(['td', 'th'])
+                
+                for i, code in enumerate(subject_codes):
+                    if i + 1 < len(name_cells):
+                        name = name_cells[i + 1].get_text(strip=True)
+                        if name and not name.isdigit():
+                            subject_names[code] = name
+        
+        # Find attendance data (Present/Absent rows)
+        attendance_rows = {'P': {}, 'A': {}}
+        
+        for row in rows[header_row_idx:]:
+            cells = row.find_all(['td', 'th'])
+            if len(cells) < 2:
+                continue
+            
+            first_cell = cells[0].get_text(strip=True)
+            
+            if first_cell in ['P', 'Present']:
+                for i, code in enumerate(subject_codes):
+                    if i + 1 < len(cells):
+                        val = cells[i + 1].get_text(strip=True)
+                        attendance_rows['P'][code] = int(val) if val.isdigit() else 0
+                        
+            elif first_cell in ['A', 'Absent']:
+                for i, code in enumerate(subject_codes):
+                    if i + 1 < len(cells):
+                        val = cells[i + 1].get_text(strip=True)
+                        attendance_rows['A'][code] = int(val) if val.isdigit() else 0
+        
+        # Build final data
+        for code in subject_codes:
+            present = attendance_rows['P'].get(code, 0)
+            absent = attendance_rows['A'].get(code, 0)
+            total = present + absent
+            percentage = round((present / total * 100), 2) if total > 0 else 0
+            
+            attendance_data.append({
+                'subject_code': code,
+                'subject_name': subject_names.get(code, 'Unknown'),
+                'classes_present': present,
+                'classes_absent': absent,
+                'total_classes': total,
+                'attendance_percentage': percentage
+            })
+    
+    return attendance_data
+
+
+# 01_virtual_py/nsu3.py
+def extract_attendance_table_enhanced(html, debug=True):
+    """
+    Enhanced attendance table parser with better debugging
+    Handles various IMS table formats
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    if debug:
+        print("\n" + "="*80)
+        print("🔍 DEBUG: Analyzing HTML structure")
+        print("="*80)
+    
+    # Find all tables
+    tables = soup.find_all('table')
+    if debug:
+        print(f"\n📊 Found {len(tables)} table(s) in HTML")
+    
+    attendance_data = []
+    subject_names = {}
+    
+    for table_idx, table in enumerate(tables):
+        if debug:
+            print(f"\n--- Analyzing Table {table_idx + 1} ---")
+        
+        rows = table.find_all('tr')
+        if debug:
+            print(f"   Rows: {len(rows)}")
+        
+        # Try to find header row with subject codes
+        header_row = None
+        header_row_idx = -1
+        
+        for row_idx, row in enumerate(rows):
+            cells = row.find_all(['td', 'th'])
+            cell_texts = [cell.get_text(strip=True) for cell in cells]
+            
+            if debug and row_idx < 5:  # Show first 5 rows
+                print(f"   Row {row_idx}: {cell_texts[:10]}")  # First 10 cells
+            
+            # Look for subject codes (usually alphanumeric like ITITC601, CSE301, etc.)
+            # Or look for "Days" column which often precedes subject codes
+            has_subject_codes = any(
+                bool(re.match(r'^[A-Z]{2,4}[A-Z]?\d{3,4}$', text)) 
+                for text in cell_texts
+            )
+            
+            if has_subject_codes or 'Days' in cell_texts:
+                header_row = cell_texts
+                header_row_idx = row_idx
+                if debug:
+                    print(f"\n   ✅ Found header row at index {row_idx}")
+                    print(f"   Header: {header_row}")
+                break
+        
+        if not header_row:
+            if debug:
+                print("   ⚠️  No header row found in this table")
+            continue
+        
+        # Extract subject codes (skip first column which is usually "Days" or similar)
+        subject_codes = []
+        for i, cell in enumerate(header_row):
+            if i == 0:  # Skip first column
+                continue
+            # Match subject code pattern
+            if re.match(r'^[A-Z]{2,4}[A-Z]?\d{3,4}$', cell):
+                subject_codes.append(cell)
+            elif cell and cell != 'Days':  # Sometimes codes might be in different format
+                subject_codes.append(cell)
+        
+        if debug:
+            print(f"\n   📋 Extracted subject codes: {subject_codes}")
+        
+        # Now extract data rows
+        data_rows = {}  # Store different metrics
+        
+        for row_idx, row in enumerate(rows[header_row_idx + 1:], start=header_row_idx + 1):
+            cells = row.find_all(['td', 'th'])
+            if len(cells) <= 1:
+                continue
+            
+            first_cell = cells[0].get_text(strip=True)
+            values = [cell.get_text(strip=True) for cell in cells[1:]]
+            
+            # Identify what this row contains
+            row_type = None
+            
+            if any(keyword in first_cell for keyword in ['Overall (%)', 'Overall%', 'Attendance %', 'Percentage']):
+                row_type = 'percentage'
+            elif any(keyword in first_cell for keyword in ['Overall Class', 'Total Classes', 'Total Class']):
+                row_type = 'total'
+            elif 'Present' in first_cell and 'Overall' in first_cell:
+                row_type = 'present'
+            elif 'Absent' in first_cell and 'Overall' in first_cell:
+                row_type = 'absent'
+            
+            if row_type:
+                data_rows[row_type] = values
+                if debug:
+                    print(f"   {row_type.upper()}: {values[:5]}...")  # Show first 5
+        
+        if debug:
+            print(f"\n   📊 Found data types: {list(data_rows.keys())}")
+        
+        # Build attendance records
+        for i, subject_code in enumerate(subject_codes):
+            record = {'Subject Code': subject_code}
+            
+            if 'percentage' in data_rows and i < len(data_rows['percentage']):
+                record['Attendance %'] = data_rows['percentage'][i]
+            
+            if 'total' in data_rows and i < len(data_rows['total']):
+                record['Total Classes'] = data_rows['total'][i]
+            
+            if 'present' in data_rows and i < len(data_rows['present']):
+                record['Classes Present'] = data_rows['present'][i]
+            
+            if 'absent' in data_rows and i < len(data_rows['absent']):
+                record['Classes Absent'] = data_rows['absent'][i]
+            
+            attendance_data.append(record)
+        
+        if debug and attendance_data:
+            print(f"\n   ✅ Extracted {len(attendance_data)} subject records from this table")
+    
+    # Extract subject names from HTML
+    # Look for patterns like "ITITC601-Web Technology" or "CSE301 - Data Structures"
+    full_html = str(soup)
+    
+    for code in set(item['Subject Code'] for item in attendance_data):
+        # Pattern 1: CODE-Name
+        pattern1 = rf'{code}\s*-\s*([^<\n]+?)(?:<br>|<|$)'
+        match = re.search(pattern1, full_html, re.IGNORECASE)
+        
+        if match:
+            name = match.group(1).strip()
+            # Clean up
+            name = re.sub(r'---?>.*$', '', name).strip()
+            name = re.sub(r'\s+', ' ', name).strip()
+            subject_names[code] = name
+        else:
+            # Pattern 2: Look in nearby text
+            # This is more aggressive - find the code and look at surrounding text
+            pattern2 = rf'{code}[^A-Z0-9]{{0,3}}([A-Z][a-zA-Z\s&]+?)(?:<|$|[0-9])'
+            match = re.search(pattern2, full_html)
+            if match:
+                name = match.group(1).strip()[:50]  # Limit to 50 chars
+                subject_names[code] = name
+    
+    if debug:
+        print(f"\n📚 Subject names found: {subject_names}")
+    
+    # Add subject names to records
+    for item in attendance_data:
+        code = item['Subject Code']
+        if code in subject_names:
+            item['Subject Name'] = subject_names[code]
+        else:
+            item['Subject Name'] = 'N/A'
+    
+    if debug:
+        print("\n" + "="*80)
+        print(f"✅ FINAL: Extracted {len(attendance_data)} total records")
+        print("="*80)
+    
+    return attendance_data
+
+
+# 01_virtual_py/nsut2.py
+def extract_attendance_table(html):
+    """Parse IMS attendance HTML and extract structured data"""
+    import re
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Find the main attendance table
+    tables = soup.find_all('table')
+    
+    attendance_data = []
+    subject_names = {}
+    
+    for table in tables:
+        # Look for the header row with subject codes
+        header_row = None
+        for row in table.find_all('tr'):
+            cells = row.find_all(['td', 'th'])
+            cell_texts = [cell.get_text(strip=True) for cell in cells]
+            
+            # This is the header row with subject codes
+            if 'Days' in cell_texts or any('0603' in text or '0601' in text or '0602' in text for text in cell_texts):
+                header_row = cell_texts
+                break
+        
+        if not header_row:
+            continue
+        
+        # Extract subject codes (skip the "Days" column)
+        subject_codes = [code for code in header_row[1:] if code and code != 'Days']
+        
+        # Now find the summary rows
+        for row in table.find_all('tr'):
+            cells = row.find_all(['td', 'th'])
+            
+            if len(cells) == 0:
+                continue
+            
+            first_cell = cells[0].get_text(strip=True)
+            
+            # Overall (%) row - this is what we want!
+            if 'Overall (%)' in first_cell or 'Overall%' in first_cell:
+                percentages = [cell.get_text(strip=True) for cell in cells[1:]]
+                
+                for i, subject_code in enumerate(subject_codes):
+                    if i < len(percentages):
+                        attendance_data.append({
+                            'Subject Code': subject_code,
+                            'Attendance %': percentages[i]
+                        })
+            
+            # Get total classes
+            elif 'Overall Class' in first_cell or 'Total Classes' in first_cell:
+                totals = [cell.get_text(strip=True) for cell in cells[1:]]
+                for i, subject_code in enumerate(subject_codes):
+                    if i < len(totals) and i < len(attendance_data):
+                        attendance_data[i]['Total Classes'] = totals[i]
+            
+            # Get present count
+            elif 'Overall' in first_cell and 'Present' in first_cell:
+                presents = [cell.get_text(strip=True) for cell in cells[1:]]
+                for i, subject_code in enumerate(subject_codes):
+                    if i < len(presents) and i < len(attendance_data):
+                        attendance_data[i]['Classes Present'] = presents[i]
+            
+            # Get absent count  
+            elif 'Overall' in first_cell and 'Absent' in first_cell:
+                absents = [cell.get_text(strip=True) for cell in cells[1:]]
+                for i, subject_code in enumerate(subject_codes):
+                    if i < len(absents) and i < len(attendance_data):
+                        attendance_data[i]['Classes Absent'] = absents[i]
+    
+    # Extract subject names using regex - look for pattern "CODE-Name"
+    full_html = str(soup)
+    
+    # Pattern: Subject code followed by dash and name
+    for code in subject_codes:
+        # Look for patterns like "ITITC601-Web Technology"
+        pattern = rf'{code}-([^<\n]+?)(?:<br>|<|$)'
+        match = re.search(pattern, full_html, re.IGNORECASE)
+        
+        if match:
+            name = match.group(1).strip()
+            # Clean up any extra text
+            name = re.sub(r'---?>.*$', '', name).strip()
+            subject_names[code] = name
+    
+    # Add full names to attendance data
+    for item in attendance_data:
+        code = item['Subject Code']
+        if code in subject_names:
+            item['Subject Name'] = subject_names[code]
+    
+    return attendance_data
+
+
+# 01_virtual_py/lms_attendance_parser
+def parse_ims_attendance(html_content, debug=True):
+    """
+    Custom parser for IMS attendance HTML
+    Designed specifically for the IMS table structure
+    """
+    soup = BeautifulSoup(html_content, 'html.parser')
+    
+    if debug:
+        print("\n" + "="*80)
+        print("🔍 PARSING IMS ATTENDANCE TABLE")
+        print("="*80)
+    
+    # Find all tables
+    tables = soup.find_all('table')
+    
+    if len(tables) < 2:
+        print("❌ Not enough tables found!")
+        return []
+    
+    # First table with 90% width is the attendance data
+    data_table = None
+    legend_table = None
+    
+    for table in tables:
+        width = table.get('width', '')
+        if width == '90%':
+            if data_table is None:
+                data_table = table  # First 90% table is data
+            else:
+                legend_table = table  # Second 90% table is legend
+                break
+    
+    if not data_table:
+        print("❌ No attendance table found!")
+        return []
+    
+    rows = data_table.find_all('tr')
+    
+    if debug:
+        print(f"\n📊 Found attendance table with {len(rows)} rows")
+    
+    # Extract header row with subject codes
+    header_row = None
+    for row in rows:
+        cells = row.find_all(['td', 'th'])
+        cell_texts = [cell.get_text(strip=True) for cell in cells]
+        
+        # The header row has "Days" followed by subject codes
+        if cell_texts and cell_texts[0] == 'Days':
+            header_row = cell_texts
+            break
+    
+    if not header_row:
+        print("❌ Could not find header row!")
+        return []
+    
+    # Extract subject codes (skip "Days" column)
+    subject_codes = header_row[1:]
+    if debug:
+        print(f"\n📋 Subject Codes: {subject_codes}")
+    
+    # Initialize data storage
+    attendance_data = {code: {
+        'Subject Code': code,
+        'Total Classes': 0,
+        'Total Absent': 0,
+        'Total Present': 0,
+        'Overall Class': 0,
+        'Overall Absent': 0,
+        'Overall Present': 0,
+        'Overall (%)': '0.00%'
+    } for code in subject_codes}
+    
+    # Process data rows
+    for row in rows:
+        cells = row.find_all(['td', 'th'])
+        
+        if len(cells) < 2:
+            continue
+        
+        first_cell = cells[0].get_text(strip=True)
+        values = [cell.get_text(strip=True) for cell in cells[1:]]
+        
+        # Match the different metric rows
+        if first_cell == 'Total Classes':
+            for i, code in enumerate(subject_codes):
+                if i < len(values):
+                    attendance_data[code]['Total Classes'] = values[i]
+        
+        elif 'Total' in first_cell and 'Absent' in first_cell:
+            for i, code in enumerate(subject_codes):
+                if i < len(values):
+                    attendance_data[code]['Total Absent'] = values[i]
+        
+        elif 'Total' in first_cell and 'Present' in first_cell:
+            for i, code in enumerate(subject_codes):
+                if i < len(values):
+                    attendance_data[code]['Total Present'] = values[i]
+        
+        elif first_cell == 'Overall Class':
+            for i, code in enumerate(subject_codes):
+                if i < len(values):
+                    attendance_data[code]['Overall Class'] = values[i]
+        
+        elif 'Overall' in first_cell and 'Absent' in first_cell:
+            for i, code in enumerate(subject_codes):
+                if i < len(values):
+                    attendance_data[code]['Overall Absent'] = values[i]
+        
+        elif 'Overall' in first_cell and 'Present' in first_cell:
+            for i, code in enumerate(subject_codes):
+                if i < len(values):
+                    attendance_data[code]['Overall Present'] = values[i]
+        
+        elif 'Overall (%)' in first_cell or 'Overall%' in first_cell:
+            for i, code in enumerate(subject_codes):
+                if i < len(values):
+                    attendance_data[code]['Overall (%)'] = values[i]
+    
+    # Extract subject names from the legend table
+    subject_names = {}
+    
+    if legend_table:
+        # Find the <b> tag with subject names
+        bold = legend_table.find('b')
+        if bold:
+            # Get inner HTML and split by <br> tags (could be <br> or <br/>)
+            legend_html = str(bold)
+            parts = re.split(r'<br\s*/?>', legend_html)
+            
+            for part in parts:
+                # Remove HTML tags
+                clean = re.sub(r'<[^>]+>', '', part).strip()
+                
+                # Match CODE-Name pattern
+                match = re.match(r'^([A-Z]{4,5}\d{3,4})-(.+)$', clean)
+                if match:
+                    code = match.group(1).strip()
+                    name = match.group(2).strip()
+                    
+                    # Only keep if it's one of our subject codes
+                    if code in subject_codes:
+                        subject_names[code] = name
+    
+    if debug:
+        print(f"\n📚 Subject Names Found:")
+        for code in subject_codes:
+            if code in subject_names:
+                print(f"   {code}: {subject_names[code]}")
+            else:
+                print(f"   {code}: (not found)")
+    
+    # Add subject names to attendance data
+    for code in subject_codes:
+        if code in subject_names:
+            attendance_data[code]['Subject Name'] = subject_names[code]
+        else:
+            attendance_data[code]['Subject Name'] = 'Unknown'
+    
+    # Convert to list of records
+    result = list(attendance_data.values())
+    
+    if debug:
+        print(f"\n✅ Successfully extracted data for {len(result)} subjects")
+        print("="*80)
+    
+    return result
@@ -0,0 +1,295 @@
+"""
+parser_corpus.py
+Regression corpus and micro-benchmark for every parser entry point, over
+the captures in data_files/ plus synthetic pages scaled up to 200
+subjects x 1000 days
+
+Each entry point's records per page are compared with the ones recorded
+in parser_corpus.json, and its subject figures with those of the
+BeautifulSoup parser nsu3.py used before attendance_parser
+(legacy_parsers.py), an independent implementation; any mismatch is
+listed field by field and exits non-zero. Then every (page, entry
+point) is timed (ops/sec) and its peak allocation per parse measured.
+
+Usage (from secondIteration/):
+    python benchmarks/parser_corpus.py [--repeat 50] [--no-bench]
+    python benchmarks/parser_corpus.py --update     # after an intended output change
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+from datetime import date, timedelta
+from importlib.machinery import SourceFileLoader
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from attendance_parser.columns import extract_attendance_table_enhanced
+from attendance_scraper_api import _extract_attendance_table
+import legacy_parsers
+
+
+REPO = os.path.join(HERE, '..', '..')
+DATA_DIR = os.path.join(REPO, 'data_files')
+SCRIPTS_DIR = os.path.join(REPO, '01_virtual_py')
+GOLDEN = os.path.join(HERE, 'parser_corpus.json')
+
+FIXTURES = [
+    'attendance_data.html',
+    'attendance_data_top.html',
+    'attendance_top.html',
+    'after_login.html',
+    'data_frame_loaded.html',
+    'error_page.html',
+    'logged_in_frame_banner.html',
+    'logged_in_frame_bottom.html',
+    'logged_in_frame_contents.html',
+    'logged_in_frame_data.html',
+    'logged_in_frame_top.html',
+]
+
+# (name, subjects, days)
+SYNTHETIC = [
+    ('synthetic_20x120', 20, 120),
+    ('synthetic_200x1000', 200, 1000),
+]
+
+MARKS = ['', '', '', '0', '1', '1', '1', '1+0', '1+1', '0+1', 'GH', 'TL', 'NT', 'CS']
+
+
+def entry_points():
+    """(name, html -> records) for every parser entry point in the repo"""
+    lms = SourceFileLoader('lms_attendance_parser', os.path.join(SCRIPTS_DIR, 'lms_attendance_parser')).load_module()
+    devnull = open(os.devnull, 'w')
+
+    def parse_ims_attendance(html):
+        # It reports a missing table even with debug=False
+        with contextlib.redirect_stdout(devnull):
+            return lms.parse_ims_attendance(html, debug=False)
+
+    return [
+        ('_extract_attendance_table', _extract_attendance_table),
+        ('extract_attendance_table_enhanced', lambda html: extract_attendance_table_enhanced(html, debug=False)),
+        ('parse_ims_attendance', parse_ims_attendance),
+    ]
+
+
+def reference(html):
+    """Subject figures from the pre-attendance_parser nsu3.py parser"""
+    return normalise('extract_attendance_table_enhanced',
+                     legacy_parsers.extract_attendance_table_enhanced(html, debug=False))
+
+
+def normalise(name, records):
+    """Entry-point records -> sorted (code, present, absent, classes, percentage) tuples"""
+    rows = []
+    for record in records:
+        if name == '_extract_attendance_table':
+            row = (record['subject_code'], record['classes_present'], record['classes_absent'],
+                   record['total_classes'], record['attendance_percentage'])
+        elif name == 'parse_ims_attendance':
+            row = (record['Subject Code'], record['Overall Present'], record['Overall Absent'],
+                   record['Overall Class'], record['Overall (%)'])
+        else:
+            row = (record['Subject Code'], record['Classes Present'], record['Classes Absent'],
+                   record['Total Classes'], record['Attendance %'])
+        # The legacy parsers return the page's strings ("8", "50.00%")
+        code, *figures = row
+        rows.append((code, *(_number(v) for v in figures)))
+    return sorted(rows)
+
+
+def _number(value):
+    if isinstance(value, str):
+        value = float(value.strip().rstrip('%') or 0)
+    if isinstance(value, float):
+        value = round(value, 2)
+        return int(value) if value.is_integer() else value
+    return value
+
+
+def synthetic_page(subjects, days, seed=0):
+    """
+    My Attendance page in the current IMS layout with `subjects` columns
+    and `days` date rows, filled with a seeded mix of marks and notes
+    """
+    rng = random.Random(seed)
+    codes = [f"SYN{i:04d}" for i in range(subjects)]
+    present = [0] * subjects
+    absent = [0] * subjects
+
+    def cells(values, tag='td'):
+        return ''.join(f'<{tag} align="center">{v}</{tag}>' for v in values)
+
+    rows = []
+    start = date(2025, 1, 2)
+    for d in range(days):
+        marks = [rng.choice(MARKS) for _ in range(subjects)]
+        for i, mark in enumerate(marks):
+            for part in mark.split('+'):
+                if part == '1':
+                    present[i] += 1
+                elif part == '0':
+                    absent[i] += 1
+        label = (start + timedelta(days=d)).strftime('%b-%d')
+        rows.append(f'<tr><td align="center" width="8%">{label}</td>{cells(marks)}</tr>')
+
+    total = [p + a for p, a in zip(present, absent)]
+    percent = [f"{p / t * 100:.2f}%" if t else '0.00%' for p, t in zip(present, total)]
+
+    def summary(label, values, tag='td'):
+        return f'<tr class="plum_head"><td align="center" width="8%"><b>{label}</b></td>{cells(values, tag)}</tr>'
+
+    legend = '<br>'.join(f"{code}-Synthetic Subject {i}" for i, code in enumerate(codes))
+    return (
+        '<html><body><div id="myreport">'
+        '<table width="90%" align="center" border="1" class="plum_fieldbig"><tbody>'
+        f'<tr class="plum_head"><td colspan="{subjects + 1}" align="center">'
+        'Name: SYNTHETIC (2023UIT0000),&nbsp;Semester : 6 <br> 0 - &gt; ABSENT , 1 - &gt; PRESENT</td></tr>'
+        f'<tr class="plum_head"><td align="center">Days</td>{cells(codes)}</tr>'
+        + ''.join(rows)
+        + summary('Total Classes', total)
+        + summary('Total<br> Absent', absent)
+        + summary('Total <br> Present', present)
+        + f'<tr><td colspan="{subjects + 1}">&nbsp;</td></tr>'
+        + summary('Overall Class', total)
+        + summary('Overall<br> Absent', absent)
+        + summary('Overall <br> Present', present)
+        + summary('Overall (%)', percent, tag='th')
+        + '</tbody></table><br><br>'
+        '<table width="90%" align="center" border="1" class="plum_fieldbig"><tbody><tr class="plum_fieldbig">'
+        f'<td colspan="{subjects + 1}"><b>{legend}<br></b></td>'
+        '<td valign="top"><b>GH-Gazetted Holiday<br>TL-Teacher on Leave<br></b></td></tr></tbody></table>'
+        '</div></body></html>'
+    )
+
+
+def corpus():
+    """(name, html) for every capture and synthetic page"""
+    pages = []
+    for name in FIXTURES:
+        with open(os.path.join(DATA_DIR, name), 'r', encoding='utf-8', errors='replace') as f:
+            pages.append((name, f.read()))
+    for name, subjects, days in SYNTHETIC:
+        pages.append((name, synthetic_page(subjects, days)))
+    return pages
+
+
+def check(pages, parsers, golden):
+    """
+    Compare with the recorded records and with the reference parser
+
+    Returns:
+        tuple: (current records, list of failure messages)
+    """
+    current = {}
+    failures = []
+
+    for page_name, html in pages:
+        current[page_name] = {}
+        expected_rows = reference(html)
+        for parser_name, parse in parsers:
+            records = json.loads(json.dumps(parse(html)))
+            current[page_name][parser_name] = records
+
+            expected = golden.get(page_name, {}).get(parser_name)
+            if expected is None:
+                failures.append(f"{page_name} / {parser_name}: not in {os.path.basename(GOLDEN)}")
+            elif expected != records:
+                failures.append(f"{page_name} / {parser_name}: differs from {os.path.basename(GOLDEN)}\n"
+                                + _describe(_by_code(expected), _by_code(records)))
+
+            rows = normalise(parser_name, records)
+            if rows != expected_rows:
+                failures.append(f"{page_name} / {parser_name}: differs from the legacy nsu3.py parser "
+                                "(code, present, absent, classes, %)\n"
+                                + _describe({r[0]: r[1:] for r in expected_rows}, {r[0]: r[1:] for r in rows}))
+
+    return current, failures
+
+
+def _by_code(records):
+    return {record.get('subject_code', record.get('Subject Code')): record for record in records}
+
+
+def _describe(expected, actual, limit=5):
+    """Indented lines for the first `limit` subjects that differ"""
+    lines = []
+    for code in sorted(set(expected) | set(actual), key=str):
+        if code not in actual:
+            lines.append(f"{code}: missing")
+        elif code not in expected:
+            lines.append(f"{code}: unexpected {actual[code]}")
+        elif isinstance(expected[code], dict):
+            changed = [f"{key} {expected[code].get(key)!r} -> {actual[code].get(key)!r}"
+                       for key in sorted(set(expected[code]) | set(actual[code]))
+                       if expected[code].get(key) != actual[code].get(key)]
+            if changed:
+                lines.append(f"{code}: {', '.join(changed)}")
+        elif expected[code] != actual[code]:
+            lines.append(f"{code}: {expected[code]} -> {actual[code]}")
+    more = f"\n      ... and {len(lines) - limit} more" if len(lines) > limit else ''
+    return '\n'.join(f"      {line}" for line in lines[:limit]) + more
+
+
+def bench(pages, parsers, repeat):
+    """Best-of-5 ops/sec and peak traced allocation (KiB) per parse"""
+    print(f"\n  {'page':<30}{'entry point':<36}{'records':>8}{'ops/sec':>11}{'peak KiB':>10}")
+    for page_name, html in pages:
+        # Scale the run count down for the big pages
+        number = max(1, repeat * 20000 // max(len(html), 20000))
+        for parser_name, parse in parsers:
+            records = parse(html)
+            best = min(timeit.repeat(lambda: parse(html), number=number, repeat=5)) / number
+
+            tracemalloc.start()
+            parse(html)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(f"  {page_name:<30}{parser_name:<36}{len(records):>8}{1 / best:>11.1f}{peak / 1024:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=50, help='Parses per timing run (small pages)')
+    parser.add_argument('--update', action='store_true', help='Record the current outputs as expected')
+    parser.add_argument('--no-bench', action='store_true', help='Only run the regression check')
+    args = parser.parse_args()
+
+    pages = corpus()
+    parsers = entry_points()
+
+    golden = {}
+    if os.path.exists(GOLDEN) and not args.update:
+        with open(GOLDEN, 'r', encoding='utf-8') as f:
+            golden = json.load(f)
+
+    current, failures = check(pages, parsers, golden)
+
+    if args.update:
+        with open(GOLDEN, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f"📝 Recorded {len(pages)} pages x {len(parsers)} entry points in {os.path.basename(GOLDEN)}")
+        failures = [message for message in failures if 'legacy' in message]
+    elif not failures:
+        print(f"✅ {len(pages)} pages x {len(parsers)} entry points match {os.path.basename(GOLDEN)} and the legacy parser")
+
+    for message in failures:
+        print(f"❌ {message}")
+
+    if not args.no_bench:
+        bench(pages, parsers, args.repeat)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+captcha_solver.py
+Unattended CAPTCHA solving: NumPy clean-up of the captchaimg picture, then
+Tesseract, with a cache of answers and accuracy / latency counters
+
+    solver = OcrCaptchaSolver()
+    scrape_attendance(roll_no, password, 0, 0, captcha_solver=solver, engine="http")
+
+Needs the tesseract binary on PATH (pytesseract only wraps it).
+"""
+
+import hashlib
+import string
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+
+DEFAULT_WHITELIST = string.ascii_letters + string.digits
+
+# Gap (px) placed between characters when the line is rebuilt for Tesseract
+SEGMENT_GAP = 6
+
+# Characters narrower than this (px) are treated as leftover noise
+MIN_SEGMENT_WIDTH = 2
+
+
+def preprocess(image_bytes, scale=3):
+    """
+    CAPTCHA image -> black-on-white PIL image ready for Tesseract
+
+    Grayscale, Otsu threshold, isolated-pixel removal, then column
+    segmentation: each character is cropped to its own rows and the line
+    is rebuilt with even gaps, which keeps Tesseract's line mode from
+    merging or splitting glyphs.
+    """
+    rgb = np.asarray(Image.open(BytesIO(image_bytes)).convert('RGB'), dtype=np.float32)
+    gray = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+    ink = gray < otsu_threshold(gray)
+    if ink.mean() > 0.5:
+        # Light text on a dark background
+        ink = ~ink
+
+    ink = denoise(ink)
+    segments = segment_columns(ink)
+    line = compose(ink, segments)
+
+    image = Image.fromarray(np.where(line, 0, 255).astype(np.uint8), mode='L')
+    if scale > 1:
+        image = image.resize((image.width * scale, image.height * scale), Image.NEAREST)
+    return image
+
+
+def otsu_threshold(gray):
+    """Threshold maximising between-class variance of a 0-255 image"""
+    hist = np.bincount(np.clip(gray, 0, 255).astype(np.uint8).ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between)) + 1
+
+
+def denoise(ink, min_neighbours=2):
+    """Drop ink pixels with fewer than `min_neighbours` ink pixels around them (3x3)"""
+    padded = np.pad(ink, 1).astype(np.uint8)
+    h, w = ink.shape
+    neighbours = sum(
+        padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+        for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx
+    )
+    return ink & (neighbours >= min_neighbours)
+
+
+def segment_columns(ink):
+    """(start, stop) column ranges of the runs of columns that contain ink"""
+    has_ink = np.concatenate(([False], ink.any(axis=0), [False]))
+    edges = np.flatnonzero(has_ink[1:] != has_ink[:-1])
+    runs = edges.reshape(-1, 2)
+    return [(int(start), int(stop)) for start, stop in runs if stop - start >= MIN_SEGMENT_WIDTH]
+
+
+def compose(ink, segments, gap=SEGMENT_GAP):
+    """Rebuild the line from the cropped segments, bottom-aligned with even gaps"""
+    if not segments:
+        return ink
+
+    crops = []
+    for start, stop in segments:
+        column = ink[:, start:stop]
+        rows = np.flatnonzero(column.any(axis=1))
+        crops.append(column[rows[0]:rows[-1] + 1])
+
+    height = max(crop.shape[0] for crop in crops) + 2 * gap
+    width = sum(crop.shape[1] for crop in crops) + gap * (len(crops) + 1)
+    line = np.zeros((height, width), dtype=bool)
+
+    x = gap
+    for crop in crops:
+        h, w = crop.shape
+        line[height - gap - h:height - gap, x:x + w] = crop
+        x += w + gap
+    return line
+
+
+def captcha_image(handle):
+    """CAPTCHA bytes from an HttpPortal, or from a driver sitting in the login frame"""
+    if hasattr(handle, 'fetch_captcha'):
+        return handle.fetch_captcha()
+
+    from selenium.webdriver.common.by import By
+    # The element screenshot is the image this session is showing; no extra request
+    return handle.find_element(By.ID, "captchaimg").screenshot_as_png
+
+
+class OcrCaptchaSolver:
+    """
+    captcha_solver for scrape_attendance that reads the CAPTCHA itself
+
+    scrape_attendance retries the login up to `max_attempts` times and
+    reports each outcome through record(), which feeds the accuracy
+    counters and drops cached answers that turned out wrong.
+
+    Args:
+        max_attempts (int): Logins tried per scrape before giving up
+        whitelist (str): Characters Tesseract may return
+        length (int, optional): Expected answer length; answers of any
+            other length are never cached
+        cache_size (int): Image-hash -> answer entries kept
+    """
+
+    def __init__(self, max_attempts=3, whitelist=DEFAULT_WHITELIST, length=None, cache_size=256):
+        self.max_attempts = max_attempts
+        self.whitelist = whitelist
+        self.length = length
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._last = threading.local()
+
+        self.attempts = 0
+        self.solved = 0
+        self.rejected = 0
+        self.cache_hits = 0
+        self.ocr_seconds = 0.0
+
+    def __call__(self, handle):
+        return self.solve(captcha_image(handle))
+
+    def solve(self, image_bytes):
+        """Answer for a CAPTCHA image ('' if nothing usable was read)"""
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        self._last.digest = digest
+
+        with self._lock:
+            self.attempts += 1
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                self.cache_hits += 1
+                return self._cache[digest]
+
+        started = time.perf_counter()
+        text = self._ocr(image_bytes)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.ocr_seconds += elapsed
+            if text and (self.length is None or len(text) == self.length):
+                self._cache[digest] = text
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return text
+
+    def record(self, success):
+        """Outcome of the login that used this thread's last answer"""
+        digest = getattr(self._last, 'digest', None)
+        with self._lock:
+            if success:
+                self.solved += 1
+            else:
+                self.rejected += 1
+                self._cache.pop(digest, None)
+
+    def stats(self):
+        with self._lock:
+            ocr_runs = self.attempts - self.cache_hits
+            decided = self.solved + self.rejected
+            return {
+                'attempts': self.attempts,
+                'solved': self.solved,
+                'rejected': self.rejected,
+                'accuracy': round(self.solved / decided, 3) if decided else None,
+                'cache_hits': self.cache_hits,
+                'avg_ocr_ms': round(self.ocr_seconds / ocr_runs * 1000, 1) if ocr_runs else None,
+            }
+
+    def _ocr(self, image_bytes):
+        config = f'--psm 7 -c tessedit_char_whitelist={self.whitelist}'
+        text = pytesseract.image_to_string(preprocess(image_bytes), config=config)
+        return ''.join(ch for ch in text if ch in self.whitelist)
@@ -0,0 +1,333 @@
+"""
+driver_pool.py
+Bounded pool of warm Chrome drivers shared by the Flask routes
+"""
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from scheduler import browser_scheduler
+
+
+IMS_ORIGIN = "{0.scheme}://{0.netloc}".format(urlsplit(os.getenv("IMS_BASE_URL", "https://www.imsnsit.org/imsnsit/")))
+
+
+# Driver profiles: "default" is what the scraper always used; "performance"
+# is always headless, small, stops waiting at DOMContentLoaded and never
+# downloads what the scraper doesn't read
+PROFILES = ('default', 'performance')
+
+PERFORMANCE_WINDOW_SIZE = "1024,700"
+
+# Network.setBlockedURLs patterns for the performance profile. Decorative
+# images only: the CAPTCHA is a .jpg (images/captcha/captcha_*.jpg) and
+# must still render for element screenshots / OCR
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.gif", "*.ico", "*.svg", "*.webp", "*.bmp",
+    "*.css",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*ajax.googleapis.com*", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+]
+
+
+def build_chrome_options(headless=False, profile='default'):
+    """Chrome options used by every driver the scraper starts"""
+    options = Options()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if profile == 'performance':
+        options.add_argument("--headless=new")
+        options.add_argument(f"--window-size={PERFORMANCE_WINDOW_SIZE}")
+        options.add_argument("--disable-extensions")
+        options.page_load_strategy = 'eager'
+    elif headless:
+        options.add_argument("--headless")
+        options.add_argument("--window-size=1366,768")
+    return options
+
+
+class IsolatedChrome(webdriver.Chrome):
+    """
+    Chrome with a throwaway user-data dir of its own, holding a
+    BrowserScheduler slot until quit()
+    """
+
+    def __init__(self, options, user_data_dir, release):
+        self.user_data_dir = user_data_dir
+        self._release = release
+        super().__init__(options=options)
+
+    def quit(self):
+        try:
+            super().quit()
+        finally:
+            release, self._release = self._release, None
+            if release:
+                release()
+                shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+def start_driver(headless=False, profile='default', scheduler=None):
+    """
+    Cold-start a single Chrome driver with one of PROFILES
+
+    Waits for a slot from `scheduler` (the process-wide browser_scheduler
+    by default), which may raise scheduler.AdmissionRefused. Each driver
+    gets its own temp profile directory, removed on quit().
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown driver profile: {profile}")
+
+    scheduler = scheduler or browser_scheduler
+    scheduler.acquire()
+    user_data_dir = tempfile.mkdtemp(prefix="ims-chrome-")
+    try:
+        options = build_chrome_options(headless, profile)
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+        driver = IsolatedChrome(options, user_data_dir, scheduler.release)
+    except Exception:
+        scheduler.release()
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+        raise
+
+    try:
+        if profile == 'performance':
+            block_resources(driver)
+        elif not headless:
+            driver.maximize_window()
+    except Exception:
+        driver.quit()
+        raise
+    return driver
+
+
+def block_resources(driver, patterns=BLOCKED_URL_PATTERNS):
+    """
+    Have Chrome fail requests matching `patterns` before they go out
+    (CDP Network.setBlockedURLs; lasts for the driver's lifetime)
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+class DriverPoolExhausted(Exception):
+    """Raised when no driver could be checked out before the timeout"""
+
+
+class DriverPool:
+    """
+    Thread-safe pool of pre-started Chrome drivers
+
+    Drivers are created lazily up to `size`, handed out with checkout()
+    and returned with checkin(). A returned driver has its cookies and
+    storage wiped so the next user starts from a clean profile. Drivers
+    that crashed, fail the health check or have been used `max_uses`
+    times are quit and replaced.
+
+    Args:
+        size (int): Maximum number of live drivers
+        max_uses (int): Recycle a driver after this many checkouts
+        headless (bool): Start drivers in headless mode
+        profile (str): Driver profile from PROFILES ("performance" implies headless)
+        checkout_timeout (float): Seconds to wait for a free driver
+    """
+
+    def __init__(self, size=2, max_uses=50, headless=True, checkout_timeout=60, profile='default'):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown driver profile: {profile}")
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self.profile = profile
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._uses = {}
+        self._closed = False
+
+        self.created = 0
+        self.recycled = 0
+
+    def warm(self, count=None):
+        """Pre-start drivers so the first requests don't pay for Chrome startup"""
+        count = self.size if count is None else min(count, self.size)
+
+        for _ in range(count):
+            with self._lock:
+                if self._live >= self.size:
+                    return
+                self._live += 1
+            try:
+                self._idle.put(self._create())
+            except Exception:
+                with self._lock:
+                    self._live -= 1
+                raise
+
+    def warm_async(self, count=None):
+        """Warm the pool in a background thread"""
+        thread = threading.Thread(target=self.warm, args=(count,), daemon=True)
+        thread.start()
+        return thread
+
+    def checkout(self, timeout=None):
+        """
+        Borrow a driver from the pool
+
+        Returns an idle driver if one is healthy, otherwise starts a new
+        one while under `size`, otherwise blocks until one is checked in.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            if self._closed:
+                raise DriverPoolExhausted("Driver pool is closed")
+
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = None
+
+            if driver is not None:
+                if self._is_healthy(driver):
+                    self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+                    return driver
+                self._discard(driver)
+                continue
+
+            with self._lock:
+                can_create = self._live < self.size
+                if can_create:
+                    self._live += 1
+
+            if can_create:
+                try:
+                    driver = self._create()
+                except Exception:
+                    with self._lock:
+                        self._live -= 1
+                    raise
+                self._uses[id(driver)] = 1
+                return driver
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DriverPoolExhausted(f"No driver available after {timeout}s")
+
+            try:
+                driver = self._idle.get(timeout=remaining)
+            except queue.Empty:
+                raise DriverPoolExhausted(f"No driver available after {timeout}s")
+
+            # Put it back and let the loop run the health check
+            self._idle.put(driver)
+
+    def checkin(self, driver, broken=False):
+        """
+        Return a driver to the pool
+
+        Args:
+            driver: Driver previously returned by checkout()
+            broken (bool): The caller hit a crash; quit instead of reusing
+        """
+        if driver is None:
+            return
+
+        if broken or self._closed or self._uses.get(id(driver), 0) >= self.max_uses:
+            self._discard(driver)
+            return
+
+        try:
+            self._reset(driver)
+        except Exception:
+            self._discard(driver)
+            return
+
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager around checkout()/checkin()"""
+        driver = self.checkout(timeout)
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.checkin(driver, broken=broken)
+
+    def stats(self):
+        """Current pool counters"""
+        return {
+            'size': self.size,
+            'live': self._live,
+            'idle': self._idle.qsize(),
+            'in_use': self._live - self._idle.qsize(),
+            'created': self.created,
+            'recycled': self.recycled,
+        }
+
+    def close(self):
+        """Quit every idle driver; drivers still checked out are quit on checkin"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+    def _create(self):
+        driver = start_driver(self.headless, self.profile)
+        self.created += 1
+        return driver
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        with self._lock:
+            self._live -= 1
+        self.recycled += 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.switch_to.default_content()
+            return bool(driver.window_handles)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver):
+        """Wipe cookies, cache and site storage left by the previous user"""
+        driver.switch_to.default_content()
+        driver.delete_all_cookies()
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                "origin": IMS_ORIGIN,
+                "storageTypes": "all",
+            })
+        except Exception:
+            # Not every driver speaks CDP; cookies are already gone
+            pass
+        driver.get("about:blank")
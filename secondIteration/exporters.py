@@ -0,0 +1,162 @@
+"""
+exporters.py
+Stream history rows out as CSV, XLSX or Parquet in constant memory
+
+Each exporter takes an iterable of COLUMNS tuples (HistoryStore.iter_rows)
+and returns a generator of bytes chunks for a streamed Flask Response.
+CSV and Parquet send bytes as rows are read; an XLSX file is a zip that
+needs its sheet complete, so it is built on disk first (see iter_xlsx).
+"""
+
+import csv
+import io
+import os
+import tempfile
+
+from history_store import COLUMNS
+
+
+CHUNK_SIZE = 64 * 1024
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def iter_csv(rows, batch_size=500):
+    """CSV header + rows, `batch_size` rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if i % batch_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_xlsx(rows):
+    """
+    Workbook built with openpyxl's write-only mode (rows go straight to a
+    temp file), then streamed from disk
+
+    Memory stays flat, but no byte goes out until every row has been
+    written to the temp file: the first chunk waits for the whole export.
+    Use CSV or Parquet when that matters.
+    """
+    from openpyxl import Workbook
+
+    def write(path):
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Attendance')
+        sheet.append(COLUMNS)
+        for row in rows:
+            sheet.append(row)
+        workbook.save(path)
+
+    return _stream_temp_file(write, '.xlsx')
+
+
+def iter_parquet(rows, batch_size=10000):
+    """
+    Parquet written one row group per `batch_size` rows, each sent as soon
+    as it is encoded (the footer goes last); needs pyarrow
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('roll_no', pa.string()),
+        ('year_idx', pa.int32()),
+        ('semester_idx', pa.int32()),
+        ('subject_code', pa.string()),
+        ('subject_name', pa.string()),
+        ('classes_present', pa.int32()),
+        ('classes_absent', pa.int32()),
+        ('total_classes', pa.int32()),
+        ('attendance_percentage', pa.float64()),
+        ('scraped_at', pa.float64()),
+    ])
+
+    def chunks():
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == batch_size:
+                    writer.write_table(_table(pa, schema, batch))
+                    batch = []
+                    yield from sink.drain()
+            if batch:
+                writer.write_table(_table(pa, schema, batch))
+        yield from sink.drain()
+
+    return chunks()
+
+
+def exporter(fmt):
+    """Exporter function for a FORMATS key"""
+    return {'csv': iter_csv, 'xlsx': iter_xlsx, 'parquet': iter_parquet}[fmt]
+
+
+def _table(pa, schema, batch):
+    columns = list(zip(*batch))
+    return pa.Table.from_arrays([pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                                schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that keeps what was written until drain() takes it"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        """Yield what was written since the last drain, CHUNK_SIZE at a time"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        for start in range(0, len(data), CHUNK_SIZE):
+            yield data[start:start + CHUNK_SIZE]
+
+
+def _stream_temp_file(write, suffix):
+    """
+    Run write(path) on a temp file, then yield it in chunks and delete it;
+    the writing happens on the first next(), not when this is called
+    """
+    def chunks():
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        try:
+            write(path)
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+        finally:
+            os.remove(path)
+
+    return chunks()
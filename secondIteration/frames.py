@@ -0,0 +1,179 @@
+"""
+frames.py
+Remembers which IMS frame holds what, per driver, and the My Attendance URL
+per student, and queries a frame's DOM with a single script call (menu
+links, tree nodes, attendance tables)
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+
+
+# Frames searched after login, most likely first
+CONTENT_FRAMES = ('data', 'contents', 'bottom', 'top')
+
+# Frames the menu links and tree can be in
+MENU_FRAMES = ('data', 'top', 'contents', 'bottom', 'banner')
+
+_MATCH_JS = """
+function matches(text, keywords, exact) {
+    if (exact) { return keywords.indexOf(text) !== -1; }
+    var lower = text.toLowerCase();
+    return keywords.some(function (k) { return lower.indexOf(k.toLowerCase()) !== -1; });
+}
+"""
+
+# First visible <a> whose text matches: [element, text] or null
+_FIND_LINK_JS = _MATCH_JS + """
+var keywords = arguments[0], exact = arguments[1];
+var links = document.getElementsByTagName('a');
+for (var i = 0; i < links.length; i++) {
+    var link = links[i];
+    if (!link.getClientRects().length) { continue; }
+    var text = (link.innerText || '').trim();
+    if (matches(text, keywords, exact)) { return [link, text]; }
+}
+return null;
+"""
+
+# First collapsed tree hitarea whose node text matches: [hitarea, text] or null
+_FIND_TREE_NODE_JS = _MATCH_JS + """
+var keywords = arguments[0];
+var hitareas = document.getElementsByClassName('expandable-hitarea');
+for (var i = 0; i < hitareas.length; i++) {
+    var parent = hitareas[i].parentElement;
+    var text = parent ? (parent.innerText || '').trim() : '';
+    if (matches(text, keywords, false)) { return [hitareas[i], text]; }
+}
+return null;
+"""
+
+# After a login click: the login form is still up and no frame shows the menu
+_LOGIN_FAILED_JS = """
+var t = window.top, docs = [t.document];
+for (var i = 0; i < t.frames.length; i++) { try { docs.push(t.frames[i].document); } catch (e) {} }
+var form = false, menu = false;
+docs.forEach(function (d) {
+    if (d.getElementById('uid')) { form = true; }
+    var links = d.getElementsByTagName('a');
+    for (var j = 0; j < links.length; j++) {
+        if (/My Activities/i.test(links[j].textContent)) { menu = true; }
+    }
+});
+return form && !menu;
+"""
+
+# Top-level tables mentioning a subject code (the grid and the legend), minus
+# the year/semester form; null if the frame has none
+_ATTENDANCE_TABLES_JS = """
+var out = [];
+var tables = document.getElementsByTagName('table');
+for (var i = 0; i < tables.length; i++) {
+    var table = tables[i];
+    if (table.parentElement && table.parentElement.closest('table')) { continue; }
+    if (table.getElementsByTagName('select').length) { continue; }
+    if (/[A-Z]{2,5}\\d{3,4}/.test(table.textContent)) { out.push(table.outerHTML); }
+}
+return out.length ? '<html><body>' + out.join('') + '</body></html>' : null;
+"""
+
+
+class FrameMap:
+    """
+    Per-driver memory of the frame each role ("attendance_form",
+    "attendance_table", ...) was last found in
+
+    Entries live as long as the driver object, so pooled drivers keep
+    their map across scrapes.
+    """
+
+    def __init__(self):
+        self._maps = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def order(self, driver, role, candidates=CONTENT_FRAMES):
+        """`candidates` with the frame last seen holding `role` moved to the front"""
+        with self._lock:
+            known = self._maps.get(driver, {}).get(role)
+        if known in candidates:
+            return (known,) + tuple(name for name in candidates if name != known)
+        return tuple(candidates)
+
+    def remember(self, driver, role, frame_name):
+        with self._lock:
+            self._maps.setdefault(driver, {})[role] = frame_name
+
+    def forget(self, driver, role=None):
+        with self._lock:
+            if role is None:
+                self._maps.pop(driver, None)
+            else:
+                self._maps.get(driver, {}).pop(role, None)
+
+
+class LearnedUrls:
+    """
+    My Attendance form URL learned per roll number, kept across logins and
+    drivers so the next scrape of that student can skip the menus
+
+    The URL is only ever replayed for the student it was learned for, after
+    they have logged in again. If its query tokens were tied to the old
+    session the form doesn't load; the caller then walks the menus and
+    remembers the new URL.
+
+    Args:
+        max_entries (int): LRU capacity
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._urls = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, roll_no):
+        with self._lock:
+            url = self._urls.get(roll_no)
+            if url is not None:
+                self._urls.move_to_end(roll_no)
+            return url
+
+    def remember(self, roll_no, url):
+        with self._lock:
+            self._urls[roll_no] = url
+            self._urls.move_to_end(roll_no)
+            while len(self._urls) > self.max_entries:
+                self._urls.popitem(last=False)
+
+    def forget(self, roll_no):
+        with self._lock:
+            self._urls.pop(roll_no, None)
+
+
+frame_map = FrameMap()
+learned_urls = LearnedUrls()
+
+
+def find_link(driver, keywords, exact_match=False):
+    """(element, text) of the first visible matching link in the current frame, or None"""
+    found = driver.execute_script(_FIND_LINK_JS, list(keywords), exact_match)
+    return tuple(found) if found else None
+
+
+def find_tree_node(driver, keywords):
+    """(hitarea, node text) of the first collapsed matching tree node in the current frame, or None"""
+    found = driver.execute_script(_FIND_TREE_NODE_JS, list(keywords))
+    return tuple(found) if found else None
+
+
+def login_failed(driver):
+    """True if the portal sent the login form back instead of the menu"""
+    return bool(driver.execute_script(_LOGIN_FAILED_JS))
+
+
+def attendance_tables_html(driver):
+    """
+    Attendance grid + legend tables of the current frame as a small HTML
+    document, or None. One round trip instead of page_source.
+    """
+    return driver.execute_script(_ATTENDANCE_TABLES_JS)
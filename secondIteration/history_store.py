@@ -0,0 +1,277 @@
+"""
+history_store.py
+Append-only history of scrape results in SQLite, with incremental
+day-partitioned Parquet exports for bulk analytics (one-off exports
+stream through exporters.py)
+"""
+
+import hashlib
+import hmac
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from itertools import groupby
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrapes (
+    id INTEGER PRIMARY KEY,
+    roll_no TEXT NOT NULL,
+    year_idx INTEGER,
+    semester_idx INTEGER,
+    scraped_at REAL NOT NULL,
+    source TEXT,
+    owner TEXT
+);
+
+CREATE TABLE IF NOT EXISTS attendance (
+    scrape_id INTEGER NOT NULL REFERENCES scrapes(id),
+    roll_no TEXT NOT NULL,
+    year_idx INTEGER,
+    semester_idx INTEGER,
+    subject_code TEXT NOT NULL,
+    subject_name TEXT,
+    classes_present INTEGER,
+    classes_absent INTEGER,
+    total_classes INTEGER,
+    attendance_percentage REAL,
+    scraped_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_attendance_hot
+    ON attendance (roll_no, semester_idx, subject_code, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_scrapes_roll_no
+    ON scrapes (roll_no, year_idx, semester_idx, scraped_at);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+COLUMNS = (
+    'roll_no', 'year_idx', 'semester_idx', 'subject_code', 'subject_name',
+    'classes_present', 'classes_absent', 'total_classes', 'attendance_percentage', 'scraped_at',
+)
+
+
+class HistoryStore:
+    """
+    Every scrape result, one row per subject
+
+    Rows are tagged with an owner digest (roll_no + password) like
+    ResultCache entries, so history is only served to someone who could
+    have scraped it; rows stored without a password are never served per
+    student. Each call opens its own connection; SQLite in WAL mode
+    handles the concurrent readers and the single writer.
+
+    Args:
+        path (str): SQLite database file
+        secret (bytes, optional): Key for owner digests. Without one, a key
+            generated on first use is kept in the database's meta table, so
+            digests survive restarts
+    """
+
+    def __init__(self, path="attendance_history.db", secret=None):
+        self.path = path
+        self._write_lock = threading.Lock()
+
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            self._secret = secret or self._stored_secret(db)
+
+    def append(self, roll_no, year_idx, semester_idx, records, password=None, source=None, scraped_at=None):
+        """
+        Store one scrape result
+
+        Args:
+            records (list): API attendance dicts (subject_code, subject_name, ...)
+            password (str, optional): Tags the rows with an owner digest
+            source (str, optional): Where the scrape came from, e.g. "api", "nsu3"
+
+        Returns:
+            int: scrape id
+        """
+        scraped_at = scraped_at or time.time()
+        owner = self._owner_digest(roll_no, password) if password else None
+
+        with self._write_lock, closing(self._connect()) as db, db:
+            cursor = db.execute(
+                "INSERT INTO scrapes (roll_no, year_idx, semester_idx, scraped_at, source, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (roll_no, year_idx, semester_idx, scraped_at, source, owner),
+            )
+            scrape_id = cursor.lastrowid
+            db.executemany(
+                "INSERT INTO attendance (scrape_id, roll_no, year_idx, semester_idx, subject_code, subject_name, "
+                "classes_present, classes_absent, total_classes, attendance_percentage, scraped_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(scrape_id, roll_no, year_idx, semester_idx, r['subject_code'], r.get('subject_name'),
+                  r.get('classes_present'), r.get('classes_absent'), r.get('total_classes'),
+                  r.get('attendance_percentage'), scraped_at) for r in records],
+            )
+        return scrape_id
+
+    def history(self, roll_no, password=None, semester_idx=None, subject_code=None,
+                since=None, until=None, limit=None):
+        """
+        Stored rows for a student, oldest first
+
+        Args:
+            password (str, optional): Only rows stored with this password
+                are returned (none without one)
+            since, until (float, optional): scraped_at bounds (Unix time)
+            limit (int, optional): Newest `limit` rows only
+
+        Returns:
+            list: Dicts with the COLUMNS keys
+        """
+        query, params = self._select(roll_no, password, semester_idx, subject_code, since, until)
+        if limit:
+            query = f"SELECT * FROM ({query} ORDER BY a.scraped_at DESC LIMIT ?) ORDER BY scraped_at"
+            params.append(int(limit))
+        else:
+            query += " ORDER BY a.scraped_at"
+
+        with closing(self._connect()) as db:
+            return [dict(row) for row in db.execute(query, params)]
+
+    def latest(self, roll_no, year_idx, semester_idx, password=None):
+        """
+        Records of the most recent scrape for (roll_no, year, semester)
+
+        Returns:
+            tuple: (records in the API format, scraped_at), or (None, None)
+        """
+        with closing(self._connect()) as db:
+            scrape = db.execute(
+                "SELECT id, scraped_at FROM scrapes WHERE roll_no = ? AND year_idx IS ? AND semester_idx IS ? "
+                "AND owner = ? ORDER BY scraped_at DESC LIMIT 1",
+                (roll_no, year_idx, semester_idx, self._owner_digest(roll_no, password) if password else ''),
+            ).fetchone()
+            if scrape is None:
+                return None, None
+
+            rows = db.execute(
+                "SELECT subject_code, subject_name, classes_present, classes_absent, total_classes, "
+                "attendance_percentage FROM attendance WHERE scrape_id = ? ORDER BY rowid",
+                (scrape['id'],),
+            ).fetchall()
+        return [dict(row) for row in rows], scrape['scraped_at']
+
+    def iter_rows(self, since=None, until=None, batch_size=1000):
+        """
+        Yield every stored row (all students) as COLUMNS tuples, in
+        scraped_at order, fetching `batch_size` at a time
+        """
+        query, params = self._select(None, None, None, None, since, until)
+        with closing(self._connect()) as db:
+            cursor = db.execute(query + " ORDER BY a.scraped_at", params)
+            cursor.row_factory = None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+    def export_parquet(self, directory):
+        """
+        Write rows added since the last export as Parquet, partitioned by
+        day (scraped_on=YYYY-MM-DD/part-<last scrape id>.parquet, UTC days)
+
+        Rows are read in scraped_at order and each day's file is streamed
+        through exporters.iter_parquet, so memory stays flat however much
+        is new. Needs pyarrow.
+
+        Returns:
+            int: Rows written
+        """
+        from exporters import iter_parquet
+
+        written = 0
+
+        def counted(rows):
+            nonlocal written
+            for row in rows:
+                written += 1
+                yield row[1:]
+
+        with self._write_lock, closing(self._connect()) as db, db:
+            row = db.execute("SELECT value FROM meta WHERE key = 'parquet_last_scrape'").fetchone()
+            last = int(row['value']) if row else 0
+            newest = db.execute("SELECT MAX(id) FROM scrapes").fetchone()[0] or 0
+            if newest <= last:
+                return 0
+
+            cursor = db.execute(
+                f"SELECT date(scraped_at, 'unixepoch'), {', '.join(COLUMNS)} FROM attendance "
+                "WHERE scrape_id > ? AND scrape_id <= ? ORDER BY scraped_at, scrape_id",
+                (last, newest),
+            )
+            cursor.row_factory = None
+            for day, rows in groupby(cursor, key=lambda row: row[0]):
+                partition = os.path.join(directory, f"scraped_on={day}")
+                os.makedirs(partition, exist_ok=True)
+                path = os.path.join(partition, f"part-{newest}.parquet")
+                with open(path + '.tmp', 'wb') as f:
+                    for chunk in iter_parquet(counted(rows)):
+                        f.write(chunk)
+                os.replace(path + '.tmp', path)
+
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('parquet_last_scrape', ?)", (str(newest),))
+        return written
+
+    def stats(self):
+        with closing(self._connect()) as db:
+            scrapes = db.execute("SELECT COUNT(*) FROM scrapes").fetchone()[0]
+            rows = db.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+        return {'path': self.path, 'scrapes': scrapes, 'rows': rows}
+
+    def _select(self, roll_no, password, semester_idx, subject_code, since, until):
+        query = (f"SELECT {', '.join('a.' + c for c in COLUMNS)} FROM attendance a "
+                 "JOIN scrapes s ON s.id = a.scrape_id WHERE 1 = 1")
+        params = []
+        if roll_no is not None:
+            query += " AND a.roll_no = ? AND s.owner = ?"
+            params += [roll_no, self._owner_digest(roll_no, password) if password else '']
+        if semester_idx is not None:
+            query += " AND a.semester_idx = ?"
+            params.append(semester_idx)
+        if subject_code is not None:
+            query += " AND a.subject_code = ?"
+            params.append(subject_code)
+        if since is not None:
+            query += " AND a.scraped_at >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND a.scraped_at < ?"
+            params.append(until)
+        return query, params
+
+    @staticmethod
+    def _stored_secret(db):
+        """Owner digest key from the meta table, created on first use"""
+        db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('owner_secret', ?)", (os.urandom(32).hex(),))
+        db.commit()
+        row = db.execute("SELECT value FROM meta WHERE key = 'owner_secret'").fetchone()
+        return bytes.fromhex(row['value'])
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def _owner_digest(self, roll_no, password):
+        return hmac.new(self._secret, f'{roll_no}\0{password}'.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def history_store_from_env():
+    """HistoryStore configured from HISTORY_* environment variables"""
+    secret = os.getenv("HISTORY_SECRET")
+    return HistoryStore(
+        path=os.getenv("HISTORY_DB", "attendance_history.db"),
+        secret=secret.encode('utf-8') if secret else None,
+    )
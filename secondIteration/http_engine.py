@@ -0,0 +1,440 @@
+"""
+http_engine.py
+Browser-free IMS scraper: drives the same login and My Attendance flow
+with plain HTTP requests against the server-rendered frames
+"""
+
+import re
+import traceback
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+
+from attendance_parser import parse_attendance
+from attendance_scraper_api import IMS_BASE_URL
+from metrics import StepTimer
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/132.0 Safari/537.36"
+)
+
+# JS-driven frame loads, e.g. parent.frames[4].location.href='plum_url.php?...'
+FRAME_SCRIPT_RE = re.compile(r"""frames\[\d+\]\.location\.href\s*=\s*['"]([^'"]+)['"]""")
+
+
+class HttpPortalError(Exception):
+    """The portal answered with something the HTTP flow cannot handle"""
+
+
+class LoginFailed(HttpPortalError):
+    """Credentials or CAPTCHA were rejected"""
+
+
+class TermMismatch(HttpPortalError):
+    """
+    The portal answered the My Attendance form with another semester than
+    the one asked for. The form carries enc_year / enc_sem, encrypted
+    copies of the term it was rendered for, that plain HTTP can't redo;
+    a browser, whose dropdown events update them, can.
+    """
+
+
+class HttpPortal:
+    """
+    One logged-in (or logging-in) IMS session over requests
+
+    Args:
+        base_url (str): Portal root
+        session (requests.Session, optional): Reuse an existing session,
+            e.g. one seeded with cookies copied from a Selenium driver
+        timeout (float): Per-request timeout in seconds
+    """
+
+    def __init__(self, base_url=IMS_BASE_URL, session=None, timeout=15):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", USER_AGENT)
+
+        self.login_url = None
+        self.login_action = None
+        self.login_fields = None
+        self.captcha_url = None
+        self.landing_pages = {}
+        self.attendance_url = None
+        self.attendance_html = None
+
+    # -- Step 1: login ----------------------------------------------------
+
+    def open_login(self):
+        """Load the landing page and locate the login form and CAPTCHA"""
+        url, html = self._get(self.base_url)
+
+        login_href = _find_link(html, url, ['Student Login'])
+        if login_href:
+            url, html = self._get(login_href, referer=url)
+
+        for page_url, page_html in self._walk_frames(url, html):
+            soup = BeautifulSoup(page_html, 'html.parser')
+            uid_input = soup.find('input', id='uid')
+            if not uid_input:
+                continue
+
+            form = uid_input.find_parent('form')
+            if form is None:
+                raise HttpPortalError('Login inputs are not inside a form')
+
+            self.login_url = page_url
+            self.login_action = urljoin(page_url, form.get('action') or page_url)
+            self.login_fields = _form_fields(form)
+
+            captcha_img = soup.find('img', id='captchaimg')
+            if captcha_img and captcha_img.get('src'):
+                self.captcha_url = urljoin(page_url, captcha_img['src'])
+            return self
+
+        raise HttpPortalError('Login form not found')
+
+    def fetch_captcha(self):
+        """Bytes of the CAPTCHA image bound to this session"""
+        if not self.captcha_url:
+            raise HttpPortalError('No CAPTCHA on the login page')
+        response = self.session.get(self.captcha_url, timeout=self.timeout,
+                                    headers={'Referer': self.login_url})
+        response.raise_for_status()
+        return response.content
+
+    def login(self, roll_no, password, captcha_text):
+        """POST uid/pwd/cap and keep the pages the portal returns"""
+        if self.login_fields is None:
+            self.open_login()
+
+        fields = dict(self.login_fields)
+        fields.update({'uid': roll_no, 'pwd': password, 'cap': captcha_text})
+
+        url, html = self._post(self.login_action, fields, referer=self.login_url)
+
+        pages = dict(self._walk_frames(url, html))
+        if not any(_find_link(page, page_url, ['My Activities']) for page_url, page in pages.items()):
+            soup = BeautifulSoup(html, 'html.parser')
+            if soup.find('input', id='uid'):
+                raise LoginFailed('Login failed: wrong credentials or CAPTCHA')
+            raise HttpPortalError('Logged-in menu not found after login')
+
+        self.landing_pages = pages
+        return self
+
+    # -- Step 2: My Activities -> My Attendance ---------------------------
+
+    def open_attendance_form(self):
+        """Follow My Activities and My Attendance, returning the form page HTML"""
+        activities_href = None
+        referer = None
+        for page_url, page in self.landing_pages.items():
+            activities_href = _find_link(page, page_url, ['My Activities'])
+            if activities_href:
+                referer = page_url
+                break
+
+        if not activities_href:
+            raise HttpPortalError('Could not find My Activities link')
+
+        url, html = self._get(activities_href, referer=referer)
+
+        attendance_href = None
+        for page_url, page in self._walk_frames(url, html):
+            attendance_href = _find_link(page, page_url, ['My Attendance'], exact_match=True)
+            if attendance_href:
+                referer = page_url
+                break
+
+        if not attendance_href:
+            raise HttpPortalError('Could not find My Attendance option')
+
+        self.attendance_url, self.attendance_html = self._get(attendance_href, referer=referer)
+        return self.attendance_html
+
+    def resume_attendance_form(self, url):
+        """Load a known My Attendance URL directly, skipping the menu links"""
+        self.attendance_url, self.attendance_html = self._get(url)
+        return self.attendance_html
+
+    # -- Step 3: Year / Semester form -------------------------------------
+
+    def submit_attendance_form(self, year_idx, semester_idx):
+        """
+        Pick year/semester by dropdown index and POST the My Attendance form
+
+        Raises TermMismatch if the report that comes back is for another
+        semester (see _check_term)
+        """
+        if self.attendance_html is None:
+            self.open_attendance_form()
+
+        soup = BeautifulSoup(self.attendance_html, 'html.parser')
+
+        form = None
+        year_select = sem_select = None
+        for candidate in soup.find_all('form'):
+            year_select = sem_select = None
+            for select in candidate.find_all('select'):
+                select_name = (select.get('name') or select.get('id') or '').lower()
+                if 'year' in select_name or 'yr' in select_name:
+                    year_select = select
+                elif 'sem' in select_name:
+                    sem_select = select
+            if year_select and sem_select:
+                form = candidate
+                break
+
+        if form is None:
+            raise HttpPortalError('Could not submit attendance form')
+
+        fields = _form_fields(form)
+        semester = _option_value(sem_select, semester_idx)
+        fields[year_select.get('name')] = _option_value(year_select, year_idx)
+        fields[sem_select.get('name')] = semester
+
+        action = urljoin(self.attendance_url, form.get('action') or self.attendance_url)
+        _, html = self._post(action, fields, referer=self.attendance_url)
+        _check_term(html, semester)
+        return html
+
+    # -- Plumbing ---------------------------------------------------------
+
+    def cookies(self):
+        """Session cookies as Selenium-style dicts"""
+        return [
+            {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path}
+            for c in self.session.cookies
+        ]
+
+    def add_cookies(self, cookies):
+        """Seed the session from Selenium-style cookie dicts"""
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain', ''), path=cookie.get('path', '/'),
+            )
+
+    def _get(self, url, referer=None):
+        headers = {'Referer': referer} if referer else {}
+        response = self.session.get(url, timeout=self.timeout, headers=headers)
+        response.raise_for_status()
+        return response.url, response.text
+
+    def _post(self, url, data, referer=None):
+        headers = {'Referer': referer} if referer else {}
+        response = self.session.post(url, data=data, timeout=self.timeout, headers=headers)
+        response.raise_for_status()
+        return response.url, response.text
+
+    def _walk_frames(self, url, html, depth=2):
+        """Yield (url, html) for a page and the frames it loads, breadth first"""
+        seen = set()
+        queue = [(url, html, 0)]
+
+        while queue:
+            page_url, page_html, level = queue.pop(0)
+            if page_url in seen:
+                continue
+            seen.add(page_url)
+            yield page_url, page_html
+
+            if level >= depth:
+                continue
+
+            soup = BeautifulSoup(page_html, 'html.parser')
+            sources = [frame.get('src') for frame in soup.find_all(['frame', 'iframe'])]
+            sources += FRAME_SCRIPT_RE.findall(page_html)
+
+            for src in sources:
+                if not src or src.startswith(('javascript:', 'about:')):
+                    continue
+                frame_url = urljoin(page_url, src)
+                if frame_url in seen:
+                    continue
+                try:
+                    frame_url, frame_html = self._get(frame_url, referer=page_url)
+                except requests.RequestException:
+                    continue
+                queue.append((frame_url, frame_html, level + 1))
+
+
+def _find_link(html, base_url, keywords, exact_match=False):
+    """Absolute href of the first <a> whose text matches, or None"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for link in soup.find_all('a', href=True):
+        link_text = link.get_text(strip=True)
+
+        if exact_match:
+            matched = link_text in keywords
+        else:
+            matched = any(keyword.lower() in link_text.lower() for keyword in keywords)
+
+        if matched and not link['href'].startswith('javascript:'):
+            return urljoin(base_url, link['href'])
+    return None
+
+
+def _form_fields(form):
+    """Successful controls of a form, the way a browser would submit them"""
+    fields = {}
+
+    for input_elem in form.find_all('input'):
+        name = input_elem.get('name')
+        input_type = (input_elem.get('type') or 'text').lower()
+        value = input_elem.get('value', '')
+
+        if not name or input_type in ('button', 'image', 'file', 'reset'):
+            continue
+        if input_type in ('checkbox', 'radio') and not input_elem.has_attr('checked'):
+            continue
+        # Only the Submit button is "clicked"; skip PDF/download buttons
+        if input_type == 'submit' and (name != 'submit' and value.lower() != 'submit'):
+            continue
+
+        fields[name] = value
+
+    for select in form.find_all('select'):
+        name = select.get('name')
+        if not name:
+            continue
+        selected = select.find('option', selected=True) or select.find('option')
+        fields[name] = selected.get('value', selected.get_text(strip=True)) if selected else ''
+
+    for textarea in form.find_all('textarea'):
+        if textarea.get('name'):
+            fields[textarea['name']] = textarea.get_text()
+
+    return fields
+
+
+def _check_term(html, semester):
+    """
+    Raise TermMismatch unless the report header ("Name: ... Semester : 6")
+    names `semester`, the submitted option value. Pages without a header
+    (nothing recorded for the term) pass. The header has no year, so the
+    year can't be checked.
+    """
+    found = parse_attendance(html).semester
+    if found is not None and str(semester).strip().isdigit() and found != int(semester):
+        raise TermMismatch(f"Portal returned semester {found} instead of {semester}")
+
+
+def _option_value(select, index):
+    options = select.find_all('option')
+    if not 0 <= index < len(options):
+        raise HttpPortalError(f"Option index {index} out of range for '{select.get('name')}'")
+    option = options[index]
+    return option.get('value', option.get_text(strip=True))
+
+
+def scrape_attendance_http(roll_no, password, year_idx, semester_idx, captcha_solver=None, portal=None,
+                           auth_cache=None, extract_for=None, terms=None, timer=None, browser_fallback=None):
+    """
+    Scrape attendance over plain HTTP; same contract as scrape_attendance
+
+    Args:
+        roll_no (str): Student roll number
+        password (str): Student password
+        year_idx (int): Year dropdown index (0-based)
+        semester_idx (int): Semester dropdown index (0-based)
+        captcha_solver (callable, optional): Receives the HttpPortal, returns CAPTCHA text
+        portal (HttpPortal, optional): Portal already sitting on the login page
+        auth_cache (AuthSessionCache, optional): Remember the session after login
+        extract_for (callable, optional): (year_idx, semester_idx) -> extractor
+            (html -> attendance records); defaults to the scraper's table extractor
+        terms (list, optional): (year_idx, semester_idx) pairs to fetch in one login
+        timer (StepTimer, optional): Receives a span per step
+        browser_fallback (callable, optional): (cookies, form URL, terms) ->
+            {term: result}; fetches a term the portal answered with another
+            semester (TermMismatch) in a browser on this same session
+
+    Returns:
+        dict: Same shape as scrape_attendance
+    """
+    # Imported here: attendance_scraper_api imports this module for engine="http"
+    from attendance_scraper_api import _combine, _extract_attendance_table, _record_captcha, _term_result
+    extract_for = extract_for or (lambda year, semester: _extract_attendance_table)
+    timer = timer or StepTimer()
+
+    multi = terms is not None
+    terms = [tuple(term) for term in terms] if multi else [(year_idx, semester_idx)]
+
+    try:
+        if portal is None:
+            with timer.span('open_login'):
+                portal = HttpPortal().open_login()
+
+        if not captcha_solver:
+            return {
+                'success': False,
+                'error': 'CAPTCHA required but no solver provided'
+            }
+
+        # A solver with max_attempts (e.g. OcrCaptchaSolver) gets a fresh
+        # login page and CAPTCHA after each rejection
+        attempts = getattr(captcha_solver, 'max_attempts', 1)
+        for attempt in range(1, attempts + 1):
+            with timer.span('captcha'):
+                captcha_text = captcha_solver(portal)
+            try:
+                with timer.span('login'):
+                    portal.login(roll_no, password, captcha_text)
+            except LoginFailed:
+                _record_captcha(captcha_solver, False)
+                if attempt == attempts:
+                    raise
+                with timer.span('open_login'):
+                    portal.open_login()
+            else:
+                _record_captcha(captcha_solver, True)
+                break
+
+        # The form page is fetched once; each term is a POST of it. Terms
+        # the portal answers with another semester (stale enc_year /
+        # enc_sem) are never labelled with that page: they are fetched
+        # afterwards in one browser on this session, if there is a fallback
+        results = {}
+        mismatched = []
+        for term in terms:
+            extract = extract_for(*term)
+            try:
+                with timer.span('form_submit'):
+                    html = portal.submit_attendance_form(*term)
+            except HttpPortalError as e:
+                if isinstance(e, TermMismatch) and browser_fallback is not None:
+                    mismatched.append(term)
+                    results[term] = {'success': False, 'error': str(e)}
+                    continue
+                if not multi:
+                    raise
+                results[term] = {'success': False, 'error': str(e)}
+                continue
+            with timer.span('parse'):
+                data = extract(html)
+            results[term] = _term_result(data, extract)
+
+        if mismatched:
+            with timer.span('browser_fallback'):
+                results.update(browser_fallback(portal.cookies(), portal.attendance_url, mismatched))
+
+        if auth_cache is not None and any(result['success'] for result in results.values()):
+            auth_cache.store(roll_no, password, portal.cookies(), portal.attendance_url)
+
+        return _combine(results, multi, timings=timer.report())
+
+    except HttpPortalError as e:
+        return {'success': False, 'error': str(e), 'timings': timer.report()}
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Scraper error: {str(e)}',
+            'traceback': traceback.format_exc(),
+            'timings': timer.report()
+        }
@@ -0,0 +1,197 @@
+"""
+job_queue.py
+Bounded background job queue, so scrapes run outside the Flask request thread
+"""
+
+import secrets
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+
+
+class QueueFull(Exception):
+    """Raised by submit() when the queue is at capacity"""
+
+
+class Job:
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, func, args, kwargs, owner=None):
+        self.id = secrets.token_urlsafe(16)
+        self.owner = owner
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+        self.status = Job.QUEUED
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    def to_dict(self, position=None):
+        info = {
+            'job_id': self.id,
+            'status': self.status,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+        }
+        if position is not None and self.status == Job.QUEUED:
+            info['position'] = position
+        if self.status == Job.DONE:
+            info['result'] = self.result
+        if self.status == Job.FAILED:
+            info['error'] = self.error
+        return info
+
+
+class JobQueue:
+    """
+    Fixed pool of worker threads fed by a bounded, per-owner fair queue
+
+    Each owner (e.g. a roll number) has its own FIFO lane and workers take
+    one job from each waiting lane in turn, so one user's burst of jobs
+    can't hold everyone else up.
+
+    Args:
+        workers (int): Number of jobs run concurrently
+        max_queued (int): Jobs allowed to wait; submit() raises QueueFull beyond it
+        result_ttl (float): Seconds finished jobs are kept for polling
+    """
+
+    def __init__(self, workers=2, max_queued=20, result_ttl=600):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+
+        self._lanes = OrderedDict()
+        self._queued = 0
+        self._jobs = {}
+        self._order = []
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._threads = []
+
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, func, *args, owner=None, **kwargs):
+        """Queue func(*args, **kwargs) in `owner`'s lane and return its Job"""
+        self.start()
+        self._purge()
+
+        job = Job(func, args, kwargs, owner)
+        with self._lock:
+            if self._queued >= self.max_queued:
+                self.rejected += 1
+                raise QueueFull(f"Job queue is full ({self.max_queued} waiting)")
+
+            self._lanes.setdefault(owner, deque()).append(job)
+            self._queued += 1
+            self._jobs[job.id] = job
+            self._order.append(job.id)
+            self.submitted += 1
+            self._ready.notify()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def position(self, job):
+        """1-based place in line for a queued job, following the round-robin order"""
+        with self._lock:
+            lane = self._lanes.get(job.owner)
+            if lane is None or job not in lane:
+                return None
+            depth = lane.index(job)
+            ahead = 0
+            before = True
+            for owner, other in self._lanes.items():
+                if owner == job.owner:
+                    before = False
+                # Every lane gives up to `depth` jobs before this job's round,
+                # lanes ahead of it in the rotation one more within it
+                ahead += min(len(other), depth + before)
+            return ahead + 1
+
+    def stats(self):
+        with self._lock:
+            running = sum(1 for j in self._jobs.values() if j.status == Job.RUNNING)
+        return {
+            'workers': self.workers,
+            'max_queued': self.max_queued,
+            'queued': self._queued,
+            'owners_waiting': len(self._lanes),
+            'running': running,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'completed': self.completed,
+            'failed': self.failed,
+        }
+
+    def _next(self):
+        """Block until a job is waiting, then take the head of the next lane"""
+        with self._lock:
+            while not self._queued:
+                self._ready.wait()
+
+            owner, lane = next(iter(self._lanes.items()))
+            job = lane.popleft()
+            if lane:
+                self._lanes.move_to_end(owner)
+            else:
+                del self._lanes[owner]
+            self._queued -= 1
+            return job
+
+    def _work(self):
+        while True:
+            job = self._next()
+            job.status = Job.RUNNING
+            job.started = time.time()
+            try:
+                job.result = job.func(*job.args, **job.kwargs)
+                job.status = Job.DONE
+                self.completed += 1
+            except Exception as e:
+                job.error = str(e)
+                job.status = Job.FAILED
+                self.failed += 1
+                traceback.print_exc()
+            finally:
+                job.finished = time.time()
+                # Drop references to credentials held in the arguments
+                job.func = job.args = job.kwargs = None
+
+    def _purge(self):
+        """Forget finished jobs older than result_ttl"""
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id in self._order
+                if self._jobs[job_id].finished and self._jobs[job_id].finished < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+            if expired:
+                gone = set(expired)
+                self._order = [j for j in self._order if j not in gone]
@@ -0,0 +1,165 @@
+"""
+login_prefetch.py
+Keeps a few login pages open with their CAPTCHA already loaded, so
+/api/captcha can answer without waiting for navigation
+"""
+
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class PrefetchedLogin:
+    """A login page sitting on its CAPTCHA, not yet given to anyone"""
+
+    def __init__(self, handle, captcha_url, image, ttl):
+        self.handle = handle
+        self.captcha_url = captcha_url
+        self.image = image
+        self.created = time.monotonic()
+        self.expires = self.created + ttl
+
+    def remaining(self, now=None):
+        return self.expires - (now or time.monotonic())
+
+
+class LoginPrefetcher:
+    """
+    Background filler of ready-to-use login pages
+
+    A refill thread keeps `size` pages open. take() hands out the oldest
+    one that still has at least `min_remaining` seconds left (older ones
+    are released, since the portal's CAPTCHA and PHP session would time
+    out before the user could type the answer) and wakes the thread to
+    open a replacement.
+
+    Args:
+        open_login (callable): () -> (handle, captcha_url, image bytes)
+        release (callable): Receives a handle that is no longer needed
+        size (int): Pages kept ready
+        ttl (float): Seconds a page stays usable after it was opened
+        min_remaining (float): Seconds of validity a handed-out page must have
+        retry_delay (float): Pause after a failed open before trying again
+    """
+
+    def __init__(self, open_login, release, size=1, ttl=240, min_remaining=60, retry_delay=10):
+        self.open_login = open_login
+        self.release = release
+        self.size = size
+        self.ttl = ttl
+        self.min_remaining = min_remaining
+        self.retry_delay = retry_delay
+
+        self._ready = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopped = False
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.opened = 0
+        self.open_failures = 0
+
+    def start(self):
+        """Start the refill thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None or self.size <= 0:
+                return
+            self._thread = threading.Thread(target=self._run, name="login-prefetch", daemon=True)
+            self._thread.start()
+
+    def take(self):
+        """
+        A ready PrefetchedLogin, or None if none is available (the caller
+        then opens a login page itself)
+        """
+        now = time.monotonic()
+        stale = []
+        taken = None
+
+        with self._lock:
+            while self._ready:
+                login = self._ready.popleft()
+                if login.remaining(now) >= self.min_remaining:
+                    taken = login
+                    break
+                stale.append(login)
+            if taken is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        self._release(stale)
+        self._wake.set()
+        return taken
+
+    def stats(self):
+        with self._lock:
+            ready = len(self._ready)
+        return {
+            'size': self.size,
+            'ready': ready,
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'opened': self.opened,
+            'open_failures': self.open_failures,
+        }
+
+    def stop(self):
+        """Stop refilling and release everything that is ready"""
+        self._stopped = True
+        self._wake.set()
+        with self._lock:
+            ready = list(self._ready)
+            self._ready.clear()
+        self._release(ready, count=False)
+
+    def _run(self):
+        while not self._stopped:
+            self._release(self._pop_expired())
+
+            with self._lock:
+                missing = self.size - len(self._ready)
+
+            if missing > 0:
+                try:
+                    handle, captcha_url, image = self.open_login()
+                except Exception:
+                    self.open_failures += 1
+                    traceback.print_exc()
+                    self._wake.wait(self.retry_delay)
+                    self._wake.clear()
+                    continue
+
+                self.opened += 1
+                with self._lock:
+                    self._ready.append(PrefetchedLogin(handle, captcha_url, image, self.ttl))
+                continue
+
+            # Full: sleep until a page is taken or the oldest one goes stale
+            with self._lock:
+                oldest = self._ready[0].remaining() - self.min_remaining if self._ready else self.ttl
+            self._wake.wait(max(oldest, 1))
+            self._wake.clear()
+
+    def _pop_expired(self):
+        now = time.monotonic()
+        expired, keep = [], deque()
+        with self._lock:
+            for login in self._ready:
+                (keep if login.remaining(now) >= self.min_remaining else expired).append(login)
+            self._ready = keep
+        return expired
+
+    def _release(self, logins, count=True):
+        for login in logins:
+            if count:
+                self.expired += 1
+            try:
+                self.release(login.handle)
+            except Exception:
+                pass
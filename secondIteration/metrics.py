@@ -0,0 +1,165 @@
+"""
+metrics.py
+Per-step timing spans for a scrape, aggregated into histograms and served
+in the Prometheus text exposition format
+
+    timer = StepTimer()
+    with timer.span('login'):
+        ...
+    metrics.observe_scrape(timer, engine='selenium', outcome='success')
+    metrics.render()
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Upper bounds (seconds) of the histogram buckets; steps range from a few
+# ms (parse) to tens of seconds (Chrome start, login on a slow portal)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+
+class StepTimer:
+    """
+    Spans of one scrape, in the order they finished
+
+    A step that runs several times (a login retry, one form submit per
+    term) gets one span per run.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def span(self, step):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((step, time.perf_counter() - started))
+
+    def report(self):
+        """Spans in seconds, plus the time since the timer was created"""
+        return {
+            'spans': [{'step': step, 'seconds': round(seconds, 3)} for step, seconds in self.spans],
+            'total': round(time.perf_counter() - self.started, 3),
+        }
+
+
+class Histogram:
+    """Cumulative-bucket histogram of one label set"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Step and scrape histograms, plus gauges and counters read from the
+    components' stats() dicts at render time
+
+    Args:
+        namespace (str): Prefix of every metric name
+        buckets (tuple): Histogram bucket bounds, in seconds
+    """
+
+    def __init__(self, namespace="ims", buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._sources = []
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        """Add one value to histogram `name` with these labels"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def observe_scrape(self, timer, engine, outcome):
+        """Every span of a finished scrape, and its total duration"""
+        for step, seconds in timer.spans:
+            self.observe('scrape_step_seconds', seconds, engine=engine, step=step)
+        self.observe('scrape_seconds', time.perf_counter() - timer.started, engine=engine, outcome=outcome)
+
+    def register_stats(self, name, stats, counters=()):
+        """
+        Export the numeric values of stats() (a dict) as gauges
+        "<namespace>_<name>_<key>"; None and non-numeric values are skipped
+
+        Keys in `counters` only ever grow (hits, drivers created, ...) and
+        are exported as counters "<namespace>_<name>_<key>_total" instead,
+        so rate() / increase() work and process restarts show as resets.
+        """
+        self._sources.append((name, stats, frozenset(counters)))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            snapshot = [(name, labels, list(h.counts), h.count, h.sum, h.buckets)
+                        for (name, labels), h in histograms]
+
+        typed = set()
+        for name, labels, counts, count, total, buckets in snapshot:
+            metric = f"{self.namespace}_{name}"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            for bound, bucket_count in zip(buckets, counts):
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', _number(bound)),))} {bucket_count}")
+            lines.append(f"{metric}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{metric}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+
+        for name, stats, counters in self._sources:
+            try:
+                values = stats()
+            except Exception:
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                metric = f"{self.namespace}_{name}_{key}"
+                if key in counters:
+                    lines.append(f"# TYPE {metric}_total counter")
+                    lines.append(f"{metric}_total {_number(value)}")
+                else:
+                    lines.append(f"# TYPE {metric} gauge")
+                    lines.append(f"{metric} {_number(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return '{' + pairs + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
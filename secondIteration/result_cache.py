@@ -0,0 +1,263 @@
+"""
+result_cache.py
+TTL + stale-while-revalidate cache for attendance results, with a local
+LRU backend and a Redis-compatible one
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+def cache_key(roll_no, year_idx, semester_idx):
+    return f"{roll_no}_{year_idx}_{semester_idx}"
+
+
+class CacheBackend:
+    """
+    Storage interface used by ResultCache
+
+    Entries are plain JSON-serialisable dicts. Backends only store and
+    expire them; freshness and ownership are decided by ResultCache.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, entry, max_age):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+
+class LocalCacheBackend(CacheBackend):
+    """In-process, size-bounded LRU"""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires = item
+            if time.time() >= expires:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry, max_age):
+        with self._lock:
+            self._entries[key] = (entry, time.time() + max_age)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return {'backend': 'local', 'size': size, 'max_entries': self.max_entries, 'evictions': self.evictions}
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend for anything speaking the redis-py subset get/set(ex=)/delete,
+    e.g. redis.Redis, fakeredis, or a local Redis-compatible server
+
+    Args:
+        client: Redis-like client
+        prefix (str): Key namespace
+    """
+
+    def __init__(self, client, prefix="attendance:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key, entry, max_age):
+        self.client.set(self.prefix + key, json.dumps(entry), ex=max(1, int(max_age)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def stats(self):
+        return {'backend': 'redis', 'prefix': self.prefix}
+
+
+class CachedResult:
+    def __init__(self, value, stored_at, stale):
+        self.value = value
+        self.stored_at = stored_at
+        self.stale = stale
+
+    @property
+    def age(self):
+        return round(time.time() - self.stored_at, 1)
+
+
+class ResultCache:
+    """
+    Attendance result cache with TTL and stale-while-revalidate
+
+    A result younger than `ttl` is fresh. Between `ttl` and
+    `ttl + stale_ttl` it is stale: get() still returns it and the caller
+    can schedule refresh() to update it in the background. Older entries
+    are gone.
+
+    Entries can be tagged with an owner (roll_no + password) so that a
+    cached result is only served to someone who could have scraped it.
+
+    Args:
+        backend (CacheBackend, optional): Defaults to LocalCacheBackend
+        ttl (float): Seconds a result is fresh
+        stale_ttl (float): Extra seconds a stale result may be served
+        refresh_workers (int): Concurrent background refreshes
+        secret (bytes, optional): Key for owner digests; share it between
+            processes using the same Redis backend
+    """
+
+    def __init__(self, backend=None, ttl=600, stale_ttl=3600, refresh_workers=2, secret=None):
+        self.backend = backend or LocalCacheBackend()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self._secret = secret or secrets.token_bytes(32)
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+        self._inflight = set()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def get(self, key, owner=None):
+        """
+        Cached result for `key`, or None
+
+        Args:
+            owner (tuple, optional): (roll_no, password); required to match
+                the owner the entry was stored with, if any
+        """
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.get('owner') and (owner is None or
+                                   not hmac.compare_digest(entry['owner'], self._owner_digest(owner))):
+            self.misses += 1
+            return None
+
+        age = time.time() - entry['stored_at']
+        if age >= self.ttl + self.stale_ttl:
+            self.backend.delete(key)
+            self.misses += 1
+            return None
+
+        stale = age >= self.ttl
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return CachedResult(entry['value'], entry['stored_at'], stale)
+
+    def set(self, key, value, owner=None):
+        entry = {
+            'value': value,
+            'stored_at': time.time(),
+            'owner': self._owner_digest(owner) if owner else None,
+        }
+        self.backend.set(key, entry, self.ttl + self.stale_ttl)
+
+    def invalidate(self, key):
+        self.backend.delete(key)
+
+    def refresh(self, key, fetch, owner=None):
+        """
+        Re-fetch `key` in the background, at most once at a time per key
+
+        `fetch` returns the new value, or None to keep the stale one.
+        """
+        with self._lock:
+            if key in self._inflight:
+                return False
+            self._inflight.add(key)
+
+        def run():
+            try:
+                value = fetch()
+                if value is None:
+                    self.refresh_failures += 1
+                else:
+                    self.set(key, value, owner=owner)
+                    self.refreshes += 1
+            except Exception:
+                self.refresh_failures += 1
+            finally:
+                with self._lock:
+                    self._inflight.discard(key)
+
+        self._refresher.submit(run)
+        return True
+
+    def stats(self):
+        stats = {
+            'ttl': self.ttl,
+            'stale_ttl': self.stale_ttl,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'refresh_failures': self.refresh_failures,
+            'refreshing': len(self._inflight),
+        }
+        stats.update(self.backend.stats())
+        return stats
+
+    def _owner_digest(self, owner):
+        roll_no, password = owner
+        return hmac.new(self._secret, f'{roll_no}\0{password}'.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def result_cache_from_env():
+    """ResultCache configured from RESULT_CACHE_* environment variables"""
+    ttl = int(os.getenv("RESULT_CACHE_TTL", "600"))
+    stale_ttl = int(os.getenv("RESULT_CACHE_STALE_TTL", "3600"))
+    secret = os.getenv("RESULT_CACHE_SECRET")
+    secret = secret.encode('utf-8') if secret else None
+
+    redis_url = os.getenv("RESULT_CACHE_REDIS_URL")
+    if redis_url:
+        import redis
+        backend = RedisCacheBackend(redis.Redis.from_url(redis_url))
+    else:
+        backend = LocalCacheBackend(int(os.getenv("RESULT_CACHE_SIZE", "1000")))
+
+    return ResultCache(backend, ttl=ttl, stale_ttl=stale_ttl, secret=secret)
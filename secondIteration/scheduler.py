@@ -0,0 +1,123 @@
+"""
+scheduler.py
+Process-wide admission control for Chrome: a global cap on live browsers,
+and no new browser while free memory is below a threshold
+"""
+
+import os
+import threading
+import time
+
+
+class AdmissionRefused(Exception):
+    """No browser slot (or not enough free memory) before the timeout"""
+
+
+def available_memory_mb():
+    """Memory the kernel could hand out right now, in MB, or None if unknown"""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+class BrowserScheduler:
+    """
+    Global semaphore for Chrome processes with memory-aware admission
+
+    acquire() waits for a free slot, then for at least `min_free_mb` of
+    available memory, and raises AdmissionRefused once `wait_timeout`
+    runs out; every successful acquire() is paired with a release() when
+    the browser quits.
+
+    Args:
+        max_browsers (int): Chrome processes allowed at once
+        min_free_mb (int): Available memory needed to start another one
+        wait_timeout (float): Seconds a caller queues before being refused
+        poll_interval (float): Seconds between memory checks while waiting
+    """
+
+    def __init__(self, max_browsers=4, min_free_mb=512, wait_timeout=60, poll_interval=1.0):
+        self.max_browsers = max_browsers
+        self.min_free_mb = min_free_mb
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+        self._slots = threading.BoundedSemaphore(max_browsers)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.admitted = 0
+        self.refused = 0
+        self.memory_waits = 0
+
+    def acquire(self, timeout=None):
+        """Take a browser slot, queueing up to `timeout` (default wait_timeout) seconds"""
+        timeout = self.wait_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        if not self._slots.acquire(timeout=timeout):
+            self._refuse()
+            raise AdmissionRefused(f"All {self.max_browsers} browser slots are busy")
+
+        try:
+            waited = False
+            while True:
+                free = available_memory_mb()
+                if free is None or free >= self.min_free_mb:
+                    break
+                if time.monotonic() >= deadline:
+                    raise AdmissionRefused(f"Only {free} MB of memory free, {self.min_free_mb} MB needed")
+                if not waited:
+                    waited = True
+                    with self._lock:
+                        self.memory_waits += 1
+                time.sleep(self.poll_interval)
+        except AdmissionRefused:
+            self._slots.release()
+            self._refuse()
+            raise
+
+        with self._lock:
+            self.active += 1
+            self.admitted += 1
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_browsers': self.max_browsers,
+                'active': self.active,
+                'admitted': self.admitted,
+                'refused': self.refused,
+                'memory_waits': self.memory_waits,
+                'min_free_mb': self.min_free_mb,
+                'available_mb': available_memory_mb(),
+            }
+
+    def _refuse(self):
+        with self._lock:
+            self.refused += 1
+
+
+def browser_scheduler_from_env():
+    """BrowserScheduler configured from MAX_BROWSERS / MIN_FREE_MEMORY_MB / BROWSER_ADMISSION_TIMEOUT"""
+    return BrowserScheduler(
+        max_browsers=int(os.getenv("MAX_BROWSERS", "4")),
+        min_free_mb=int(os.getenv("MIN_FREE_MEMORY_MB", "512")),
+        wait_timeout=float(os.getenv("BROWSER_ADMISSION_TIMEOUT", "60")),
+    )
+
+
+# Shared by every start_driver() in the process
+browser_scheduler = browser_scheduler_from_env()
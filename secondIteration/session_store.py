@@ -0,0 +1,163 @@
+"""
+session_store.py
+Server-side store of live portal sessions, so the CAPTCHA a user solves is
+submitted on the same browser / HTTP session that served it
+"""
+
+import secrets
+import threading
+import time
+
+
+class SessionLimitReached(Exception):
+    """Raised when the store is full of sessions that haven't expired yet"""
+
+
+class PortalSession:
+    """A live login page waiting for its CAPTCHA to be solved"""
+
+    def __init__(self, token, engine, handle, roll_no, ttl):
+        self.token = token
+        self.engine = engine      # "selenium" (handle is a driver) or "http" (an HttpPortal)
+        self.handle = handle
+        self.roll_no = roll_no
+        self.created = time.monotonic()
+        self.expires = self.created + ttl
+
+    def expired(self, now=None):
+        return (now or time.monotonic()) >= self.expires
+
+
+class SessionStore:
+    """
+    Token-keyed, thread-safe store of PortalSession objects
+
+    Sessions are single-use: take() removes them. Expired sessions are
+    evicted lazily on every call and by an optional reaper thread, and
+    `on_evict` is called for each so the driver or HTTP session behind it
+    can be released.
+
+    Args:
+        ttl (float): Seconds a session stays valid (the portal's CAPTCHA
+            and PHP session time out on their own, so keep this short)
+        max_sessions (int): Cap on concurrently held sessions
+        on_evict (callable, optional): Receives each expired or discarded session
+        engine_limits (dict, optional): Tighter cap per engine, e.g. the
+            driver pool's size for "selenium" sessions (each holds a driver)
+    """
+
+    def __init__(self, ttl=300, max_sessions=10, on_evict=None, engine_limits=None):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.on_evict = on_evict
+        self.engine_limits = dict(engine_limits or {})
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+        self.evicted = 0
+
+    def create(self, engine, handle, roll_no, ttl=None):
+        """
+        Store a live session and return its token
+
+        Args:
+            ttl (float, optional): Shorter lifetime than the store's, e.g.
+                for a login page that was opened in advance
+        """
+        expired = self._pop_expired()
+        try:
+            with self._lock:
+                limit = self._full(engine)
+                if limit is not None:
+                    raise SessionLimitReached(f"Too many pending logins ({limit}), try again shortly")
+                token = secrets.token_urlsafe(24)
+                ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+                self._sessions[token] = PortalSession(token, engine, handle, roll_no, ttl)
+                return token
+        finally:
+            self._release(expired)
+
+    def has_room(self, engine):
+        """True if create() would currently accept a session for `engine`"""
+        self._release(self._pop_expired())
+        with self._lock:
+            return self._full(engine) is None
+
+    def take(self, token):
+        """Remove and return the session for `token`, or None if unknown or expired"""
+        with self._lock:
+            session = self._sessions.pop(token, None)
+
+        if session is not None and session.expired():
+            self._release([session])
+            session = None
+
+        self._release(self._pop_expired())
+        return session
+
+    def discard(self, token):
+        """Drop a session and release its resources"""
+        with self._lock:
+            session = self._sessions.pop(token, None)
+        if session is not None:
+            self._release([session])
+
+    def sweep(self):
+        """Evict every expired session now"""
+        expired = self._pop_expired()
+        self._release(expired)
+        return len(expired)
+
+    def start_reaper(self, interval=30):
+        """Sweep expired sessions in a background thread"""
+        if self._reaper is not None:
+            return self._reaper
+
+        def reap():
+            while True:
+                time.sleep(interval)
+                self.sweep()
+
+        self._reaper = threading.Thread(target=reap, daemon=True)
+        self._reaper.start()
+        return self._reaper
+
+    def stats(self):
+        with self._lock:
+            active = len(self._sessions)
+        stats = {
+            'active': active,
+            'max_sessions': self.max_sessions,
+            'evicted': self.evicted,
+        }
+        for engine, limit in self.engine_limits.items():
+            stats[f'max_{engine}_sessions'] = limit
+        return stats
+
+    def _full(self, engine):
+        """The limit `engine` has hit (lock held), or None if there is room"""
+        if len(self._sessions) >= self.max_sessions:
+            return self.max_sessions
+        limit = self.engine_limits.get(engine)
+        if limit is not None and sum(1 for s in self._sessions.values() if s.engine == engine) >= limit:
+            return limit
+        return None
+
+    def _pop_expired(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [s for s in self._sessions.values() if s.expired(now)]
+            for session in expired:
+                del self._sessions[session.token]
+        return expired
+
+    def _release(self, sessions):
+        for session in sessions:
+            self.evicted += 1
+            if self.on_evict:
+                try:
+                    self.on_evict(session)
+                except Exception:
+                    pass
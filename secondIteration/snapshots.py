@@ -0,0 +1,174 @@
+"""
+snapshots.py
+Last scraped attendance page per (roll_no, year, semester), so a re-scrape
+can skip parsing an unchanged page and report only what changed
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from attendance_parser import AttendanceTimeline, extract_timeline, parse_attendance
+from result_cache import LocalCacheBackend, RedisCacheBackend
+
+
+class SnapshotDelta:
+    """
+    What changed between the stored snapshot and a new page
+
+    `base` is the hash the delta applies to (None for a first snapshot,
+    where every day and subject is "changed").
+    """
+
+    def __init__(self, digest, base, records, codes=(), days=(), removed_days=(), subjects=()):
+        self.hash = digest
+        self.base = base
+        self.records = records
+        self.codes = list(codes)
+        self.days = list(days)
+        self.removed_days = list(removed_days)
+        self.subjects = list(subjects)
+
+    @property
+    def unchanged(self):
+        return self.hash == self.base
+
+    def to_dict(self):
+        return {
+            'hash': self.hash,
+            'base': self.base,
+            'unchanged': self.unchanged,
+            'codes': self.codes,
+            'days': self.days,
+            'removed_days': self.removed_days,
+            'subjects': self.subjects,
+        }
+
+
+class SnapshotStore:
+    """
+    One snapshot per key: page hash, parsed timeline and subject records
+
+    The snapshot hash is taken over the parsed records and timeline, not
+    the page, so the same data hashes the same whichever engine fetched it
+    (the Selenium path sends only the attendance tables, the HTTP paths the
+    whole form page). The raw page's hash is kept too: a byte-identical
+    page returns the stored records without being parsed. Otherwise the
+    page is parsed, diffed against the stored timeline and, if its data
+    changed, replaces it, so storage grows with changes rather than with
+    fetches.
+
+    Args:
+        backend (CacheBackend, optional): Defaults to LocalCacheBackend
+        max_age (float): Seconds a snapshot is kept after its last change
+    """
+
+    def __init__(self, backend=None, max_age=30 * 24 * 3600):
+        self.backend = backend or LocalCacheBackend()
+        self.max_age = max_age
+
+        self.unchanged = 0
+        self.changed = 0
+
+    def get(self, key):
+        """Stored snapshot dict (hash, records, timeline, updated_at), or None"""
+        return self.backend.get(key)
+
+    def current_hash(self, key):
+        snapshot = self.backend.get(key)
+        return snapshot['hash'] if snapshot else None
+
+    def update(self, key, html):
+        """
+        Record a freshly scraped page
+
+        Returns:
+            SnapshotDelta, or None if the page holds no attendance grid (the
+            stored snapshot is left alone)
+        """
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        page_hash = hashlib.sha256(html).hexdigest()
+
+        previous = self.backend.get(key)
+        if previous is not None and previous.get('page_hash') == page_hash:
+            self.unchanged += 1
+            return SnapshotDelta(previous['hash'], previous['hash'], previous['records'])
+
+        report = parse_attendance(html)
+        if not report:
+            return None
+
+        records = report.records()
+        timeline = extract_timeline(report)
+        digest = _content_hash(records, timeline)
+
+        if previous is not None and previous['hash'] == digest:
+            # Same data in another wrapping (other engine); remember this page
+            # so its next fetch skips the parse
+            self.backend.set(key, dict(previous, page_hash=page_hash), self.max_age)
+            self.unchanged += 1
+            return SnapshotDelta(digest, digest, previous['records'])
+
+        old_timeline = AttendanceTimeline.from_dict(previous['timeline']) if previous else None
+        changed, removed = timeline.diff(old_timeline)
+        old_records = {r['subject_code']: r for r in previous['records']} if previous else {}
+
+        self.backend.set(key, {
+            'hash': digest,
+            'page_hash': page_hash,
+            'records': records,
+            'timeline': timeline.to_dict(),
+            'updated_at': time.time(),
+        }, self.max_age)
+        self.changed += 1
+
+        return SnapshotDelta(
+            digest,
+            previous['hash'] if previous else None,
+            records,
+            codes=timeline.codes,
+            days=[_day(timeline, i) for i in changed.tolist()],
+            removed_days=[str(d) for d in removed],
+            subjects=[r for r in records if old_records.get(r['subject_code']) != r],
+        )
+
+    def stats(self):
+        stats = {'unchanged': self.unchanged, 'changed': self.changed}
+        stats.update(self.backend.stats())
+        return stats
+
+
+def _content_hash(records, timeline):
+    """sha256 of the parsed data in canonical JSON"""
+    content = json.dumps({'records': records, 'timeline': timeline.to_dict()},
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _day(timeline, i):
+    """Day row i as JSON, counts in timeline.codes order"""
+    day = {
+        'date': str(timeline.dates[i]),
+        'present': timeline.present[i].tolist(),
+        'absent': timeline.absent[i].tolist(),
+    }
+    notes = {timeline.codes[j]: mark for (row, j), mark in timeline.notes.items() if row == i}
+    if notes:
+        day['notes'] = notes
+    return day
+
+
+def snapshot_store_from_env():
+    """SnapshotStore configured from SNAPSHOT_* environment variables"""
+    max_age = int(os.getenv("SNAPSHOT_MAX_AGE", str(30 * 24 * 3600)))
+
+    redis_url = os.getenv("SNAPSHOT_REDIS_URL")
+    if redis_url:
+        import redis
+        backend = RedisCacheBackend(redis.Redis.from_url(redis_url), prefix="snapshot:")
+    else:
+        backend = LocalCacheBackend(int(os.getenv("SNAPSHOT_STORE_SIZE", "1000")))
+
+    return SnapshotStore(backend, max_age=max_age)
@@ -0,0 +1,36 @@
+"""
+Shared fixtures: the modules are imported flat from secondIteration/, as
+app_final.py does, and portal tests run against benchmarks/fake_ims.py
+"""
+
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks'))
+
+from fake_ims import DEFAULT_CAPTCHA_ANSWER, FakePortal, serve_in_thread
+
+
+@pytest.fixture
+def fake_ims():
+    """(FakePortal, base URL) of a stand-in portal with no added latency"""
+    portal = FakePortal(latency=0)
+    server, base_url = serve_in_thread(portal)
+    yield portal, base_url
+    server.shutdown()
+
+
+@pytest.fixture
+def logged_in(fake_ims):
+    """HttpPortal logged into the stand-in and sitting on the My Attendance form"""
+    from http_engine import HttpPortal
+
+    _, base_url = fake_ims
+    portal = HttpPortal(base_url).open_login()
+    portal.login('2023UIT3082', 'secret', DEFAULT_CAPTCHA_ANSWER)
+    portal.open_attendance_form()
+    return portal
@@ -0,0 +1,53 @@
+import json
+import threading
+
+import pytest
+
+from job_queue import JobQueue
+
+
+@pytest.fixture
+def app_final(monkeypatch):
+    import app_final
+
+    monkeypatch.setattr(app_final, 'job_queue', JobQueue(workers=1, max_queued=50))
+    return app_final
+
+
+def test_batch_takes_turns_with_other_users(app_final, monkeypatch):
+    order = []
+
+    def fake_scrape(roll_no, *args, **kwargs):
+        order.append(roll_no)
+        return {'success': True, 'data': [{'subject_code': 'ITC1'}]}
+
+    monkeypatch.setattr(app_final, '_run_scrape', fake_scrape)
+    monkeypatch.setattr(app_final.result_cache, 'get', lambda *args, **kwargs: None)
+
+    # Hold the only worker while another user and the batch queue up
+    release = threading.Event()
+    app_final.job_queue.submit(release.wait, owner='someone')
+    for _ in range(2):
+        app_final.job_queue.submit(order.append, 'alice', owner='alice')
+    threading.Timer(0.3, release.set).start()
+
+    students = [{'roll_no': f'R{i}', 'password': 'pw', 'captcha': 'abc'} for i in range(1, 4)]
+    response = app_final.app.test_client().post('/api/attendance/batch', json={'students': students})
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert sorted(line['index'] for line in lines) == [0, 1, 2]
+    assert all(line['success'] for line in lines)
+    assert order == ['alice', 'R1', 'alice', 'R2', 'R3']
+
+
+def test_pool_bigger_than_browser_cap_is_refused(monkeypatch):
+    import importlib
+    import sys
+
+    monkeypatch.setenv('DRIVER_POOL_SIZE', '8')
+    monkeypatch.setenv('MAX_BROWSERS', '2')
+    for name in ('scheduler', 'app_final'):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    with pytest.raises(ValueError, match='MAX_BROWSERS'):
+        importlib.import_module('app_final')
@@ -0,0 +1,28 @@
+import pytest
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import app_final
+    from history_store import HistoryStore
+
+    monkeypatch.setattr(app_final, 'history_store', HistoryStore(str(tmp_path / 'history.db')))
+    return app_final.app.test_client()
+
+
+@pytest.mark.parametrize('field, value', [
+    ('limit', 'abc'), ('limit', 0), ('limit', True), ('limit', 2.5),
+    ('since', 'yesterday'), ('until', [1]), ('semester', 'sixth'),
+])
+def test_history_rejects_bad_filters(client, field, value):
+    response = client.post('/api/history', json={'roll_no': 'R1', 'password': 'pw', field: value})
+
+    assert response.status_code == 400
+    assert field in response.get_json()['error']
+
+
+def test_history_accepts_numeric_strings(client):
+    response = client.post('/api/history', json={'roll_no': 'R1', 'password': 'pw', 'limit': '5', 'since': '0'})
+
+    assert response.status_code == 200
+    assert response.get_json() == {'success': True, 'rows': []}
@@ -0,0 +1,26 @@
+import pytest
+
+from attendance_parser import parse_attendance
+from attendance_parser.columns import extract_attendance_table_enhanced
+from attendance_scraper_api import _extract_attendance_table
+from http_engine import _check_term
+
+
+BLANK_PAGES = ['', '   \n\t', b'', b'  ', '<!-- nothing -->']
+
+
+@pytest.mark.parametrize('html', BLANK_PAGES)
+def test_blank_page_is_an_empty_report(html):
+    report = parse_attendance(html)
+
+    assert not report
+    assert report.records() == []
+    assert report.semester is None
+
+
+@pytest.mark.parametrize('html', BLANK_PAGES)
+def test_blank_page_through_the_wrappers(html):
+    assert _extract_attendance_table(html) == []
+    assert extract_attendance_table_enhanced(html, debug=False) == []
+    # A blank answer has no header to contradict the submitted term
+    _check_term(html, '6')
@@ -0,0 +1,145 @@
+"""
+Selenium-path navigation with a stand-in driver (no Chrome needed): the
+My Attendance URL learned on one scrape is opened directly on the next
+"""
+
+import pytest
+
+import attendance_scraper_api as api
+from frames import learned_urls
+
+
+FORM_URL = 'https://ims.example/imsnsit/plum_url.php?attendance-token'
+RECORDS = [{'subject_code': 'ITC1'}]
+
+
+class _Element:
+    def clear(self):
+        pass
+
+    def send_keys(self, text):
+        pass
+
+    def click(self):
+        pass
+
+
+class _SwitchTo:
+    def default_content(self):
+        pass
+
+    def frame(self, ref):
+        pass
+
+
+class FakeDriver:
+    """A fresh browser per scrape, like a non-pooled driver that is quit after"""
+
+    def __init__(self):
+        self.switch_to = _SwitchTo()
+        self.scripts = []
+        self.quit_called = False
+
+    def find_element(self, by, value):
+        return _Element()
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+
+    def get_cookies(self):
+        return [{'name': 'PHPSESSID', 'value': str(id(self))}]
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeWaiter:
+    def __init__(self, driver, timeouts=None):
+        pass
+
+    def frame(self, *args):
+        pass
+
+    def element(self, *args, **kwargs):
+        return _Element()
+
+    def navigation(self, action, step=None):
+        action()
+
+    def network_idle(self, step=None):
+        pass
+
+    def report(self):
+        return {}
+
+
+@pytest.fixture
+def portal(monkeypatch):
+    """Stubs the portal's pages; returns the call log and the form-page switch"""
+    calls = []
+    state = {'form_loads': True}
+
+    def submit(driver, waiter, year_idx, semester_idx, frame_names=api.CONTENT_FRAMES):
+        calls.append('form_submit')
+        return FORM_URL if state['form_loads'] else None
+
+    def menu(name):
+        def step(driver, *args, **kwargs):
+            calls.append(name)
+            state['form_loads'] = True
+            return True
+        return step
+
+    monkeypatch.setattr(api, 'Waiter', FakeWaiter)
+    monkeypatch.setattr(api, 'open_login_page', lambda driver, waiter: None)
+    monkeypatch.setattr(api, 'login_failed', lambda driver: False)
+    monkeypatch.setattr(api, '_find_and_click_link', menu('menu_link'))
+    monkeypatch.setattr(api, '_find_and_expand_tree_node', menu('menu_tree'))
+    monkeypatch.setattr(api, '_submit_attendance_form', submit)
+    monkeypatch.setattr(api, '_read_attendance_tables', lambda driver, extract, timer=None, frame_names=None: RECORDS)
+    learned_urls.forget('R1')
+    yield calls, state
+    learned_urls.forget('R1')
+
+
+def _scrape(driver, monkeypatch):
+    monkeypatch.setattr(api, 'start_driver', lambda headless, profile: driver)
+    return api.scrape_attendance('R1', 'pw', 1, 5, captcha_solver=lambda d: 'abc')
+
+
+def _opened_directly(driver):
+    return [args for script, args in driver.scripts if 'location.href' in script]
+
+
+def test_second_selenium_scrape_opens_learned_url(portal, monkeypatch):
+    calls, _ = portal
+
+    first = FakeDriver()
+    assert _scrape(first, monkeypatch)['success']
+    assert 'menu_link' in calls
+    assert not _opened_directly(first)
+    assert first.quit_called
+    assert learned_urls.get('R1') == FORM_URL
+
+    calls.clear()
+    second = FakeDriver()
+    result = _scrape(second, monkeypatch)
+
+    assert result['success']
+    assert _opened_directly(second) == [('data', FORM_URL)]
+    assert calls == ['form_submit']
+    assert 'open_attendance_url' in [span['step'] for span in result['timings']['spans']]
+
+
+def test_stale_learned_url_falls_back_to_menus(portal, monkeypatch):
+    calls, state = portal
+    learned_urls.remember('R1', FORM_URL + '-stale')
+    state['form_loads'] = False
+
+    driver = FakeDriver()
+    result = _scrape(driver, monkeypatch)
+
+    assert result['success']
+    assert _opened_directly(driver) == [('data', FORM_URL + '-stale')]
+    assert calls == ['form_submit', 'menu_link', 'menu_tree', 'menu_link', 'form_submit']
+    assert learned_urls.get('R1') == FORM_URL
@@ -0,0 +1,59 @@
+from auth_cache import AuthSessionCache
+from attendance_scraper_api import _extract_attendance_table
+
+
+ROLL_NO, PASSWORD = '2023UIT3082', 'secret'
+
+# The stand-in answers every submit with the saved semester 6 page, so
+# semester index 5 ("6") is the portal's default and index 3 ("4") is not
+DEFAULT_TERM, OTHER_TERM = (1, 5), (1, 3)
+
+
+def _cache_with(portal):
+    cache = AuthSessionCache()
+    cache.store(ROLL_NO, PASSWORD, portal.cookies(), portal.attendance_url)
+    return cache
+
+
+def test_cached_fetch_of_default_term(fake_ims, logged_in):
+    cache = _cache_with(logged_in)
+
+    records = cache.fetch(ROLL_NO, PASSWORD, [DEFAULT_TERM], lambda year, semester: _extract_attendance_table)
+
+    assert records[DEFAULT_TERM]
+    assert cache.stats()['hits'] == 1
+
+
+def test_cached_fetch_of_other_term_keeps_session_and_uses_browser(fake_ims, logged_in):
+    fake_portal, _ = fake_ims
+    cache = _cache_with(logged_in)
+    calls = []
+
+    def browser_fallback(cookies, form_url, terms):
+        calls.append((cookies, form_url, terms))
+        return {term: {'success': True, 'data': [{'subject_code': 'FROM-BROWSER'}]} for term in terms}
+
+    records = cache.fetch(ROLL_NO, PASSWORD, [DEFAULT_TERM, OTHER_TERM],
+                          lambda year, semester: _extract_attendance_table, browser_fallback=browser_fallback)
+
+    assert records[DEFAULT_TERM]
+    assert records[OTHER_TERM] == [{'subject_code': 'FROM-BROWSER'}]
+    assert len(calls) == 1
+    cookies, form_url, terms = calls[0]
+    assert terms == [OTHER_TERM]
+    assert form_url == logged_in.attendance_url
+    assert {c['name'] for c in cookies} == {c['name'] for c in logged_in.cookies()}
+
+    # Still cached: the next fetch needs no login
+    assert cache.has(ROLL_NO)
+    assert cache.fetch(ROLL_NO, PASSWORD, [DEFAULT_TERM], lambda year, semester: _extract_attendance_table)
+    assert fake_portal.stats()['logins'] == 1
+
+
+def test_cached_fetch_of_other_term_without_browser_keeps_session(fake_ims, logged_in):
+    cache = _cache_with(logged_in)
+
+    records = cache.fetch(ROLL_NO, PASSWORD, [OTHER_TERM], lambda year, semester: _extract_attendance_table)
+
+    assert records == {OTHER_TERM: []}
+    assert cache.has(ROLL_NO)
@@ -0,0 +1,48 @@
+import os
+
+import pyarrow.dataset as ds
+
+from history_store import HistoryStore
+
+
+DAY = 86400
+MONDAY = 1767571200  # 2026-01-05 00:00 UTC
+
+RECORDS = [
+    {'subject_code': 'ITC1', 'subject_name': 'Networks', 'classes_present': 9, 'classes_absent': 1,
+     'total_classes': 10, 'attendance_percentage': 90.0},
+    {'subject_code': 'ITC2', 'subject_name': 'Compilers', 'classes_present': 6, 'classes_absent': 4,
+     'total_classes': 10, 'attendance_percentage': 60.0},
+]
+
+
+def _partitions(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith('scraped_on='))
+
+
+def test_export_parquet_partitions_by_day_and_is_incremental(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    out = tmp_path / 'parquet'
+
+    store.append('R1', 1, 5, RECORDS, password='pw', scraped_at=MONDAY + 3600)
+    store.append('R2', 1, 5, RECORDS, password='pw', scraped_at=MONDAY + 7200)
+    store.append('R1', 1, 5, RECORDS[:1], password='pw', scraped_at=MONDAY + DAY + 60)
+
+    assert store.export_parquet(str(out)) == 5
+    assert _partitions(out) == ['scraped_on=2026-01-05', 'scraped_on=2026-01-06']
+
+    dataset = ds.dataset(str(out), format='parquet', partitioning='hive')
+    table = dataset.to_table()
+    assert table.num_rows == 5
+    monday = dataset.to_table(filter=ds.field('scraped_on') == '2026-01-05')
+    assert sorted(monday.column('roll_no').to_pylist()) == ['R1', 'R1', 'R2', 'R2']
+    assert set(monday.column('attendance_percentage').to_pylist()) == {90.0, 60.0}
+
+    # Nothing new, nothing written
+    assert store.export_parquet(str(out)) == 0
+
+    # Only the new scrape goes out, as a new part next to the old one
+    store.append('R2', 1, 5, RECORDS, password='pw', scraped_at=MONDAY + DAY + 120)
+    assert store.export_parquet(str(out)) == 2
+    assert len(os.listdir(out / 'scraped_on=2026-01-06')) == 2
+    assert ds.dataset(str(out), format='parquet', partitioning='hive').count_rows() == 7
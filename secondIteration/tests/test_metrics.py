@@ -0,0 +1,33 @@
+from metrics import MetricsRegistry
+
+
+def _samples(text):
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if line and not line.startswith('#'))
+
+
+def test_monotonic_stats_are_counters_with_total_suffix():
+    registry = MetricsRegistry()
+    registry.register_stats('auth_cache', lambda: {'size': 3, 'hits': 7, 'misses': 2, 'backend': 'local'},
+                            counters=('hits', 'misses'))
+    text = registry.render()
+
+    assert '# TYPE ims_auth_cache_hits_total counter' in text
+    assert '# TYPE ims_auth_cache_misses_total counter' in text
+    assert '# TYPE ims_auth_cache_size gauge' in text
+    assert _samples(text) == {
+        'ims_auth_cache_size': '3',
+        'ims_auth_cache_hits_total': '7',
+        'ims_auth_cache_misses_total': '2',
+    }
+
+
+def test_app_registers_its_counters():
+    import app_final
+
+    text = app_final.metrics.render()
+
+    for counter in ('ims_driver_pool_created_total', 'ims_driver_pool_recycled_total',
+                    'ims_auth_cache_hits_total', 'ims_result_cache_misses_total', 'ims_jobs_completed_total'):
+        assert f'# TYPE {counter} counter' in text
+    assert '# TYPE ims_driver_pool_in_use gauge' in text
+    assert '# TYPE ims_auth_cache_hits gauge' not in text
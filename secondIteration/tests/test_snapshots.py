@@ -0,0 +1,66 @@
+import os
+
+from lxml import html as lxml_html
+
+from snapshots import SnapshotStore
+
+
+DATA_FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data_files')
+KEY = 'R1:1:5'
+
+
+def _form_page():
+    """What the HTTP, auth-cache and refetch paths hash: the whole POST answer"""
+    with open(os.path.join(DATA_FILES, 'attendance_data.html'), encoding='utf-8') as f:
+        return f.read()
+
+
+def _tables_only(page):
+    """What the Selenium path sends (frames._ATTENDANCE_TABLES_JS): top-level tables with no form"""
+    root = lxml_html.fromstring(page)
+    tables = [table for table in root.iter('table')
+              if not any(ancestor.tag == 'table' for ancestor in table.iterancestors())
+              and not table.findall('.//select')]
+    return '<html><body>' + ''.join(lxml_html.tostring(t, encoding='unicode') for t in tables) + '</body></html>'
+
+
+def test_same_data_hashes_the_same_on_every_transport():
+    page = _form_page()
+    tables = _tables_only(page)
+    assert tables != page
+
+    store = SnapshotStore()
+    first = store.update(KEY, tables)
+    assert first.base is None and first.records
+
+    # Selenium -> HTTP refresh of unchanged data: no delta
+    second = store.update(KEY, page)
+    assert second.unchanged
+    assert second.hash == first.hash
+    assert second.records == first.records
+    assert store.stats()['changed'] == 1
+
+    # And back, now without a parse
+    third = store.update(KEY, tables)
+    assert third.unchanged and third.hash == first.hash
+
+    assert SnapshotStore().update(KEY, page).hash == first.hash
+
+
+def test_changed_data_is_a_delta_against_the_previous_hash():
+    page = _form_page()
+    store = SnapshotStore()
+    first = store.update(KEY, page)
+
+    # Whitespace inside a cell is not data
+    assert store.update(KEY, page.replace('>Jan-30<', '> Jan-30 <')).unchanged
+
+    # An absence on Jan-30 turned into a presence
+    jan_30 = ('<td align="center" width="8%">Jan-30</td><td align="center"></td><td align="center"></td>'
+              '<td align="center">0</td>')
+    assert jan_30 in page
+    delta = store.update(KEY, page.replace(jan_30, jan_30.replace('>0<', '>1<')))
+
+    assert not delta.unchanged
+    assert delta.base == first.hash
+    assert [day['date'][5:] for day in delta.days] == ['01-30']
@@ -0,0 +1,38 @@
+import datetime
+
+import numpy as np
+
+from attendance_parser import extract_timeline
+from attendance_parser.models import AttendanceReport, DayRow, SubjectAttendance
+
+
+def _report(*dates):
+    report = AttendanceReport()
+    report.subjects = [SubjectAttendance('ITC1')]
+    report.days = [DayRow(date, ('1',)) for date in dates]
+    return report
+
+
+def test_explicit_year_is_kept_and_impossible_day_is_nat():
+    timeline = extract_timeline(_report('Feb-28', 'Feb-29', 'Mar-01'), year=2025)
+
+    assert str(timeline.dates[0]) == '2025-02-28'
+    assert np.isnat(timeline.dates[1])
+    assert str(timeline.dates[2]) == '2025-03-01'
+    # The row's marks are still counted
+    assert timeline.totals() == {'ITC1': (3, 0)}
+
+
+def test_explicit_leap_year_keeps_feb_29():
+    timeline = extract_timeline(_report('Feb-28', 'Feb-29', 'Mar-01'), year=2024)
+
+    assert [str(d) for d in timeline.dates] == ['2024-02-28', '2024-02-29', '2024-03-01']
+
+
+def test_default_year_picks_the_latest_leap_year_for_feb_29():
+    timeline = extract_timeline(_report('Feb-28', 'Feb-29', 'Mar-01'))
+
+    year = int(str(timeline.dates[1])[:4])
+    assert str(timeline.dates[1]).endswith('-02-29')
+    assert year <= datetime.date.today().year
+    assert year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
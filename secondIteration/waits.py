@@ -0,0 +1,178 @@
+"""
+waits.py
+Event-driven waits for the IMS frameset, used instead of fixed sleeps
+"""
+
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+DEFAULT_TIMEOUTS = {
+    'frame': 10,
+    'element': 10,
+    'staleness': 10,
+    'navigation': 15,
+    'ready_state': 15,
+    'network_idle': 5,
+}
+
+# How long the resource count must stay unchanged to call the network idle
+NETWORK_IDLE_WINDOW = 0.5
+
+POLL_FREQUENCY = 0.1
+
+# Every top-level window plus its direct frames, as seen from any frame
+_WINDOWS_JS = "var t = window.top; var ws = [t]; for (var i = 0; i < t.frames.length; i++) { ws.push(t.frames[i]); }"
+
+_MARK_JS = _WINDOWS_JS + """
+ws.forEach(function (w) { try { w.__imsWaitMark = true; } catch (e) {} });
+"""
+
+_NAVIGATED_JS = _WINDOWS_JS + """
+var moved = false, ready = true;
+ws.forEach(function (w) {
+    try {
+        if (!w.__imsWaitMark) { moved = true; }
+        if (w.document.readyState !== 'complete') { ready = false; }
+    } catch (e) { ready = false; }
+});
+return moved && ready;
+"""
+
+_READY_JS = _WINDOWS_JS + """
+return ws.every(function (w) {
+    try { return w.document.readyState === 'complete'; } catch (e) { return false; }
+});
+"""
+
+_RESOURCE_COUNT_JS = _WINDOWS_JS + """
+var n = 0;
+ws.forEach(function (w) {
+    try { n += w.performance.getEntriesByType('resource').length; } catch (e) {}
+});
+var jq = 0;
+try { jq = (window.top.jQuery && window.top.jQuery.active) || 0; } catch (e) {}
+return [n, jq];
+"""
+
+
+class Waiter:
+    """
+    Wraps WebDriverWait with the conditions the scraper needs and records
+    how long each step actually waited
+
+    Args:
+        driver: Selenium WebDriver
+        timeouts (dict, optional): Overrides for DEFAULT_TIMEOUTS
+    """
+
+    def __init__(self, driver, timeouts=None):
+        self.driver = driver
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.timings = []
+
+    def frame(self, frame_ref, step=None):
+        """Wait until a frame is available and switch into it"""
+        return self._until(
+            step or f'frame:{frame_ref}',
+            'frame',
+            EC.frame_to_be_available_and_switch_to_it(frame_ref),
+        )
+
+    def element(self, locator, step=None, clickable=False):
+        """Wait for an element to be present (or clickable) and return it"""
+        condition = EC.element_to_be_clickable(locator) if clickable else EC.presence_of_element_located(locator)
+        return self._until(step or f'element:{locator[1]}', 'element', condition)
+
+    def staleness(self, element, step=None):
+        """Wait until an element is detached from the DOM"""
+        return self._until(step or 'staleness', 'staleness', EC.staleness_of(element))
+
+    def ready_state(self, step=None):
+        """Wait until the top document and every frame report readyState 'complete'"""
+        return self._until(step or 'ready_state', 'ready_state', self._script_condition(_READY_JS))
+
+    def network_idle(self, step=None):
+        """Wait until no new resources load for NETWORK_IDLE_WINDOW seconds"""
+        state = {'last': None, 'since': time.monotonic()}
+
+        def idle(driver):
+            counts = self._script(_RESOURCE_COUNT_JS)
+            if counts is None:
+                return False
+            now = time.monotonic()
+            if counts != state['last']:
+                state['last'] = counts
+                state['since'] = now
+                return False
+            return counts[1] == 0 and now - state['since'] >= NETWORK_IDLE_WINDOW
+
+        try:
+            return self._until(step or 'network_idle', 'network_idle', idle)
+        except TimeoutException:
+            # A chatty page is not fatal; the DOM is already usable
+            return False
+
+    def navigation(self, action, step=None):
+        """
+        Run `action` (usually a click) and wait for the resulting page or
+        frame load to finish
+
+        Every window in the frameset is tagged before the action; the wait
+        ends once any window has lost its tag (it navigated) and all of them
+        are fully loaded.
+        """
+        self._script(_MARK_JS)
+        action()
+        self._until(step or 'navigation', 'navigation', self._script_condition(_NAVIGATED_JS))
+        self.driver.switch_to.default_content()
+
+    def settled(self, step=None):
+        """readyState plus network idle, for actions that may or may not reload"""
+        step = step or 'settled'
+        self.ready_state(f'{step}:ready_state')
+        self.network_idle(f'{step}:network_idle')
+
+    def until(self, condition, step, kind='element'):
+        """Wait on an arbitrary expected condition with a named timeout"""
+        return self._until(step, kind, condition)
+
+    def report(self):
+        """Per-step wait durations, in seconds"""
+        return {
+            'steps': list(self.timings),
+            'total_wait': round(sum(t['waited'] for t in self.timings), 3),
+        }
+
+    def _until(self, step, kind, condition):
+        started = time.monotonic()
+        try:
+            return WebDriverWait(
+                self.driver,
+                self.timeouts[kind],
+                poll_frequency=POLL_FREQUENCY,
+            ).until(condition)
+        finally:
+            self.timings.append({
+                'step': step,
+                'waited': round(time.monotonic() - started, 3),
+            })
+
+    def _script_condition(self, script):
+        return lambda driver: bool(self._script(script))
+
+    def _script(self, script):
+        # The current frame may have been replaced by the navigation itself
+        try:
+            return self.driver.execute_script(script)
+        except WebDriverException:
+            try:
+                self.driver.switch_to.default_content()
+            except WebDriverException:
+                pass
+            return None